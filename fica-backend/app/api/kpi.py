@@ -1,8 +1,8 @@
 from typing import Any, Dict
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database.db import get_db
+from app.core.database.db import get_async_db
 from app.services.kpi.registry import KPI_REGISTRY
 
 router = APIRouter(prefix="/kpi", tags=["KPI"])
@@ -16,10 +16,10 @@ def list_kpis() -> Dict[str, Any]:
 
 
 @router.get("/{kpi_id}")
-def get_kpi(
+async def get_kpi(
     kpi_id  : str,
-    cohorte : int       = Query(2022, ge=1900, le=2100),
-    db      : Session   = Depends(get_db),
+    cohorte : int           = Query(2022, ge=1900, le=2100),
+    db      : AsyncSession  = Depends(get_async_db),
 ) -> Dict[str, Any]:
     fn = KPI_REGISTRY.get(kpi_id)
     if fn is None:
@@ -27,7 +27,7 @@ def get_kpi(
 
     try:
         
-        result = fn(db, cohorte)
+        result = await fn(db, cohorte)
         return {
             "kpi_id"    : kpi_id,
             "cohorte"   : cohorte,
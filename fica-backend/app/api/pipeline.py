@@ -1,8 +1,46 @@
-from io import BytesIO, StringIO
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.services.pipeline import run_pipeline_on_dataframe
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from app.services.pipeline import (
+    run_pipeline_on_dataframe,
+    run_pipeline_on_batch,
+    rebuild_gold_from_database,
+    find_duplicate_upload,
+    run_pipeline_from_silver_cache,
+    resume_pipeline_run,
+    dry_run_pipeline_on_dataframe,
+    dry_run_pipeline_on_batch,
+    dry_run_from_silver_cache,
+    LOAD_MODES,
+)
+from app.services.etl.silver_cache import (
+    list_silver_artifacts,
+    InvalidSilverKeyError,
+    SilverArtifactNotFoundError,
+    SHA256_HEX_PATTERN,
+)
+from app.services.etl.checkpoints import (
+    list_runs,
+    load_run,
+    RUN_STATUSES,
+    PipelineRunNotFoundError,
+    PipelineRunNotResumableError,
+)
+from app.services.upload_reader import (
+    check_upload_size,
+    compute_upload_sha256,
+    read_upload_dataframe,
+    UploadTooLargeError,
+    UnsupportedUploadError,
+    InvalidUploadError,
+)
+from app.services.upload_batch import (
+    compute_batch_sha256,
+    extract_upload_batch,
+    is_zip_upload,
+    upload_batch_workdir,
+)
 from app.services.etl_state import etl_state_manager
-from typing import Any
+from typing import Any, List, Optional
 import pandas as pd
 import numpy as np
 
@@ -50,34 +88,153 @@ def json_safe(obj: Any) -> Any:
         return [json_safe(x) for x in obj]
     return obj
 
+async def _run_pipeline_batch(
+    uploads : List[UploadFile],
+    atomic  : bool,
+    mode    : str,
+    sheet   : Optional[str],
+    force   : bool,
+    dry_run : bool,
+):
+    """
+    Several files or a .zip: same flow as a single file, keyed by the batch fingerprint.
+    Files are copied to a temporary directory (process-pool workers read them from disk).
+    """
+    with upload_batch_workdir() as workdir:
+        batch_files = await run_in_threadpool(
+            extract_upload_batch,
+            [(upload_file.filename, upload_file.file) for upload_file in uploads],
+            workdir,
+        )
+        upload = {
+            "nombre_archivo"    : ", ".join(upload_file.filename or "" for upload_file in uploads),
+            "sha256"            : compute_batch_sha256(batch_files),
+            "hoja"              : sheet,
+        }
+
+        if dry_run:
+            preview = await run_in_threadpool(dry_run_from_silver_cache, upload["sha256"], sheet)
+            if preview is None:
+                _, preview = await run_in_threadpool(dry_run_pipeline_on_batch, batch_files, sheet, upload)
+            return json_safe(preview)
+        if not force:
+            previous_summary = await run_in_threadpool(find_duplicate_upload, upload["sha256"], mode, sheet)
+            if previous_summary is not None:
+                return json_safe(previous_summary)
+
+        cached = await run_in_threadpool(
+            run_pipeline_from_silver_cache,
+            upload["sha256"], sheet, atomic=atomic, mode=mode, nombre_archivo=upload["nombre_archivo"],
+        )
+        if cached is not None:
+            return json_safe(cached[1])
+
+        # Parsing + Silver wait on the process pool -> threadpool
+        _, summary = await run_in_threadpool(
+            run_pipeline_on_batch,
+            batch_files,
+            atomic  = atomic,
+            mode    = mode,
+            sheet   = sheet,
+            upload  = upload,
+        )
+        return json_safe(summary)
+
 @router.post("/run")
-async def run_pipeline(file: UploadFile = File(...)):
+async def run_pipeline(
+    file    : Optional[UploadFile]          = File(None),
+    files   : Optional[List[UploadFile]]    = File(None, description="Varios archivos (.csv, .xlsx, .xls o .zip) procesados como una sola carga"),
+    atomic  : bool          = Query(False, description="Cargar en un esquema shadow y publicar con un swap atómico"),
+    mode    : str           = Query("append", description="append: carga incremental; replace: recarga completa; merge: sincroniza notas por huella"),
+    sheet   : Optional[str] = Query(None, description="Excel: hoja a leer, varias separadas por coma o '*' para todas (por defecto la primera)"),
+    force   : bool          = Query(False, description="Procesar aunque el mismo archivo ya se haya cargado"),
+    dry_run : bool          = Query(False, description="Solo Silver + Gold en memoria: resúmenes y vista previa de KPIs, sin escribir en la DB"),
+):
     """
     Process uploaded file (CSV or Excel) and run ETL pipeline.
     Accepts .csv, .xlsx, .xls files.
+    With atomic=true the load is written to a shadow schema and swapped in at the end.
+    With mode=replace the file becomes the whole dataset (base and Gold tables are reloaded).
+    With mode=merge changed, new and removed grades are written; unchanged rows are skipped.
+    The file is parsed straight from the upload spool (no in-memory copy); size limit: UPLOAD_MAX_BYTES
+    per file, enforced while the body is received (413 before the upload finishes, see upload_limit.py).
+    For .xlsx, sheet selects the sheet(s) to read; several sheets are parsed in parallel and concatenated.
+    Uploads are fingerprinted (SHA-256) and recorded in carga_csv; re-uploading the same content returns
+    the stored summary (upload.duplicate=true) without re-processing, unless force=true.
+    The Silver result is kept as a Parquet artifact per fingerprint: a later run of the same content
+    (force=true, or after a failed load) skips parsing and Silver (silver_cache.status=hit).
+    With dry_run=true only Silver and in-memory Gold run: the response has the Silver summaries,
+    Gold row counts and a per-cohort KPI preview; no database connection is opened.
+    Several files (files=...) or a .zip are one batch: each file is parsed and cleaned in a process
+    pool, student IDs are assigned once over the combined data and the database is loaded once
+    (summary batch.files has the per-file summaries).
     """
+    if mode not in LOAD_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Modo de carga no soportado. Use uno de: {', '.join(LOAD_MODES)}"
+        )
+
+    uploads = ([file] if file is not None else []) + list(files or [])
+    if not uploads:
+        raise HTTPException(status_code=400, detail="Debe subir al menos un archivo")
+
     try:
-        content_bytes = await file.read()
-        filename = file.filename.lower()
-
-        # Detect file type and read accordingly
-        if filename.endswith('.csv'):
-            content_str = content_bytes.decode("utf-8")
-            df_raw = pd.read_csv(StringIO(content_str), header=None)
-        elif filename.endswith(('.xlsx', '.xls')):
-            df_raw = pd.read_excel(BytesIO(content_bytes), header=None)
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="Formato de archivo no soportado. Use .csv, .xlsx o .xls"
-            )
-
-        # Run the pipeline
-        _, summary = run_pipeline_on_dataframe(df_raw)
+        for upload_file in uploads:
+            check_upload_size(upload_file.size)
+        if len(uploads) > 1 or is_zip_upload(uploads[0].filename):
+            return await _run_pipeline_batch(uploads, atomic, mode, sheet, force, dry_run)
+
+        file        = uploads[0]
+        filename    = file.filename or ""
+
+        # Same content already loaded -> stored summary (hashing reads the spool: threadpool)
+        sha256 = await run_in_threadpool(compute_upload_sha256, file.file)
+
+        # Dry run: Silver + in-memory Gold only (no duplicate lookup: it would query the database)
+        if dry_run:
+            preview = await run_in_threadpool(dry_run_from_silver_cache, sha256, sheet)
+            if preview is None:
+                df_raw      = await run_in_threadpool(read_upload_dataframe, file.file, filename, sheet)
+                _, preview  = await run_in_threadpool(
+                    dry_run_pipeline_on_dataframe,
+                    df_raw,
+                    header_rows = 0,
+                    upload      = {"nombre_archivo": filename, "sha256": sha256, "hoja": sheet},
+                )
+            return json_safe(preview)
+        if not force:
+            previous_summary = await run_in_threadpool(find_duplicate_upload, sha256, mode, sheet)
+            if previous_summary is not None:
+                return json_safe(previous_summary)
+
+        # Silver artifact for this content -> load it without parsing the file again (DB load -> threadpool)
+        cached = await run_in_threadpool(
+            run_pipeline_from_silver_cache, sha256, sheet, atomic=atomic, mode=mode, nombre_archivo=filename
+        )
+        if cached is not None:
+            return json_safe(cached[1])
+
+        # Detect file type and read it from the spooled upload (blocking I/O -> threadpool)
+        df_raw = await run_in_threadpool(read_upload_dataframe, file.file, filename, sheet)
+
+        # Run the pipeline (Silver + DB load block -> threadpool)
+        _, summary = await run_in_threadpool(
+            run_pipeline_on_dataframe,
+            df_raw,
+            atomic      = atomic,
+            mode        = mode,
+            header_rows = 0,
+            upload      = {"nombre_archivo": filename, "sha256": sha256, "hoja": sheet},
+        )
         return json_safe(summary)
 
     except HTTPException:
         raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (UnsupportedUploadError, InvalidUploadError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except UnicodeDecodeError:
         raise HTTPException(
             status_code=400,
@@ -89,6 +246,102 @@ async def run_pipeline(file: UploadFile = File(...)):
             detail=f"Error al procesar el archivo: {str(e)}"
         )
 
+@router.post("/run/cached")
+async def run_pipeline_cached(
+    sha256  : str           = Query(..., pattern=f"^{SHA256_HEX_PATTERN.pattern}$", description="Huella SHA-256 del archivo (upload.sha256 de una carga anterior)"),
+    sheet   : Optional[str] = Query(None, description="Hoja(s) con que se procesó el Excel"),
+    atomic  : bool          = Query(False, description="Cargar en un esquema shadow y publicar con un swap atómico"),
+    mode    : str           = Query("append", description="append: carga incremental; replace: recarga completa; merge: sincroniza notas por huella"),
+):
+    """
+    Load a previously processed file from its Silver artifact (no upload, no parsing, no Silver stages).
+    Use it to retry a load that failed in the database.
+    """
+    if mode not in LOAD_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Modo de carga no soportado. Use uno de: {', '.join(LOAD_MODES)}"
+        )
+
+    try:
+        cached = await run_in_threadpool(run_pipeline_from_silver_cache, sha256, sheet, atomic=atomic, mode=mode)
+    except InvalidSilverKeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al procesar el artefacto Silver: {str(e)}"
+        )
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"No hay artefacto Silver para el archivo {sha256}")
+    return json_safe(cached[1])
+
+@router.get("/runs")
+async def get_pipeline_runs(
+    status  : Optional[str] = Query(None, description="running | failed | completed"),
+):
+    """List pipeline runs with their stage checkpoints (newest first)"""
+    if status is not None and status not in RUN_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Estado no soportado. Use uno de: {', '.join(RUN_STATUSES)}")
+    # Reads every checkpoint JSON -> threadpool
+    return {"runs": await run_in_threadpool(list_runs, status)}
+
+@router.get("/runs/{run_id}")
+async def get_pipeline_run(run_id: str):
+    """Checkpoint of one run: completed stages (with summaries), loaded base tables, error"""
+    try:
+        return await run_in_threadpool(load_run, run_id)
+    except PipelineRunNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/runs/{run_id}/resume")
+async def resume_pipeline(run_id: str):
+    """
+    Resume a failed run from its first incomplete stage.
+    Silver comes from the run's Parquet artifact; base tables already committed are not loaded again.
+    """
+    try:
+        summary = await run_in_threadpool(resume_pipeline_run, run_id)
+        return json_safe(summary)
+    except PipelineRunNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PipelineRunNotResumableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al reanudar la ejecución {run_id}: {str(e)}"
+        )
+
+@router.get("/silver-cache")
+async def get_silver_cache():
+    """List Silver artifacts for the current code version (newest first)"""
+    # Reads the Parquet schema of every artifact -> threadpool
+    return {"artifacts": await run_in_threadpool(list_silver_artifacts)}
+
+@router.post("/gold/rebuild")
+async def rebuild_gold(
+    sha256  : Optional[str] = Query(None, pattern=f"^{SHA256_HEX_PATTERN.pattern}$", description="Refrescar solo las cohortes del artefacto Silver de este archivo"),
+    sheet   : Optional[str] = Query(None, description="Hoja(s) con que se procesó el Excel"),
+):
+    """
+    Rebuild Gold tables inside PostgreSQL from the base tables already loaded.
+    No file upload required; no rows go through Python.
+    With sha256, only the cohorts present in that file's Silver artifact are refreshed.
+    """
+    try:
+        summary = await run_in_threadpool(rebuild_gold_from_database, sha256=sha256, hoja=sheet)
+        return json_safe(summary)
+    except SilverArtifactNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidSilverKeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al reconstruir la capa Gold: {str(e)}"
+        )
+
 @router.get("/status")
 async def get_pipeline_status():
     """Get current ETL pipeline status"""
@@ -1,11 +1,14 @@
 """
 API Router para consultar tablas de la base de datos
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 import math
 
-from app.core.database.db import get_raw_connection
+from app.core.database.db import get_async_db, get_primary_raw_connection
+from app.core.database.migrate import report_index_usage, get_migration_status
 
 router = APIRouter()
 
@@ -25,137 +28,143 @@ AVAILABLE_TABLES = [
 
 
 @router.get("/database-status")
-async def get_database_status():
+async def get_database_status(db: AsyncSession = Depends(get_async_db)):
     """
     Verifica si la base de datos tiene datos.
     Retorna información sobre si se puede ejecutar el ETL.
     """
     try:
-        with get_raw_connection() as conn:
-            cur = conn.cursor()
-
-            # Verificar si la tabla estudiantes existe
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' 
-                    AND table_name = 'estudiantes'
-                );
-            """)
-            table_exists = cur.fetchone()[0]
-
-            if not table_exists:
-                # Si la tabla no existe, retornar estado inicial
-                cur.close()
-                return {
-                    "hasData": False,
-                    "canRunETL": True,
-                    "studentCount": 0,
-                    "lastUpload": None,
-                }
-
-            # Verificar si hay estudiantes (tabla principal)
-            cur.execute("SELECT COUNT(*) FROM estudiantes;")
-            student_count = cur.fetchone()[0]
-
-            # Verificar última carga
-            cur.execute("""
-                SELECT nombre_archivo, fecha_carga 
-                FROM carga_csv 
-                ORDER BY fecha_carga DESC 
-                LIMIT 1;
-            """)
-            last_upload = cur.fetchone()
-
-            cur.close()
-
-            has_data = student_count > 0
-
-            result = {
-                "hasData": has_data,
-                "canRunETL": not has_data,  # Solo se puede ejecutar si NO hay datos
-                "studentCount": student_count,
-                "lastUpload": {
-                    "filename": last_upload[0] if last_upload else None,
-                    "date": last_upload[1].isoformat() if last_upload else None,
-                } if last_upload else None,
+        # Verificar si la tabla estudiantes existe
+        result = await db.execute(text("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.tables 
+                WHERE table_schema = 'public' 
+                AND table_name = 'estudiantes'
+            );
+        """))
+        table_exists = result.scalar()
+
+        if not table_exists:
+            # Si la tabla no existe, retornar estado inicial
+            return {
+                "hasData": False,
+                "canRunETL": True,
+                "studentCount": 0,
+                "lastUpload": None,
             }
 
-            return result
+        # Verificar si hay estudiantes (tabla principal)
+        result = await db.execute(text("SELECT COUNT(*) FROM estudiantes;"))
+        student_count = result.scalar()
+
+        # Verificar última carga
+        result = await db.execute(text("""
+            SELECT nombre_archivo, fecha_carga 
+            FROM carga_csv 
+            ORDER BY fecha_carga DESC 
+            LIMIT 1;
+        """))
+        last_upload = result.fetchone()
+
+        has_data = student_count > 0
+
+        result = {
+            "hasData": has_data,
+            "canRunETL": not has_data,  # Solo se puede ejecutar si NO hay datos
+            "studentCount": student_count,
+            "lastUpload": {
+                "filename": last_upload[0] if last_upload else None,
+                "date": last_upload[1].isoformat() if last_upload else None,
+            } if last_upload else None,
+        }
+
+        return result
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al verificar estado de BD: {str(e)}")
 
 
 @router.get("/tables")
-async def get_tables():
+async def get_tables(db: AsyncSession = Depends(get_async_db)):
     """
     Obtiene la lista de tablas disponibles en la base de datos.
     Solo devuelve tablas que existen Y tienen datos.
     """
     try:
-        with get_raw_connection() as conn:
-            cur = conn.cursor()
-
-            # Verificar si la tabla estudiantes existe
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' 
-                    AND table_name = 'estudiantes'
-                );
-            """)
-            table_exists = cur.fetchone()[0]
-
-            if not table_exists:
-                cur.close()
-                return {
-                    "tables": [],
-                    "total": 0,
-                    "message": "Las tablas no existen. Debes ejecutar el proceso ETL para cargar los datos."
-                }
-
-            # Verificar si la tabla principal (estudiantes) tiene datos
-            cur.execute("SELECT COUNT(*) FROM estudiantes;")
-            student_count = cur.fetchone()[0]
-
-            # Si no hay estudiantes, no devolver ninguna tabla
-            if student_count == 0:
-                cur.close()
-                return {
-                    "tables": [],
-                    "total": 0,
-                    "message": "Las tablas están vacías. Debes ejecutar el proceso ETL para cargar los datos."
-                }
-
-            # Verificar qué tablas realmente existen
-            cur.execute("""
-                SELECT table_name 
-                FROM information_schema.tables 
+        # Verificar si la tabla estudiantes existe
+        result = await db.execute(text("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.tables 
                 WHERE table_schema = 'public' 
-                ORDER BY table_name;
-            """)
+                AND table_name = 'estudiantes'
+            );
+        """))
+        table_exists = result.scalar()
 
-            existing_tables = [row[0] for row in cur.fetchall()]
-            cur.close()
+        if not table_exists:
+            return {
+                "tables": [],
+                "total": 0,
+                "message": "Las tablas no existen. Debes ejecutar el proceso ETL para cargar los datos."
+            }
 
-            # Solo devolver tablas que existen y están en la lista permitida
-            tables = [t for t in AVAILABLE_TABLES if t in existing_tables]
+        # Verificar si la tabla principal (estudiantes) tiene datos
+        result = await db.execute(text("SELECT COUNT(*) FROM estudiantes;"))
+        student_count = result.scalar()
 
+        # Si no hay estudiantes, no devolver ninguna tabla
+        if student_count == 0:
             return {
-                "tables": tables,
-                "total": len(tables)
+                "tables": [],
+                "total": 0,
+                "message": "Las tablas están vacías. Debes ejecutar el proceso ETL para cargar los datos."
             }
+
+        # Verificar qué tablas realmente existen
+        result = await db.execute(text("""
+            SELECT table_name 
+            FROM information_schema.tables 
+            WHERE table_schema = 'public' 
+            ORDER BY table_name;
+        """))
+
+        existing_tables = [row[0] for row in result.fetchall()]
+
+        # Solo devolver tablas que existen y están en la lista permitida
+        tables = [t for t in AVAILABLE_TABLES if t in existing_tables]
+
+        return {
+            "tables": tables,
+            "total": len(tables)
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener tablas: {str(e)}")
 
 
+@router.get("/database-indexes")
+def get_database_indexes():
+    """
+    Reporta migraciones aplicadas/pendientes e índices sin uso o faltantes (pg_stat_user_indexes)
+    (sync: usa la conexión psycopg2 de migrate.py; FastAPI la ejecuta en el threadpool)
+    (primario: schema_migrations y las estadísticas de uso son las del primario)
+    """
+    try:
+        with get_primary_raw_connection() as conn:
+            return {
+                "migrations"    : get_migration_status(conn),
+                **report_index_usage(conn),
+            }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener el reporte de índices: {str(e)}")
+
+
 @router.get("/tables/{table_name}")
 async def get_table_data(
     table_name: str,
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(50, ge=1, le=100, description="Registros por página"),
-    search: Optional[str] = Query(None, description="Búsqueda en la tabla")
+    search: Optional[str] = Query(None, description="Búsqueda en la tabla"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Obtiene los datos de una tabla específica con paginación
@@ -165,99 +174,95 @@ async def get_table_data(
         raise HTTPException(status_code=404, detail=f"Tabla '{table_name}' no encontrada")
 
     try:
-        with get_raw_connection() as conn:
-            cur = conn.cursor()
-
-            # Verificar que la tabla existe
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' 
-                    AND table_name = %s
-                );
-            """, (table_name,))
-
-            if not cur.fetchone()[0]:
-                cur.close()
-                raise HTTPException(status_code=404, detail=f"Tabla '{table_name}' no existe en la base de datos")
-
-            # Obtener nombres de columnas
-            cur.execute(f"""
-                SELECT column_name, data_type 
-                FROM information_schema.columns 
-                WHERE table_name = %s 
-                ORDER BY ordinal_position;
-            """, (table_name,))
-
-            columns_info = cur.fetchall()
-            columns = [col[0] for col in columns_info]
-
-            # Construir query con búsqueda (si se proporciona)
-            where_clause = ""
-            params = []
-
-            if search and search.strip():
-                # Buscar en todas las columnas de tipo texto
-                text_columns = [col[0] for col in columns_info if 'char' in col[1].lower() or 'text' in col[1].lower()]
-                if text_columns:
-                    search_conditions = [f"{col}::text ILIKE %s" for col in text_columns]
-                    where_clause = f"WHERE {' OR '.join(search_conditions)}"
-                    params = [f"%{search}%" for _ in text_columns]
-
-            # Contar total de registros
-            count_query = f"SELECT COUNT(*) FROM {table_name} {where_clause}"
-            cur.execute(count_query, params)
-            total_records = cur.fetchone()[0]
-
-            # Calcular paginación
-            offset = (page - 1) * limit
-            total_pages = math.ceil(total_records / limit) if total_records > 0 else 1
-
-            # Obtener datos paginados
-            data_query = f"""
-                SELECT * FROM {table_name} 
-                {where_clause}
-                ORDER BY 1
-                LIMIT %s OFFSET %s
-            """
-            cur.execute(data_query, params + [limit, offset])
-
-            rows = cur.fetchall()
-            cur.close()
-
-            # Convertir a lista de diccionarios
-            data = []
-            for row in rows:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    value = row[i]
-                    # Convertir tipos especiales a strings para JSON
-                    if value is not None:
-                        if hasattr(value, 'isoformat'):  # datetime
-                            row_dict[col] = value.isoformat()
-                        elif isinstance(value, float):
-                            # Handle non-JSON-compliant float values
-                            if math.isnan(value) or math.isinf(value):
-                                row_dict[col] = None
-                            else:
-                                row_dict[col] = value
+        # Verificar que la tabla existe
+        result = await db.execute(text("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.tables 
+                WHERE table_schema = 'public' 
+                AND table_name = :table_name
+            );
+        """), {"table_name": table_name})
+
+        if not result.scalar():
+            raise HTTPException(status_code=404, detail=f"Tabla '{table_name}' no existe en la base de datos")
+
+        # Obtener nombres de columnas
+        result = await db.execute(text("""
+            SELECT column_name, data_type 
+            FROM information_schema.columns 
+            WHERE table_schema = 'public' 
+            AND table_name = :table_name 
+            ORDER BY ordinal_position;
+        """), {"table_name": table_name})
+
+        columns_info = result.fetchall()
+        columns = [col[0] for col in columns_info]
+
+        # Construir query con búsqueda (si se proporciona)
+        where_clause = ""
+        params = {}
+
+        if search and search.strip():
+            # Buscar en todas las columnas de tipo texto
+            text_columns = [col[0] for col in columns_info if 'char' in col[1].lower() or 'text' in col[1].lower()]
+            if text_columns:
+                search_conditions = [f"{col}::text ILIKE :search" for col in text_columns]
+                where_clause = f"WHERE {' OR '.join(search_conditions)}"
+                params = {"search": f"%{search}%"}
+
+        # Contar total de registros
+        count_query = f"SELECT COUNT(*) FROM {table_name} {where_clause}"
+        result = await db.execute(text(count_query), params)
+        total_records = result.scalar()
+
+        # Calcular paginación
+        offset = (page - 1) * limit
+        total_pages = math.ceil(total_records / limit) if total_records > 0 else 1
+
+        # Obtener datos paginados
+        data_query = f"""
+            SELECT * FROM {table_name} 
+            {where_clause}
+            ORDER BY 1
+            LIMIT :limit OFFSET :offset
+        """
+        result = await db.execute(text(data_query), {**params, "limit": limit, "offset": offset})
+
+        rows = result.fetchall()
+
+        # Convertir a lista de diccionarios
+        data = []
+        for row in rows:
+            row_dict = {}
+            for i, col in enumerate(columns):
+                value = row[i]
+                # Convertir tipos especiales a strings para JSON
+                if value is not None:
+                    if hasattr(value, 'isoformat'):  # datetime
+                        row_dict[col] = value.isoformat()
+                    elif isinstance(value, float):
+                        # Handle non-JSON-compliant float values
+                        if math.isnan(value) or math.isinf(value):
+                            row_dict[col] = None
                         else:
                             row_dict[col] = value
                     else:
-                        row_dict[col] = None
-                data.append(row_dict)
-
-            return {
-                "table": table_name,
-                "columns": columns,
-                "data": data,
-                "page": page,
-                "limit": limit,
-                "totalRecords": total_records,
-                "totalPages": total_pages,
-                "hasNext": page < total_pages,
-                "hasPrev": page > 1
-            }
+                        row_dict[col] = value
+                else:
+                    row_dict[col] = None
+            data.append(row_dict)
+
+        return {
+            "table": table_name,
+            "columns": columns,
+            "data": data,
+            "page": page,
+            "limit": limit,
+            "totalRecords": total_records,
+            "totalPages": total_pages,
+            "hasNext": page < total_pages,
+            "hasPrev": page > 1
+        }
 
     except HTTPException:
         raise
@@ -0,0 +1,119 @@
+"""
+Límite de tamaño de las subidas mientras se recibe el cuerpo, antes de que Starlette lo escriba a disco.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import config
+
+# Margen por parte multipart sobre UPLOAD_MAX_BYTES: encabezados de la parte y campos de formulario
+MULTIPART_PART_OVERHEAD_BYTES = 16 * 1024
+
+
+def _multipart_delimiter(content_type: str) -> Optional[bytes]:
+    """
+    b"--<boundary>" de un Content-Type multipart/form-data (None si no es multipart o no trae boundary).
+    """
+    media_type, _, params = content_type.partition(";")
+    if media_type.strip().lower() != "multipart/form-data":
+        return None
+    for param in params.split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "boundary" and value:
+            return b"--" + value.strip('"').encode("latin-1")
+    return None
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Corta con 413 una subida que supera UPLOAD_MAX_BYTES mientras llega, sin esperar a recibirla entera.
+
+    Qué hace:
+    - Cada parte multipart (los bytes entre dos delimitadores) puede pesar hasta max_file_bytes
+      (+ MULTIPART_PART_OVERHEAD_BYTES); el cuerpo completo, hasta max_files partes de ese tamaño.
+      Un Content-Length mayor se rechaza antes de leer el cuerpo.
+    - Los bytes se cuentan a medida que llegan (también sin Content-Length): la primera parte
+      que pasa el límite corta la subida.
+
+    Contexto:
+    - Starlette escribe cada archivo a un SpooledTemporaryFile antes de llamar al endpoint:
+      UploadFile.size (check_upload_size en upload_reader.py) solo se conoce con el archivo ya en disco.
+    - El HTTPException se lanza desde receive(): FastAPI lo re-lanza tal cual (no como error de parseo
+      del cuerpo) y lo responde http_exception_handler de app/main.py, con los encabezados CORS.
+
+    Dónde se usa:
+    - app/main.py, para POST /api/pipeline/run.
+    """
+
+    def __init__(
+        self,
+        app             : ASGIApp,
+        paths           : Iterable[str],
+        max_file_bytes  : int = config.UPLOAD_MAX_BYTES,
+        max_files       : int = config.UPLOAD_BATCH_MAX_FILES,
+    ):
+        self.app            = app
+        self.paths          = tuple(paths)
+        self.max_part_bytes = max_file_bytes + MULTIPART_PART_OVERHEAD_BYTES
+        self.max_body_bytes = max(max_files, 1) * self.max_part_bytes
+        self.max_file_bytes = max_file_bytes
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"La subida supera el máximo permitido de {self.max_file_bytes} bytes por archivo",
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers         = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        content_length  = headers.get("content-length", "")
+        delimiter       = _multipart_delimiter(headers.get("content-type", ""))
+        declared_bytes  = int(content_length) if content_length.isdigit() else None
+
+        body_bytes  = 0
+        part_bytes  = 0
+        tail        = b""
+
+        async def limited_receive() -> Message:
+            nonlocal body_bytes, part_bytes, tail
+            if declared_bytes is not None and declared_bytes > self.max_body_bytes:
+                raise self._too_large()
+
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            chunk       = message.get("body", b"")
+            body_bytes  += len(chunk)
+            if body_bytes > self.max_body_bytes:
+                raise self._too_large()
+            if delimiter is None:
+                return message
+
+            # Bytes de la parte actual hasta cada delimitador; el final del bloque que podría ser
+            # el comienzo de un delimitador partido entre dos mensajes queda en tail
+            data        = tail + chunk
+            position    = 0
+            while True:
+                index = data.find(delimiter, position)
+                if index < 0:
+                    break
+                if part_bytes + index - position > self.max_part_bytes:
+                    raise self._too_large()
+                part_bytes  = 0
+                position    = index + len(delimiter)
+            counted     = max(len(data) - position - (len(delimiter) - 1), 0)
+            part_bytes  += counted
+            tail        = data[position + counted:]
+            if part_bytes > self.max_part_bytes:
+                raise self._too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,530 @@
+"""
+Pipeline ETL desde la línea de comandos: cargas grandes y backfills fuera del servidor web
+(sin timeouts de la petición ni el archivo completo en la memoria de la API).
+
+Uso:
+    python -m app.cli run export.csv [otro.xlsx ...]        # un archivo por carga, en orden
+    python -m app.cli run exports/ --workers 4              # directorio: Silver en 4 procesos
+    python -m app.cli run exports/ --batch                  # todos los archivos como una sola carga
+    python -m app.cli run export.csv --mode merge --atomic  # mismos modos que POST /api/pipeline/run
+    python -m app.cli run export.csv --dry-run              # Silver + Gold en memoria, sin DB
+    python -m app.cli resume <run_id>                       # reanudar una ejecución fallida
+    python -m app.cli watch /srv/exports --window 22:00-06:00 # carpeta vigilada (WATCH_DIR)
+    python -m app.cli partitions detach 2019                # archivar un año de rendimiento_ramo
+
+El progreso va a stderr (logging); el resultado por archivo se imprime en JSON en stdout.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.core.config import config
+from app.core.logging import setup_logging
+from app.services.pipeline import (
+    run_pipeline_on_dataframe,
+    run_pipeline_on_silver,
+    run_pipeline_on_batch,
+    run_pipeline_from_silver_cache,
+    run_silver_stages,
+    resume_pipeline_run,
+    dry_run_on_silver,
+    dry_run_pipeline_on_dataframe,
+    dry_run_pipeline_on_batch,
+    dry_run_from_silver_cache,
+    find_duplicate_upload,
+    rebuild_gold_from_database,
+    LOAD_MODES,
+)
+from app.services.etl.silver_cache import load_silver_artifact, silver_artifact_path, silver_cache_enabled
+from app.services.upload_batch import (
+    BATCH_DATA_EXTENSIONS,
+    ZIP_EXTENSIONS,
+    compute_batch_sha256,
+    extract_upload_batch,
+    is_zip_upload,
+    upload_batch_workdir,
+)
+from app.services.upload_reader import compute_upload_sha256, open_upload_path, read_upload_dataframe
+from app.services.watch_folder import (
+    file_signature,
+    in_load_window,
+    is_watch_processed,
+    mark_watch_processed,
+    parse_load_window,
+    scan_watch_dir,
+)
+
+logger = logging.getLogger(__name__)
+
+# Archivos que toma run al recorrer un directorio (no recursivo, en orden alfabético)
+CLI_INPUT_EXTENSIONS = BATCH_DATA_EXTENSIONS + ZIP_EXTENSIONS
+
+
+# Archivos de entrada
+def collect_input_files(paths: List[str]) -> List[Path]:
+    files: List[Path] = []
+    for raw_path in paths:
+        path = Path(raw_path)
+        if path.is_dir():
+            files.extend(sorted(
+                child for child in path.iterdir()
+                if child.is_file() and not child.name.startswith(".") and child.name.lower().endswith(CLI_INPUT_EXTENSIONS)
+            ))
+        elif path.is_file():
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"No existe el archivo o directorio: {raw_path}")
+    return files
+
+
+def describe_input_file(path: Path) -> Dict[str, Any]:
+    """
+    {"nombre_archivo", "path", "sha256", "bytes"}: mismo formato que extract_upload_batch(), sin copiar el archivo.
+    """
+    with open(path, "rb") as stream:
+        sha256 = compute_upload_sha256(stream)
+    return {"nombre_archivo": path.name, "path": str(path), "sha256": sha256, "bytes": path.stat().st_size}
+
+
+def _upload_for(input_file: Dict[str, Any], sheet: Optional[str]) -> Dict[str, Any]:
+    return {"nombre_archivo": input_file["nombre_archivo"], "sha256": input_file["sha256"], "hoja": sheet}
+
+
+def _result_status(summary: Dict[str, Any], args: argparse.Namespace) -> str:
+    if args.dry_run:
+        return "dry_run"
+    return "duplicate" if (summary.get("upload") or {}).get("duplicate") else "loaded"
+
+
+# Un archivo por carga
+def _build_silver(
+    path: str,
+    nombre_archivo: str,
+    sha256: str,
+    sheet: Optional[str],
+) -> Tuple[Optional[pd.DataFrame], Dict[str, Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Proceso del pool: lee el archivo (memory-map) y corre Silver; el artefacto Parquet queda en disco.
+    El DataFrame solo vuelve al proceso principal si no se guardó artefacto (SILVER_CACHE_DIR vacío).
+    """
+    with open_upload_path(path) as stream:
+        dataframe_raw = read_upload_dataframe(stream, nombre_archivo, sheet)
+    upload = {"nombre_archivo": nombre_archivo, "sha256": sha256, "hoja": sheet}
+    dataframe_silver, summary_silver, silver_cache = run_silver_stages(dataframe_raw, 0, upload)
+    if silver_cache is not None and silver_cache["status"] == "stored":
+        dataframe_silver = None
+    return dataframe_silver, summary_silver, silver_cache
+
+
+def _run_file_in_process(input_file: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Un archivo completo en el proceso principal: artefacto Silver si existe, si no run_pipeline_on_dataframe().
+    """
+    upload = _upload_for(input_file, args.sheet)
+    if args.dry_run:
+        preview = dry_run_from_silver_cache(upload["sha256"], args.sheet)
+        if preview is not None:
+            return preview
+    else:
+        cached = run_pipeline_from_silver_cache(
+            upload["sha256"], args.sheet, atomic=args.atomic, mode=args.mode, nombre_archivo=upload["nombre_archivo"]
+        )
+        if cached is not None:
+            return cached[1]
+
+    with open_upload_path(input_file["path"]) as stream:
+        dataframe_raw = read_upload_dataframe(stream, input_file["nombre_archivo"], args.sheet)
+    if args.dry_run:
+        _, summary = dry_run_pipeline_on_dataframe(dataframe_raw, header_rows=0, upload=upload)
+    else:
+        _, summary = run_pipeline_on_dataframe(
+            dataframe_raw, atomic=args.atomic, mode=args.mode, header_rows=0, upload=upload
+        )
+    return summary
+
+
+def _load_built_silver(
+    input_file: Dict[str, Any],
+    built: Tuple[Optional[pd.DataFrame], Dict[str, Dict[str, Any]], Optional[Dict[str, Any]]],
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    """
+    Carga en DB (o vista previa) el resultado Silver de un proceso del pool.
+    """
+    dataframe_silver, summary_silver, silver_cache = built
+    if dataframe_silver is None:
+        artifact = load_silver_artifact(input_file["sha256"], args.sheet)
+        if artifact is None:
+            # Artefacto podado (SILVER_CACHE_MAX_ARTIFACTS) antes de cargarlo: se procesa de nuevo aquí
+            return _run_file_in_process(input_file, args)
+        dataframe_silver = artifact[0]
+
+    if args.dry_run:
+        return dry_run_on_silver(dataframe_silver, summary_silver, silver_cache)
+    return run_pipeline_on_silver(
+        dataframe_silver,
+        summary_silver,
+        atomic          = args.atomic,
+        mode            = args.mode,
+        upload          = _upload_for(input_file, args.sheet),
+        silver_cache    = silver_cache,
+    )
+
+
+def _run_zip_file(input_file: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    with upload_batch_workdir() as workdir, open(input_file["path"], "rb") as stream:
+        batch_files = extract_upload_batch([(input_file["nombre_archivo"], stream)], workdir)
+        return _run_batch_files(batch_files, input_file["nombre_archivo"], args)
+
+
+def _plan_file(input_file: Dict[str, Any], args: argparse.Namespace, seen: set) -> Tuple[str, Any]:
+    """
+    Qué hacer con un archivo antes de procesarlo: duplicate | zip | cached | silver.
+    """
+    if is_zip_upload(input_file["nombre_archivo"]):
+        return "zip", None
+    if not args.dry_run and not args.force:
+        if input_file["sha256"] in seen:
+            return "duplicate", {"duplicate_of": "mismo contenido que un archivo anterior de esta ejecución"}
+        previous_summary = find_duplicate_upload(input_file["sha256"], args.mode, args.sheet)
+        if previous_summary is not None:
+            return "duplicate", previous_summary
+    seen.add(input_file["sha256"])
+    if silver_cache_enabled() and silver_artifact_path(input_file["sha256"], args.sheet).exists():
+        return "cached", None
+    return "silver", None
+
+
+def run_each_file(input_files: List[Dict[str, Any]], args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """
+    Procesa cada archivo como una carga propia, en orden.
+
+    Contexto:
+    - Lectura + Silver (CPU) corren en args.workers procesos; la carga en DB, el refresco Gold y el
+      registro en carga_csv los hace el proceso principal, un archivo a la vez y en el orden de entrada.
+    - Mientras se carga un archivo, los procesos ya preparan los siguientes (hasta args.workers por
+      adelantado, para no acumular artefactos Silver sin cargar).
+    - Un archivo con error no detiene los demás: queda con status=failed en el resultado.
+    """
+    seen            = set()
+    plans           = [_plan_file(input_file, args, seen) for input_file in input_files]
+    silver_queue    = deque(index for index, (action, _) in enumerate(plans) if action == "silver")
+    use_pool        = args.workers > 1 and len(silver_queue) > 1
+    executor        = ProcessPoolExecutor(
+        max_workers = min(args.workers, len(silver_queue)),
+        mp_context  = multiprocessing.get_context("spawn"),
+    ) if use_pool else None
+    futures         = {}
+    results         = []
+
+    try:
+        for index, (input_file, (action, detail)) in enumerate(zip(input_files, plans)):
+            while executor is not None and silver_queue and len(futures) < args.workers:
+                queued              = input_files[silver_queue[0]]
+                futures[silver_queue.popleft()] = executor.submit(
+                    _build_silver, queued["path"], queued["nombre_archivo"], queued["sha256"], args.sheet
+                )
+
+            start   = time.perf_counter()
+            result  = {"archivo": input_file["path"], "sha256": input_file["sha256"]}
+            try:
+                if action == "duplicate":
+                    result.update(status="duplicate", summary=detail)
+                else:
+                    if action == "zip":
+                        summary = _run_zip_file(input_file, args)
+                    elif action == "silver" and executor is not None:
+                        summary = _load_built_silver(input_file, futures.pop(index).result(), args)
+                    else:
+                        summary = _run_file_in_process(input_file, args)
+                    result.update(status=_result_status(summary, args), summary=summary)
+            except Exception as e:
+                futures.pop(index, None)
+                logger.exception("[%d/%d] %s: error", index + 1, len(input_files), input_file["nombre_archivo"])
+                result.update(status="failed", error=str(e))
+            result["seconds"] = round(time.perf_counter() - start, 2)
+            results.append(result)
+            logger.info(
+                "[%d/%d] %s: %s en %.2fs",
+                index + 1, len(input_files), input_file["nombre_archivo"], result["status"], result["seconds"],
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return results
+
+
+# Todos los archivos como una sola carga
+def _run_batch_files(batch_files: List[Dict[str, Any]], nombre_archivo: str, args: argparse.Namespace) -> Dict[str, Any]:
+    upload = {"nombre_archivo": nombre_archivo, "sha256": compute_batch_sha256(batch_files), "hoja": args.sheet}
+    if args.dry_run:
+        preview = dry_run_from_silver_cache(upload["sha256"], args.sheet)
+        if preview is None:
+            _, preview = dry_run_pipeline_on_batch(batch_files, args.sheet, upload, args.workers)
+        return preview
+
+    if not args.force:
+        previous_summary = find_duplicate_upload(upload["sha256"], args.mode, args.sheet)
+        if previous_summary is not None:
+            return previous_summary
+    cached = run_pipeline_from_silver_cache(
+        upload["sha256"], args.sheet, atomic=args.atomic, mode=args.mode, nombre_archivo=nombre_archivo
+    )
+    if cached is not None:
+        return cached[1]
+    _, summary = run_pipeline_on_batch(
+        batch_files,
+        atomic      = args.atomic,
+        mode        = args.mode,
+        sheet       = args.sheet,
+        upload      = upload,
+        max_workers = args.workers,
+    )
+    return summary
+
+
+def run_as_batch(paths: List[Path], args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """
+    Todos los archivos (y el contenido de cada .zip) como una sola carga: ver run_pipeline_on_batch().
+    """
+    start = time.perf_counter()
+    with upload_batch_workdir() as workdir:
+        batch_files = []
+        for path in paths:
+            if is_zip_upload(path.name):
+                with open(path, "rb") as stream:
+                    batch_files.extend(extract_upload_batch([(path.name, stream)], workdir))
+            else:
+                batch_files.append(describe_input_file(path))
+        logger.info("Carga única de %d archivos", len(batch_files))
+        summary = _run_batch_files(batch_files, ", ".join(path.name for path in paths), args)
+
+    return [{
+        "archivo"   : [str(path) for path in paths],
+        "sha256"    : (summary.get("upload") or {}).get("sha256"),
+        "status"    : _result_status(summary, args),
+        "summary"   : summary,
+        "seconds"   : round(time.perf_counter() - start, 2),
+    }]
+
+
+# Carpeta vigilada
+def watch_directory(directory: Path, args: argparse.Namespace) -> None:
+    """
+    Vigila directory y carga cada export nuevo con el pipeline, de a uno, hasta recibir SIGINT / SIGTERM.
+
+    Contexto:
+    - Sondeo cada args.poll segundos (scan_watch_dir): funciona igual en discos locales y carpetas
+      compartidas (SMB / NFS), donde inotify no ve lo que escriben otras máquinas.
+    - Un archivo se encola tras args.settle segundos sin cambios y se procesa como en run
+      (run_each_file con un proceso): huella SHA-256, duplicados contra carga_csv, artefacto Silver.
+    - Cada archivo cargado (o ya cargado por la API o run) deja un marcador por huella en
+      <directory>/.fica_procesados (ver mark_watch_processed): tras un reinicio o en la siguiente
+      ejecución --once se salta, sin importar qué cargas corrieron después. Un archivo con error
+      no deja marcador y se reintenta cuando cambia.
+    - Con args.window ("22:00-06:00") los archivos se encolan en cualquier momento pero solo se
+      cargan dentro de la ventana.
+    - args.once: una sola revisión (espera args.settle) y termina; útil desde cron.
+    """
+    window  = parse_load_window(args.window)
+    tracked = {}
+    queue   = deque()
+    stop    = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    logger.info(
+        "Vigilando %s (sondeo %.0fs, %.0fs sin cambios, ventana de carga %s)",
+        directory, args.poll, args.settle, args.window or "siempre",
+    )
+    if args.once:
+        scan_watch_dir(directory, tracked, CLI_INPUT_EXTENSIONS, args.settle)
+        stop.wait(args.settle)
+
+    while not stop.is_set():
+        for path in scan_watch_dir(directory, tracked, CLI_INPUT_EXTENSIONS, args.settle):
+            logger.info("En cola: %s", path.name)
+            queue.append(path)
+
+        if queue and not in_load_window(window):
+            logger.debug("%d archivo(s) en cola esperan la ventana de carga %s", len(queue), args.window)
+        while queue and in_load_window(window) and not stop.is_set():
+            path    = queue.popleft()
+            entry   = tracked.get(str(path))
+            try:
+                unchanged = entry is not None and file_signature(path) == entry["signature"]
+            except FileNotFoundError:
+                unchanged = False
+            if not unchanged:
+                # Cambió o se borró después de encolarse: scan_watch_dir lo vuelve a entregar si corresponde
+                continue
+            input_file = describe_input_file(path)
+            if is_watch_processed(directory, input_file["sha256"], args.sheet):
+                logger.info("%s: ya procesado por esta carpeta", path.name)
+                continue
+            for result in run_each_file([input_file], args):
+                if result["status"] in ("loaded", "duplicate"):
+                    mark_watch_processed(directory, input_file["sha256"], args.sheet, result)
+
+        if args.once:
+            if queue:
+                logger.info("%d archivo(s) quedan fuera de la ventana de carga %s", len(queue), args.window)
+            break
+        stop.wait(args.poll)
+
+
+# Particiones de rendimiento_ramo
+def manage_partitions(action: str, anio: Optional[int]) -> Dict[str, Any]:
+    """
+    list / detach / attach de los años de rendimiento_ramo (app/services/etl/partitions.py).
+    Tras detach o attach se reconstruye Gold completo: el año archivado deja de contar (o vuelve a contar).
+    """
+    from app.core.database.db import get_etl_raw_connection
+    from app.services.etl.partitions import (
+        attach_rendimiento_partition,
+        detach_rendimiento_partition,
+        list_archived_rendimiento_tables,
+        list_rendimiento_partitions,
+    )
+    from app.services.etl.shadow_load import etl_write_lock
+
+    result: Dict[str, Any] = {}
+    with get_etl_raw_connection() as conn, etl_write_lock(conn):
+        if action == "detach":
+            result["archivada"] = detach_rendimiento_partition(conn, anio)
+        elif action == "attach":
+            result["adjunta"] = attach_rendimiento_partition(conn, anio)
+        cursor = conn.cursor()
+        try:
+            result["particiones"]   = list_rendimiento_partitions(cursor)
+            result["archivadas"]    = list_archived_rendimiento_tables(cursor)
+        finally:
+            cursor.close()
+
+    if action != "list":
+        result["gold"] = rebuild_gold_from_database()
+    return result
+
+
+# Línea de comandos
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _apply_migrations() -> None:
+    from app.core.database.db import get_etl_raw_connection
+    from app.core.database.migrate import apply_pending_migrations
+
+    with get_etl_raw_connection() as conn:
+        applied = apply_pending_migrations(conn)
+    logger.info("Migraciones aplicadas: %s", applied or "ninguna pendiente")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser      = argparse.ArgumentParser(description="Pipeline ETL FICA desde la línea de comandos")
+    commands    = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Procesar archivos o directorios (.csv, .xlsx, .xls, .zip)")
+    run_parser.add_argument("paths", nargs="+", help="Archivos o directorios")
+    run_parser.add_argument("--mode", choices=LOAD_MODES, default="append")
+    run_parser.add_argument("--atomic", action="store_true", help="Cargar en un esquema shadow y publicar con un swap atómico")
+    run_parser.add_argument("--sheet", help="Excel: hoja a leer, varias separadas por coma o '*' para todas")
+    run_parser.add_argument("--force", action="store_true", help="Procesar aunque el archivo ya se haya cargado")
+    run_parser.add_argument("--dry-run", action="store_true", help="Solo Silver + Gold en memoria, sin escribir en la DB")
+    run_parser.add_argument("--batch", action="store_true", help="Todos los archivos como una sola carga")
+    run_parser.add_argument(
+        "--workers",
+        type    = int,
+        default = min(config.UPLOAD_PARSE_WORKERS, os.cpu_count() or 1),
+        help    = "Procesos para leer y limpiar archivos (por defecto UPLOAD_PARSE_WORKERS, sin superar los CPUs)",
+    )
+
+    resume_parser = commands.add_parser("resume", help="Reanudar una ejecución fallida desde su checkpoint")
+    resume_parser.add_argument("run_id")
+
+    watch_parser = commands.add_parser("watch", help="Vigilar una carpeta y cargar cada export nuevo")
+    watch_parser.add_argument("directory", nargs="?", default=config.WATCH_DIR, help="Por defecto WATCH_DIR")
+    watch_parser.add_argument("--mode", choices=("append", "merge"), default="append")
+    watch_parser.add_argument("--atomic", action="store_true", help="Cargar en un esquema shadow y publicar con un swap atómico")
+    watch_parser.add_argument("--sheet", help="Excel: hoja a leer, varias separadas por coma o '*' para todas")
+    watch_parser.add_argument("--poll", type=float, default=config.WATCH_POLL_SECONDS, help="Segundos entre revisiones")
+    watch_parser.add_argument("--settle", type=float, default=config.WATCH_SETTLE_SECONDS, help="Segundos sin cambios antes de cargar un archivo")
+    watch_parser.add_argument("--window", default=config.WATCH_LOAD_WINDOW, help="Ventana horaria de carga HH:MM-HH:MM")
+    watch_parser.add_argument("--once", action="store_true", help="Una sola revisión y terminar")
+    watch_parser.set_defaults(force=False, dry_run=False, workers=1)
+
+    partitions_parser = commands.add_parser("partitions", help="Listar, archivar (detach) o devolver (attach) años de rendimiento_ramo")
+    partitions_parser.add_argument("action", choices=("list", "detach", "attach"))
+    partitions_parser.add_argument("anio", nargs="?", type=int)
+
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    if args.command == "partitions":
+        if args.action != "list" and args.anio is None:
+            parser.error(f"partitions {args.action} necesita el año")
+        if config.DB_MIGRATE_ON_STARTUP:
+            _apply_migrations()
+        result = manage_partitions(args.action, args.anio)
+        print(json.dumps(result, indent=2, ensure_ascii=False, default=_json_default))
+        return 0
+
+    if args.command == "resume":
+        results = resume_pipeline_run(args.run_id)
+        print(json.dumps(results, indent=2, ensure_ascii=False, default=_json_default))
+        return 0
+
+    if args.command == "watch":
+        if not args.directory or not Path(args.directory).is_dir():
+            parser.error("watch necesita un directorio existente (argumento o WATCH_DIR)")
+        try:
+            parse_load_window(args.window)
+        except ValueError as e:
+            parser.error(str(e))
+        if config.DB_MIGRATE_ON_STARTUP:
+            _apply_migrations()
+        watch_directory(Path(args.directory), args)
+        return 0
+
+    paths = collect_input_files(args.paths)
+    if not paths:
+        parser.error("No hay archivos .csv, .xlsx, .xls ni .zip para procesar")
+    if args.mode == "replace" and len(paths) > 1 and not args.batch:
+        parser.error("--mode replace con varios archivos: cada uno reemplazaría al anterior; use --batch")
+
+    if config.DB_MIGRATE_ON_STARTUP and not args.dry_run:
+        _apply_migrations()
+
+    start = time.perf_counter()
+    if args.batch:
+        results = run_as_batch(paths, args)
+    else:
+        results = run_each_file([describe_input_file(path) for path in paths], args)
+
+    failed = sum(result["status"] == "failed" for result in results)
+    logger.info(
+        "%d archivo(s) en %.2fs: %d con error",
+        len(results), time.perf_counter() - start, failed,
+    )
+    print(json.dumps(results, indent=2, ensure_ascii=False, default=_json_default))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,4 +9,54 @@ class Config(BaseSettings):
     DB_PASSWORD : str = ""
     DB_NAME     : str = ""
 
+    ETL_LOAD_WORKERS        : int   = 4
+    DB_MIGRATE_ON_STARTUP   : bool  = True
+
+    # Subida de archivos (POST /api/pipeline/run): tamaño máximo, bytes por bloque del lector CSV (pyarrow)
+    # e hilos para leer varias hojas de un Excel
+    UPLOAD_MAX_BYTES        : int   = 100 * 1024 * 1024
+    UPLOAD_CSV_BLOCK_BYTES  : int   = 4 * 1024 * 1024
+    UPLOAD_EXCEL_WORKERS    : int   = 4
+
+    # Cargas de varios archivos o un .zip: procesos que leen y limpian los archivos en paralelo
+    # y máximo de archivos por carga
+    UPLOAD_PARSE_WORKERS    : int   = 4
+    UPLOAD_BATCH_MAX_FILES  : int   = 50
+
+    # Artefactos Silver (Parquet) por huella del archivo: reintentos y refrescos Gold sin volver a subirlo.
+    # Vacío = desactivado
+    SILVER_CACHE_DIR            : str   = "data/silver_cache"
+    SILVER_CACHE_MAX_ARTIFACTS  : int   = 20
+
+    # Carpeta vigilada (python -m app.cli watch): sondeo cada WATCH_POLL_SECONDS, un archivo se carga
+    # tras WATCH_SETTLE_SECONDS sin cambios, solo dentro de WATCH_LOAD_WINDOW ("22:00-06:00"; vacío = siempre)
+    WATCH_DIR               : str   = ""
+    WATCH_POLL_SECONDS      : float = 5.0
+    WATCH_SETTLE_SECONDS    : float = 10.0
+    WATCH_LOAD_WINDOW       : str   = ""
+
+    # Checkpoints por etapa de cada ejecución (reanudar una carga fallida). Vacío = desactivado
+    # Heartbeat del proceso dueño de una ejecución en curso; sin heartbeat en STALE_SECONDS se puede reanudar
+    PIPELINE_CHECKPOINT_DIR                 : str   = "data/checkpoints"
+    PIPELINE_CHECKPOINT_MAX_RUNS            : int   = 50
+    PIPELINE_CHECKPOINT_HEARTBEAT_SECONDS   : float = 15.0
+    PIPELINE_CHECKPOINT_STALE_SECONDS       : float = 60.0
+
+    # Pool de lecturas (API: KPIs y explorador de tablas)
+    DB_POOL_SIZE            : int   = 5
+    DB_MAX_OVERFLOW         : int   = 10
+    DB_POOL_TIMEOUT         : float = 30.0
+    DB_POOL_RECYCLE         : int   = 1800
+    DB_POOL_PRE_PING        : bool  = True
+
+    # Pool del ETL: una conexión por tabla cargada en paralelo + la de Gold / shadow
+    ETL_DB_POOL_SIZE        : int   = 5
+    ETL_DB_MAX_OVERFLOW     : int   = 2
+
+    # Réplica de lectura (opcional): KPIs y explorador de tablas. Vacío = todo se lee del primario.
+    # DB_READ_CONSISTENCY: fallback (primario si la réplica no aplicó la última carga) | wait (la espera)
+    DB_READ_URL             : str   = ""
+    DB_READ_CONSISTENCY     : str   = "fallback"
+    DB_READ_WAIT_TIMEOUT    : float = 5.0
+
 config = Config()
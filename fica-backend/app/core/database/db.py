@@ -1,29 +1,104 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from app.core.config import config
+from app.core.database.pool import (
+    InstrumentedQueuePool,
+    InstrumentedAsyncAdaptedQueuePool,
+    get_pool_status,
+    probe_engine,
+    probe_async_engine,
+)
+from app.core.database.replica import choose_async_read_engine
 from contextlib import contextmanager
 
-engine = create_engine(config.DB_URL)
+def _create_pooled_engine(pool_name: str, pool_size: int, max_overflow: int, url: str = config.DB_URL):
+    return create_engine(
+        url,
+        poolclass           = InstrumentedQueuePool,
+        pool_size           = pool_size,
+        max_overflow        = max_overflow,
+        pool_timeout        = config.DB_POOL_TIMEOUT,
+        pool_recycle        = config.DB_POOL_RECYCLE,
+        pool_pre_ping       = config.DB_POOL_PRE_PING,
+        pool_logging_name   = pool_name,
+    )
+
+# Misma URL con driver asyncpg: los endpoints de lectura (KPIs, tablas) esperan sus queries sin bloquear el event loop
+def _create_async_pooled_engine(pool_name: str, url: str):
+    return create_async_engine(
+        make_url(url).set(drivername="postgresql+asyncpg"),
+        poolclass           = InstrumentedAsyncAdaptedQueuePool,
+        pool_size           = config.DB_POOL_SIZE,
+        max_overflow        = config.DB_MAX_OVERFLOW,
+        pool_timeout        = config.DB_POOL_TIMEOUT,
+        pool_recycle        = config.DB_POOL_RECYCLE,
+        pool_pre_ping       = config.DB_POOL_PRE_PING,
+        pool_logging_name   = pool_name,
+    )
+
+# Pool de lecturas (KPIs, explorador de tablas) y pool del ETL: una carga larga no agota las lecturas
+engine      = _create_pooled_engine("api", config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW)
+etl_engine  = _create_pooled_engine("etl", config.ETL_DB_POOL_SIZE, config.ETL_DB_MAX_OVERFLOW)
+
+async_engine = _create_async_pooled_engine("api_async", config.DB_URL)
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
+# Réplica de lectura (DB_READ_URL): las lecturas async (get_async_db) se enrutan con
+# app/core/database/replica.py; escrituras, ETL y Gold siempre van al primario
+async_read_engine = None
+if config.DB_READ_URL:
+    async_read_engine = _create_async_pooled_engine("api_async_read", config.DB_READ_URL)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_              = AsyncSession,
+    autoflush           = False,
+    expire_on_commit    = False,
 )
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_async_db():
+    async with AsyncSessionLocal(bind=await choose_async_read_engine(async_engine, async_read_engine)) as db:
         yield db
-    finally:
-        db.close()
 
+# Conexión al primario desde la API (migraciones, estado de schema_migrations)
 @contextmanager
-def get_raw_connection():
+def get_primary_raw_connection():
     conn = engine.raw_connection()
     try:
         yield conn
     finally:
         conn.close()
+
+@contextmanager
+def get_etl_raw_connection():
+    conn = etl_engine.raw_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+def get_pool_metrics() -> dict:
+    metrics = {
+        "api"       : get_pool_status(engine),
+        "api_async" : get_pool_status(async_engine),
+        "etl"       : get_pool_status(etl_engine),
+    }
+    if async_read_engine is not None:
+        metrics["api_async_read"] = get_pool_status(async_read_engine)
+    return metrics
+
+def probe_database() -> dict:
+    probes = {
+        "api" : probe_engine(engine),
+        "etl" : probe_engine(etl_engine),
+    }
+    return probes
+
+async def probe_async_database() -> dict:
+    probes = {"api_async": await probe_async_engine(async_engine)}
+    if async_read_engine is not None:
+        probes["api_async_read"] = await probe_async_engine(async_read_engine)
+    return probes
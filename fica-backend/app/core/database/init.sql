@@ -44,19 +44,29 @@ CREATE TABLE IF NOT EXISTS linea_asignaturas (
   FOREIGN KEY (id_asignatura) REFERENCES asignaturas(id_asignatura) ON DELETE CASCADE
 );
 
+-- Particionada por año académico (semestres.anio), una partición por año: rendimiento_ramo_<anio>.
+-- Las particiones las crea el ETL antes de cargar (app/services/etl/partitions.py).
+-- init.sql solo corre al crear el volumen; las bases existentes se actualizan con las migraciones
+-- (app/core/database/migrations: 0002 gold_cohortes, 0003 hash_contenido, 0004 particionado).
 CREATE TABLE IF NOT EXISTS rendimiento_ramo (
-  id_rendimiento  BIGSERIAL PRIMARY KEY,
+  id_rendimiento  BIGSERIAL,
   id_estudiante   BIGINT NOT NULL,
   id_bimestre     BIGINT NOT NULL,
   id_asignatura   BIGINT NOT NULL,
+  anio            INT NOT NULL,
   nota_final      NUMERIC(4,2),
   estado_final    TEXT,
+  -- Huella del contenido (nota + estado) para la carga merge; misma expresión en merge_load.py
+  hash_contenido  TEXT GENERATED ALWAYS AS (
+    md5(COALESCE(nota_final::text, '<NULL>') || '|' || COALESCE(estado_final, '<NULL>'))
+  ) STORED,
   fecha_creacion  TIMESTAMPTZ NOT NULL DEFAULT now(),
-  UNIQUE (id_estudiante, id_bimestre, id_asignatura),
+  PRIMARY KEY (id_rendimiento, anio),
+  UNIQUE (id_estudiante, id_bimestre, id_asignatura, anio),
   FOREIGN KEY (id_estudiante) REFERENCES estudiantes(id_estudiante) ON DELETE CASCADE,
   FOREIGN KEY (id_bimestre) REFERENCES bimestres(id_bimestre) ON DELETE CASCADE,
   FOREIGN KEY (id_asignatura) REFERENCES asignaturas(id_asignatura) ON DELETE RESTRICT
-);
+) PARTITION BY LIST (anio);
 
 CREATE TABLE IF NOT EXISTS paes (
   id_paes           BIGSERIAL PRIMARY KEY,
@@ -143,3 +153,9 @@ CREATE INDEX IF NOT EXISTS idx_gold_kpi_student_aprueba8_cohorte
 
 CREATE INDEX IF NOT EXISTS idx_gold_kpi_student_aprueba8_cohorte_flag
   ON gold_kpi_student_aprueba8 (cohorte, aprueba_8);
+
+CREATE TABLE IF NOT EXISTS gold_cohortes (
+  cohorte             int         PRIMARY KEY,
+  total_estudiantes   int         NOT NULL DEFAULT 0,
+  fecha_actualizacion TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,221 @@
+"""
+Migraciones versionadas del esquema (app/core/database/migrations/NNNN_nombre.sql).
+
+Uso:
+    python -m app.core.database.migrate                 # aplica las migraciones pendientes
+    python -m app.core.database.migrate status          # aplicadas / pendientes
+    python -m app.core.database.migrate index-report    # índices sin uso o faltantes
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+# Clave de pg_advisory_lock: evita que dos procesos (ej: workers de uvicorn) migren a la vez
+MIGRATIONS_LOCK_KEY = 7_310_001
+
+SQL_CREATE_SCHEMA_MIGRATIONS = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version             TEXT        PRIMARY KEY,
+        nombre              TEXT        NOT NULL,
+        fecha_aplicacion    TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+
+# Migraciones
+def list_migrations() -> List[Tuple[str, str, Path]]:
+    """
+    Devuelve (version, nombre, ruta) de cada archivo NNNN_nombre.sql, en orden de versión.
+    """
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        version, _, nombre = path.stem.partition("_")
+        migrations.append((version, nombre, path))
+    return migrations
+
+
+def get_applied_versions(cursor) -> List[str]:
+    cursor.execute(SQL_CREATE_SCHEMA_MIGRATIONS)
+    cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def apply_pending_migrations(conn) -> List[str]:
+    """
+    Aplica, en orden, las migraciones que aún no están en schema_migrations.
+
+    Contexto:
+    - Cada migración corre en su propia transacción junto con su registro en schema_migrations:
+      si falla, se hace rollback y no se aplican las siguientes.
+    - init.sql solo corre al crear el volumen de Docker; las migraciones cubren las bases existentes,
+      por eso deben poder ejecutarse sobre una base recién creada (IF NOT EXISTS).
+
+    Dónde se usa:
+    - Al iniciar la API (app/main.py, si DB_MIGRATE_ON_STARTUP) y desde la línea de comandos.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_KEY,))
+        applied_versions    = set(get_applied_versions(cursor))
+        conn.commit()
+        applied_now         = []
+
+        for version, nombre, path in list_migrations():
+            if version in applied_versions:
+                continue
+            try:
+                cursor.execute(path.read_text(encoding="utf-8"))
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, nombre) VALUES (%s, %s)",
+                    (version, nombre),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            logger.info("Migración %s_%s aplicada", version, nombre)
+            applied_now.append(f"{version}_{nombre}")
+
+        return applied_now
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_KEY,))
+        conn.commit()
+        cursor.close()
+
+
+def get_migration_status(conn) -> Dict[str, List[str]]:
+    cursor = conn.cursor()
+    try:
+        applied_versions = set(get_applied_versions(cursor))
+        conn.commit()
+    finally:
+        cursor.close()
+
+    status = {"applied": [], "pending": []}
+    for version, nombre, _ in list_migrations():
+        status["applied" if version in applied_versions else "pending"].append(f"{version}_{nombre}")
+    return status
+
+
+# Reporte de índices
+SQL_UNUSED_INDEXES = """
+    SELECT
+        s.relname                                       AS tabla,
+        s.indexrelname                                  AS indice,
+        s.idx_scan                                      AS lecturas,
+        pg_size_pretty(pg_relation_size(s.indexrelid))  AS tamano
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.schemaname = 'public'
+      AND s.idx_scan = 0
+      AND NOT i.indisunique
+      AND NOT i.indisprimary
+    ORDER BY pg_relation_size(s.indexrelid) DESC, s.relname
+"""
+
+# FKs cuyas columnas no son el prefijo de ningún índice (los DELETE en cascada y los joins las recorren completas)
+SQL_FOREIGN_KEYS_WITHOUT_INDEX = """
+    SELECT
+        c.conrelid::regclass::text  AS tabla,
+        c.conname                   AS restriccion,
+        ARRAY(
+            SELECT a.attname
+            FROM unnest(c.conkey) AS k(attnum)
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+        )                           AS columnas
+    FROM pg_constraint c
+    WHERE c.contype = 'f'
+      AND c.connamespace = 'public'::regnamespace
+      AND c.conparentid = 0
+      AND NOT EXISTS (
+          SELECT 1
+          FROM pg_index i
+          WHERE i.indrelid = c.conrelid
+            AND (i.indkey::smallint[])[0:cardinality(c.conkey) - 1] @> c.conkey
+            AND (i.indkey::smallint[])[0:cardinality(c.conkey) - 1] <@ c.conkey
+      )
+    ORDER BY 1, 2
+"""
+
+SQL_SEQUENTIAL_SCAN_TABLES = """
+    SELECT
+        relname                 AS tabla,
+        seq_scan                AS lecturas_secuenciales,
+        COALESCE(idx_scan, 0)   AS lecturas_por_indice,
+        n_live_tup              AS filas
+    FROM pg_stat_user_tables
+    WHERE schemaname = 'public'
+      AND seq_scan > COALESCE(idx_scan, 0)
+      AND n_live_tup >= 1000
+    ORDER BY seq_tup_read DESC
+"""
+
+
+def _fetch_dicts(cursor, sql: str) -> List[Dict[str, Any]]:
+    cursor.execute(sql)
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def report_index_usage(conn) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Reporta índices sin uso e índices probablemente faltantes, según las estadísticas de PostgreSQL.
+
+    Qué hace:
+    - unused_indexes: índices secundarios con idx_scan = 0 (pg_stat_user_indexes); candidatos a eliminar.
+    - foreign_keys_without_index: FKs sin índice que las cubra; candidatas a una nueva migración.
+    - sequential_scan_tables: tablas (>= 1000 filas) leídas más veces en secuencia que por índice.
+
+    Contexto:
+    - Las estadísticas son acumuladas desde el último pg_stat_reset(); conviene mirarlas
+      después de un período de uso real de los KPIs.
+    """
+    cursor = conn.cursor()
+    try:
+        report = {
+            "unused_indexes"                : _fetch_dicts(cursor, SQL_UNUSED_INDEXES),
+            "foreign_keys_without_index"    : _fetch_dicts(cursor, SQL_FOREIGN_KEYS_WITHOUT_INDEX),
+            "sequential_scan_tables"        : _fetch_dicts(cursor, SQL_SEQUENTIAL_SCAN_TABLES),
+        }
+        conn.rollback()
+        return report
+    finally:
+        cursor.close()
+
+
+# Línea de comandos
+def main() -> None:
+    from app.core.database.db import get_primary_raw_connection
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Migraciones del esquema FICA")
+    parser.add_argument(
+        "command",
+        nargs   = "?",
+        default = "upgrade",
+        choices = ["upgrade", "status", "index-report"],
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    with get_primary_raw_connection() as conn:
+        if args.command == "upgrade":
+            result = {"applied": apply_pending_migrations(conn)}
+        elif args.command == "status":
+            result = get_migration_status(conn)
+        else:
+            result = report_index_usage(conn)
+
+    print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+-- Índices para los filtros frecuentes de KPIs, Gold y el explorador de tablas.
+
+-- KPIs 1.1, 1.4 y 1.5 y refresco Gold por cohorte: WHERE anio_ingreso = :cohorte
+CREATE INDEX IF NOT EXISTS idx_estudiantes_anio_ingreso
+  ON estudiantes (anio_ingreso);
+
+-- Joins de rendimiento_ramo con bimestres / asignaturas (Gold, ON DELETE de las FKs).
+-- En la tabla particionada el índice se crea en todas las particiones.
+CREATE INDEX IF NOT EXISTS idx_rendimiento_ramo_id_bimestre
+  ON rendimiento_ramo (id_bimestre);
+
+CREATE INDEX IF NOT EXISTS idx_rendimiento_ramo_id_asignatura
+  ON rendimiento_ramo (id_asignatura);
+
+-- FK linea_asignaturas → asignaturas (la PK empieza por id_linea)
+CREATE INDEX IF NOT EXISTS idx_linea_asignaturas_id_asignatura
+  ON linea_asignaturas (id_asignatura);
+
+-- Última carga: ORDER BY fecha_carga DESC LIMIT 1 (GET /api/database-status)
+CREATE INDEX IF NOT EXISTS idx_carga_csv_fecha_carga
+  ON carga_csv (fecha_carga DESC);
@@ -0,0 +1,7 @@
+-- Cohortes presentes en Gold: refresh_gold_by_cohort() registra aquí cada cohorte que refresca
+-- (app/services/etl/build_gold_sql.py).
+CREATE TABLE IF NOT EXISTS gold_cohortes (
+  cohorte             int         PRIMARY KEY,
+  total_estudiantes   int         NOT NULL DEFAULT 0,
+  fecha_actualizacion TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,6 @@
+-- Huella del contenido (nota + estado) de cada fila de rendimiento_ramo para la carga merge:
+-- solo se actualizan las filas cuya huella cambió (app/services/etl/merge_load.py, misma expresión).
+ALTER TABLE rendimiento_ramo
+  ADD COLUMN IF NOT EXISTS hash_contenido TEXT GENERATED ALWAYS AS (
+    md5(COALESCE(nota_final::text, '<NULL>') || '|' || COALESCE(estado_final, '<NULL>'))
+  ) STORED;
@@ -0,0 +1,84 @@
+-- rendimiento_ramo particionada por año académico (LIST (anio), una partición rendimiento_ramo_<anio>).
+-- Bases creadas antes del particionado: la tabla plana se renombra, se crea la particionada,
+-- se copian las filas con su año (mismos id_rendimiento y posición de la secuencia) y se borra la plana.
+-- En una base creada con el init.sql actual la tabla ya es particionada y nada de esto corre.
+DO $$
+DECLARE
+  restriccion     record;
+  anio_particion  int;
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_class
+    WHERE relname = 'rendimiento_ramo'
+      AND relnamespace = current_schema()::regnamespace
+      AND relkind = 'r'
+  ) THEN
+    RETURN;
+  END IF;
+
+  ALTER TABLE rendimiento_ramo RENAME TO rendimiento_ramo_sin_particion;
+  FOR restriccion IN
+    SELECT conname FROM pg_constraint
+    WHERE conrelid = 'rendimiento_ramo_sin_particion'::regclass AND contype IN ('p', 'u', 'f')
+  LOOP
+    EXECUTE format('ALTER TABLE rendimiento_ramo_sin_particion DROP CONSTRAINT %I', restriccion.conname);
+  END LOOP;
+  ALTER SEQUENCE rendimiento_ramo_id_rendimiento_seq RENAME TO rendimiento_ramo_sin_particion_id_seq;
+
+  CREATE TABLE rendimiento_ramo (
+    id_rendimiento  BIGSERIAL,
+    id_estudiante   BIGINT NOT NULL,
+    id_bimestre     BIGINT NOT NULL,
+    id_asignatura   BIGINT NOT NULL,
+    anio            INT NOT NULL,
+    nota_final      NUMERIC(4,2),
+    estado_final    TEXT,
+    hash_contenido  TEXT GENERATED ALWAYS AS (
+      md5(COALESCE(nota_final::text, '<NULL>') || '|' || COALESCE(estado_final, '<NULL>'))
+    ) STORED,
+    fecha_creacion  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id_rendimiento, anio),
+    UNIQUE (id_estudiante, id_bimestre, id_asignatura, anio),
+    FOREIGN KEY (id_estudiante) REFERENCES estudiantes(id_estudiante) ON DELETE CASCADE,
+    FOREIGN KEY (id_bimestre) REFERENCES bimestres(id_bimestre) ON DELETE CASCADE,
+    FOREIGN KEY (id_asignatura) REFERENCES asignaturas(id_asignatura) ON DELETE RESTRICT
+  ) PARTITION BY LIST (anio);
+
+  FOR anio_particion IN
+    SELECT DISTINCT s.anio
+    FROM rendimiento_ramo_sin_particion r
+    JOIN bimestres b ON b.id_bimestre = r.id_bimestre
+    JOIN semestres s ON s.id_semestre = b.id_semestre
+  LOOP
+    EXECUTE format(
+      'CREATE TABLE %I PARTITION OF rendimiento_ramo FOR VALUES IN (%s)',
+      'rendimiento_ramo_' || anio_particion, anio_particion
+    );
+  END LOOP;
+
+  INSERT INTO rendimiento_ramo (
+    id_rendimiento, id_estudiante, id_bimestre, id_asignatura, anio,
+    nota_final, estado_final, fecha_creacion
+  )
+  SELECT
+    r.id_rendimiento, r.id_estudiante, r.id_bimestre, r.id_asignatura, s.anio,
+    r.nota_final, r.estado_final, r.fecha_creacion
+  FROM rendimiento_ramo_sin_particion r
+  JOIN bimestres b ON b.id_bimestre = r.id_bimestre
+  JOIN semestres s ON s.id_semestre = b.id_semestre;
+
+  PERFORM setval(
+    pg_get_serial_sequence('rendimiento_ramo', 'id_rendimiento'),
+    COALESCE((SELECT MAX(id_rendimiento) FROM rendimiento_ramo), 0) + 1,
+    false
+  );
+
+  -- Los índices de 0001 quedaron en la tabla plana: se borran con ella y se crean en la particionada
+  DROP TABLE rendimiento_ramo_sin_particion;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_rendimiento_ramo_id_bimestre
+  ON rendimiento_ramo (id_bimestre);
+
+CREATE INDEX IF NOT EXISTS idx_rendimiento_ramo_id_asignatura
+  ON rendimiento_ramo (id_asignatura);
@@ -0,0 +1,11 @@
+-- Registro de cargas: huella SHA-256 del archivo, modo, hoja (Excel) y resumen del pipeline.
+-- Permite devolver el resumen guardado cuando se vuelve a subir el mismo archivo
+-- (ver app/services/etl/upload_history.py).
+ALTER TABLE carga_csv
+  ADD COLUMN IF NOT EXISTS sha256 TEXT,
+  ADD COLUMN IF NOT EXISTS modo   TEXT,
+  ADD COLUMN IF NOT EXISTS hoja   TEXT,
+  ADD COLUMN IF NOT EXISTS resumen JSONB;
+
+CREATE INDEX IF NOT EXISTS idx_carga_csv_sha256
+  ON carga_csv (sha256);
@@ -0,0 +1,9 @@
+-- Posición del WAL del primario al terminar la última carga (o refresco Gold) del ETL: una sola fila.
+-- Las lecturas enrutadas a la réplica exigen que esta la haya aplicado, aunque la carga la haya hecho
+-- otro proceso (CLI, carpeta vigilada, otro worker) o la API se haya reiniciado
+-- (ver app/core/database/replica.py).
+CREATE TABLE IF NOT EXISTS etl_ultima_carga (
+  id                  boolean     PRIMARY KEY DEFAULT true CHECK (id),
+  wal_lsn             pg_lsn      NOT NULL,
+  fecha_actualizacion TIMESTAMPTZ NOT NULL DEFAULT now()
+);
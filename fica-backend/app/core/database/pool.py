@@ -0,0 +1,134 @@
+"""
+Pool de conexiones instrumentado: cuenta checkouts, tiempo de espera, overflow y timeouts por pool.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Contadores acumulados de un pool (desde que arrancó el proceso).
+    """
+
+    def __init__(self):
+        self._lock                  = threading.Lock()
+        self.checkouts              = 0
+        self.overflow_checkouts     = 0
+        self.timeouts               = 0
+        self.wait_seconds_total     = 0.0
+        self.wait_seconds_max       = 0.0
+
+    def record_checkout(self, wait_seconds: float, in_overflow: bool) -> None:
+        with self._lock:
+            self.checkouts          += 1
+            self.overflow_checkouts += int(in_overflow)
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max   = max(self.wait_seconds_max, wait_seconds)
+
+    def record_timeout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.timeouts           += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max   = max(self.wait_seconds_max, wait_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts"             : self.checkouts,
+                "overflow_checkouts"    : self.overflow_checkouts,
+                "timeouts"              : self.timeouts,
+                "wait_seconds_total"    : round(self.wait_seconds_total, 4),
+                "wait_seconds_avg"      : round(self.wait_seconds_total / self.checkouts, 4) if self.checkouts else 0.0,
+                "wait_seconds_max"      : round(self.wait_seconds_max, 4),
+            }
+
+
+# Métricas por nombre de pool (pool_logging_name del engine); sobreviven a engine.dispose()
+POOL_METRICS: Dict[str, PoolMetrics] = {}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mide cuánto espera cada checkout y si se sirvió desde el overflow.
+
+    Contexto:
+    - Se usa como poolclass en create_engine (app/core/database/db.py).
+    - Solo mide la obtención de la conexión desde el pool; pre-ping y reset no se cuentan como espera.
+    """
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        return POOL_METRICS.setdefault(self._orig_logging_name or "default", PoolMetrics())
+
+    def _do_get(self):
+        start           = time.perf_counter()
+        overflow_before = self.overflow()
+        try:
+            connection_record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+        # Overflow: se abrió una conexión por sobre pool_size para este checkout
+        in_overflow = self.overflow() > max(overflow_before, 0)
+        self.metrics.record_checkout(time.perf_counter() - start, in_overflow)
+        return connection_record
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    Variante de InstrumentedQueuePool para create_async_engine (cola compatible con asyncio).
+    """
+
+
+def get_pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Estado actual del pool del engine (conexiones en uso, libres y en overflow) + contadores acumulados.
+    """
+    if isinstance(engine, AsyncEngine):
+        engine = engine.sync_engine
+    pool    = engine.pool
+    status  = {
+        "size"          : pool.size(),
+        "checked_out"   : pool.checkedout(),
+        "checked_in"    : pool.checkedin(),
+        "overflow"      : max(pool.overflow(), 0),
+        "max_overflow"  : pool._max_overflow,
+        "timeout"       : pool.timeout(),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(pool.metrics.snapshot())
+    return status
+
+
+def probe_engine(engine: Engine) -> Dict[str, Any]:
+    """
+    Ejecuta SELECT 1 con una conexión del pool y devuelve si respondió y en cuánto tiempo.
+    """
+    start = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return {"ok": True, "latency_seconds": round(time.perf_counter() - start, 4)}
+    except Exception as e:
+        return {"ok": False, "latency_seconds": round(time.perf_counter() - start, 4), "error": str(e)}
+
+
+async def probe_async_engine(engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    Igual que probe_engine(), para un engine async (no bloquea el event loop).
+    """
+    start = time.perf_counter()
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        return {"ok": True, "latency_seconds": round(time.perf_counter() - start, 4)}
+    except Exception as e:
+        return {"ok": False, "latency_seconds": round(time.perf_counter() - start, 4), "error": str(e)}
@@ -0,0 +1,181 @@
+"""
+Ruteo de lecturas a la réplica (DB_READ_URL) con consistencia respecto de la última carga del ETL.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import config
+
+logger = logging.getLogger(__name__)
+
+# Modos de DB_READ_CONSISTENCY:
+# - fallback : si la réplica no ha aplicado la última carga (o no responde), se lee del primario
+# - wait     : se espera hasta DB_READ_WAIT_TIMEOUT a que la réplica la aplique; después, primario
+READ_CONSISTENCY_MODES = ("fallback", "wait")
+
+REPLICA_POLL_SECONDS = 0.1
+
+# Tras un error de conexión, las lecturas van al primario este tiempo antes de reintentar la réplica
+REPLICA_RETRY_SECONDS = 30.0
+
+# Un servidor que no está en recovery (ej: DB_READ_URL apunta al primario) siempre está al día
+SQL_REPLICA_CAUGHT_UP = text("""
+    SELECT NOT pg_is_in_recovery()
+        OR pg_last_wal_replay_lsn() >= CAST(CAST(:lsn AS text) AS pg_lsn)
+""")
+
+# Posición del WAL de la última carga, en la tabla etl_ultima_carga del primario
+# (migración 0006_etl_ultima_carga.sql): nunca retrocede si dos cargas terminan en desorden
+SQL_RECORD_PIPELINE_LSN = """
+    INSERT INTO etl_ultima_carga (id, wal_lsn)
+    VALUES (true, pg_current_wal_lsn())
+    ON CONFLICT (id) DO UPDATE
+    SET wal_lsn             = GREATEST(etl_ultima_carga.wal_lsn, EXCLUDED.wal_lsn),
+        fecha_actualizacion = now()
+    RETURNING wal_lsn::text
+"""
+
+SQL_LAST_PIPELINE_LSN = text("SELECT wal_lsn::text FROM etl_ultima_carga")
+
+_lock                   = threading.Lock()
+_last_pipeline_lsn      : Optional[str] = None
+_replica_verified_lsn   : Optional[str] = None
+_replica_verified       = False
+_replica_down_until     = 0.0
+
+
+def record_pipeline_lsn(conn) -> str:
+    """
+    Guarda la posición del WAL del primario al terminar una carga (pg_current_wal_lsn()).
+
+    Contexto:
+    - Las lecturas enrutadas a la réplica exigen que esta haya aplicado al menos esa posición:
+      así los KPIs nunca muestran datos anteriores a la última carga completada.
+    - El valor se guarda en etl_ultima_carga (primario), no en memoria: la API lo lee antes de elegir
+      la réplica, también cuando la carga la hizo la CLI, la carpeta vigilada u otro worker,
+      y después de reiniciarse.
+
+    Dónde se usa:
+    - run_pipeline_on_silver() y rebuild_gold_from_database() en app/services/pipeline.py.
+    """
+    global _last_pipeline_lsn
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SQL_RECORD_PIPELINE_LSN)
+        lsn = cursor.fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    with _lock:
+        _last_pipeline_lsn = lsn
+    return lsn
+
+
+def _replica_is_down() -> bool:
+    with _lock:
+        return time.monotonic() < _replica_down_until
+
+
+def _mark_replica_down(error: Exception) -> None:
+    global _replica_verified, _replica_down_until
+    logger.warning("Réplica de lectura no disponible, se lee del primario: %s", error)
+    with _lock:
+        _replica_verified   = False
+        _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+
+
+async def _read_last_pipeline_lsn(primary: AsyncEngine) -> Optional[str]:
+    """
+    Lee de etl_ultima_carga la posición del WAL de la última carga (None si aún no hay cargas).
+    """
+    global _last_pipeline_lsn
+    async with primary.connect() as connection:
+        lsn = (await connection.execute(SQL_LAST_PIPELINE_LSN)).scalar()
+    with _lock:
+        _last_pipeline_lsn = lsn
+    return lsn
+
+
+def _must_check_replica(lsn: Optional[str]) -> bool:
+    """
+    La réplica solo se consulta cuando hay una carga que aún no se verificó.
+    """
+    with _lock:
+        return not (_replica_verified and _replica_verified_lsn == lsn)
+
+
+def _mark_replica_verified(lsn: Optional[str]) -> None:
+    global _replica_verified_lsn, _replica_verified
+    with _lock:
+        _replica_verified_lsn   = lsn
+        _replica_verified       = True
+
+
+async def _check_async_replica(replica: AsyncEngine, lsn: Optional[str]) -> bool:
+    async with replica.connect() as connection:
+        if lsn is None:
+            await connection.execute(text("SELECT 1"))
+            return True
+        return bool((await connection.execute(SQL_REPLICA_CAUGHT_UP, {"lsn": lsn})).scalar())
+
+
+async def choose_async_read_engine(primary: AsyncEngine, replica: Optional[AsyncEngine]) -> AsyncEngine:
+    """
+    Elige el engine para una lectura: la réplica si está al día con la última carga, si no el primario.
+
+    Contexto:
+    - Sin DB_READ_URL (replica=None) todo va al primario.
+    - La última carga se lee del primario (etl_ultima_carga, una fila) en cada elección: la guarda
+      cualquier proceso del ETL. Una vez que la réplica alcanzó esa carga no se vuelve a consultar
+      hasta la siguiente: en régimen normal la elección agrega solo esa lectura al primario.
+    - Si la réplica no responde, las lecturas van al primario durante REPLICA_RETRY_SECONDS.
+    - Con DB_READ_CONSISTENCY=wait la espera no bloquea el event loop.
+
+    Dónde se usa:
+    - get_async_db() en app/core/database/db.py.
+    """
+    if replica is None or _replica_is_down():
+        return primary
+
+    try:
+        lsn = await _read_last_pipeline_lsn(primary)
+    except Exception as e:
+        logger.warning("No se pudo leer la última carga del ETL, se lee del primario: %s", e)
+        return primary
+    if not _must_check_replica(lsn):
+        return replica
+
+    deadline = time.monotonic() + config.DB_READ_WAIT_TIMEOUT
+    try:
+        while True:
+            if await _check_async_replica(replica, lsn):
+                _mark_replica_verified(lsn)
+                return replica
+            if config.DB_READ_CONSISTENCY != "wait" or time.monotonic() >= deadline:
+                return primary
+            await asyncio.sleep(REPLICA_POLL_SECONDS)
+    except Exception as e:
+        _mark_replica_down(e)
+        return primary
+
+
+def get_replica_status() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "configured"            : bool(config.DB_READ_URL),
+            "consistency"           : config.DB_READ_CONSISTENCY,
+            "last_pipeline_lsn"     : _last_pipeline_lsn,
+            "replica_verified_lsn"  : _replica_verified_lsn if _replica_verified else None,
+            "replica_down"          : time.monotonic() < _replica_down_until,
+        }
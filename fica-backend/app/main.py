@@ -1,4 +1,7 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -6,12 +9,43 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.config import config
 from app.core.logging import setup_logging
+from app.core.database.db import (
+    async_engine,
+    async_read_engine,
+    get_etl_raw_connection,
+    get_pool_metrics,
+    probe_database,
+    probe_async_database,
+)
+from app.core.database.migrate import apply_pending_migrations
+from app.core.database.replica import get_replica_status
 from app.api.pipeline import router as pipeline_router
+from app.api.upload_limit import UploadSizeLimitMiddleware
 from app.api.kpi import router as kpi_router
 from app.api.tables import router as tables_router
 
 setup_logging()
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+def run_database_migrations():
+    with get_etl_raw_connection() as conn:
+        applied = apply_pending_migrations(conn)
+    logger.info("Migraciones aplicadas al iniciar: %s", applied or "ninguna pendiente")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migraciones pendientes del esquema (app/core/database/migrations); la API parte aunque fallen
+    if config.DB_MIGRATE_ON_STARTUP:
+        try:
+            await run_in_threadpool(run_database_migrations)
+        except Exception:
+            logger.exception("No se pudieron aplicar las migraciones al iniciar")
+    yield
+    await async_engine.dispose()
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS - MUST be before routes
 allowed_origins = [
@@ -28,6 +62,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Upload size (UPLOAD_MAX_BYTES) enforced while the body is received, before it is spooled to disk
+app.add_middleware(UploadSizeLimitMiddleware, paths=["/api/pipeline/run"])
+
 # Helper function to get origin header
 def get_origin_header(request: Request):
     origin = request.headers.get("origin", "")
@@ -83,6 +120,22 @@ async def general_exception_handler(request: Request, exc: Exception):
 async def health_check():
     return {"status": "healthy"}
 
+# Database health: probe each pool (SELECT 1) and report pool metrics
+# A down read replica does not make the API unhealthy: reads fall back to the primary
+@app.get("/health/database")
+async def database_health_check():
+    probes  = {**await run_in_threadpool(probe_database), **await probe_async_database()}
+    healthy = all(probe["ok"] for name, probe in probes.items() if not name.endswith("_read"))
+    return JSONResponse(
+        status_code=200 if healthy else 503,
+        content={
+            "status"    : "healthy" if healthy else "unhealthy",
+            "probes"    : probes,
+            "pools"     : get_pool_metrics(),
+            "replica"   : get_replica_status(),
+        },
+    )
+
 app.include_router(
     pipeline_router,
     prefix="/api/pipeline",
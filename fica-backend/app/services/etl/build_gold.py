@@ -1,30 +1,26 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Any, Dict
 import pandas as pd
 
 from app.services.etl.gold_utils import (
-    add_student_identity_columns,
-    add_puntaje_ingreso_column,
-    add_period_and_grade_columns,
+    build_normalized_gold_frame,
     compute_promedio_nota_b1,
     build_base_student_table,
-    add_ramos_normalized_columns,
     filter_valid_rows_for_ramos,
     count_unique_ramos_by_student,
-    normalize_columns_for_aprueba8,
-    add_bimestre_key_column,
+    filter_valid_rows_for_aprueba8,
     compute_first_4_bimestres_targets,
     evaluate_aprueba8_by_student,
 )
 
 
-def build_gold_kpi_b1_student(dataframe_silver_student_rows: pd.DataFrame) -> pd.DataFrame:
+def build_gold_kpi_b1_student(dataframe_normalizado: pd.DataFrame) -> pd.DataFrame:
     """
     Construye la tabla Gold: gold_kpi_b1_student.
 
     Contexto:
-    - ETL Silver → Gold (sobre el DataFrame df3 que sale del pipeline).
+    - ETL Silver → Gold (sobre el frame normalizado que arma build_all_gold a partir de df3).
     - Esta tabla reduce joins posteriores: deja 1 fila por estudiante con variables de ingreso
       y la nota promedio del primer bimestre.
 
@@ -34,16 +30,11 @@ def build_gold_kpi_b1_student(dataframe_silver_student_rows: pd.DataFrame) -> pd
     Dónde se usa:
     - Se invoca desde el pipeline ETL cuando se quiera generar/insertar la capa Gold.
     """
-    # ------ Normalización base ------
-    dataframe_con_identidad         = add_student_identity_columns(dataframe_silver_student_rows)
-    dataframe_con_puntaje           = add_puntaje_ingreso_column(dataframe_con_identidad)
-    dataframe_con_periodo_y_nota    = add_period_and_grade_columns(dataframe_con_puntaje)
-
     # ------ Nota 1er bimestre ------
-    dataframe_promedio_nota_b1      = compute_promedio_nota_b1(dataframe_con_periodo_y_nota)
+    dataframe_promedio_nota_b1      = compute_promedio_nota_b1(dataframe_normalizado)
 
     # ------ Base por estudiante + merge ------
-    dataframe_base_estudiantes      = build_base_student_table(dataframe_con_periodo_y_nota)
+    dataframe_base_estudiantes      = build_base_student_table(dataframe_normalizado)
 
     dataframe_gold_kpi_b1_student   = dataframe_base_estudiantes.merge(
         dataframe_promedio_nota_b1,
@@ -66,7 +57,7 @@ def build_gold_kpi_b1_student(dataframe_silver_student_rows: pd.DataFrame) -> pd
     return dataframe_gold_kpi_b1_student
 
 
-def build_gold_kpi_student_ramos(dataframe_silver_student_rows: pd.DataFrame) -> pd.DataFrame:
+def build_gold_kpi_student_ramos(dataframe_normalizado: pd.DataFrame) -> pd.DataFrame:
     """
     Construye la tabla Gold: gold_kpi_student_ramos.
 
@@ -80,11 +71,8 @@ def build_gold_kpi_student_ramos(dataframe_silver_student_rows: pd.DataFrame) ->
     Dónde se usa:
     - Se invoca desde el pipeline ETL cuando se quiera generar/insertar la capa Gold.
     """
-    # ------ Normalización ------
-    dataframe_con_columnas_ramos = add_ramos_normalized_columns(dataframe_silver_student_rows)
-
     # ------ Filtrado ------
-    dataframe_valido = filter_valid_rows_for_ramos(dataframe_con_columnas_ramos)
+    dataframe_valido = filter_valid_rows_for_ramos(dataframe_normalizado)
 
     # ------ Conteo ------
     dataframe_conteo_ramos              = count_unique_ramos_by_student(dataframe_valido)
@@ -98,7 +86,7 @@ def build_gold_kpi_student_ramos(dataframe_silver_student_rows: pd.DataFrame) ->
     return dataframe_gold_kpi_student_ramos
 
 
-def build_gold_kpi_student_aprueba8(dataframe_silver_student_rows: pd.DataFrame) -> pd.DataFrame:
+def build_gold_kpi_student_aprueba8(dataframe_normalizado: pd.DataFrame) -> pd.DataFrame:
     """
     Construye la tabla Gold: gold_kpi_student_aprueba8.
 
@@ -113,16 +101,15 @@ def build_gold_kpi_student_aprueba8(dataframe_silver_student_rows: pd.DataFrame)
     Dónde se usa:
     - Se invoca desde el pipeline ETL cuando se quiera generar/insertar la capa Gold.
     """
-    # ------ Normalización ------
-    dataframe_columnas_aprueba8     = normalize_columns_for_aprueba8(dataframe_silver_student_rows)
-    dataframe_con_clave_bimestre    = add_bimestre_key_column(dataframe_columnas_aprueba8)
+    # ------ Filtrado ------
+    dataframe_valido = filter_valid_rows_for_aprueba8(dataframe_normalizado)
 
     # ------ Targets 4 bimestres ------
-    targets_por_cohorte = compute_first_4_bimestres_targets(dataframe_con_clave_bimestre)
+    targets_por_cohorte = compute_first_4_bimestres_targets(dataframe_valido)
 
     # ------ Evaluación ------
     dataframe_resultado_aprueba8    = evaluate_aprueba8_by_student(
-        dataframe_con_clave_bimestre,
+        dataframe_valido,
         targets_por_cohorte,
     )
 
@@ -145,16 +132,21 @@ def build_all_gold(dataframe_silver_student_rows: pd.DataFrame) -> Dict[str, pd.
     - Este método es el “orquestador” de la construcción de tablas Gold en memoria.
 
     Para qué:
-    - Entregar un diccionario {nombre_tabla: dataframe} listo para insertar en DB
-      (en el siguiente paso: populate_gold.py).
+    - Entregar un diccionario {nombre_tabla: dataframe} con las tablas Gold calculadas en memoria.
+      En la DB, Gold se calcula con SQL sobre el modelo base (build_gold_sql.py).
+    - Normaliza el DataFrame Silver una sola vez (build_normalized_gold_frame) y lo comparte
+      entre los tres builders, sin copias ni conversiones repetidas.
 
     Dónde se usa:
-    - Se invoca desde el pipeline ETL cuando se quiera recalcular toda la capa Gold.
+    - dry_run_on_silver() en app/services/pipeline.py: vista previa de Gold sin escribir en la DB.
     """
+    # ------ Normalización compartida (una sola vez) ------
+    dataframe_normalizado = build_normalized_gold_frame(dataframe_silver_student_rows)
+
     # ------ Construcción de tablas Gold ------
-    dataframe_gold_kpi_b1_student       = build_gold_kpi_b1_student(dataframe_silver_student_rows)
-    dataframe_gold_kpi_student_ramos    = build_gold_kpi_student_ramos(dataframe_silver_student_rows)
-    dataframe_gold_kpi_student_aprueba8 = build_gold_kpi_student_aprueba8(dataframe_silver_student_rows)
+    dataframe_gold_kpi_b1_student       = build_gold_kpi_b1_student(dataframe_normalizado)
+    dataframe_gold_kpi_student_ramos    = build_gold_kpi_student_ramos(dataframe_normalizado)
+    dataframe_gold_kpi_student_aprueba8 = build_gold_kpi_student_aprueba8(dataframe_normalizado)
 
     result = {
         "gold_kpi_b1_student"       : dataframe_gold_kpi_b1_student,
@@ -162,3 +154,53 @@ def build_all_gold(dataframe_silver_student_rows: pd.DataFrame) -> Dict[str, pd.
         "gold_kpi_student_aprueba8" : dataframe_gold_kpi_student_aprueba8,
     }
     return result
+
+
+def build_gold_kpi_preview(gold_tables: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+    """
+    Calcula, por cohorte, una vista previa de los KPIs que salen directo de las tablas Gold.
+
+    Qué hace (mismas definiciones que app/services/kpi, sobre los DataFrames de build_all_gold):
+    - E: estudiantes de la cohorte (filas de gold_kpi_b1_student).
+    - nota_b1_promedio: promedio de nota_b1 (base de los KPIs 1.2.x, 1.3, 1.7 y 1.8).
+    - KPI 1.1: desviacion_promedio_ramos = promedio de (total_ramos - 4), sin ramos = 0.
+    - KPI 1.4: N_aprueban_8 y tasa_aprobacion (% sobre E).
+    - KPI 1.5: N_no_completan (total_ramos < 4) y tasa_desercion (% sobre E).
+
+    Contexto:
+    - Refleja solo el archivo: en la DB el KPI también cuenta lo que ya estaba cargado.
+      Tampoco aplica las restricciones de cohorte de los KPIs 1.4 / 1.5.
+
+    Dónde se usa:
+    - dry_run_on_silver() en app/services/pipeline.py (POST /api/pipeline/run?dry_run=true).
+    """
+    dataframe_b1        = gold_tables["gold_kpi_b1_student"]
+    dataframe_ramos     = gold_tables["gold_kpi_student_ramos"]
+    dataframe_aprueba8  = gold_tables["gold_kpi_student_aprueba8"]
+
+    # ------ total_ramos por estudiante de la cohorte (sin ramos válidos = 0, como el LEFT JOIN de KPI 1.1) ------
+    dataframe_estudiantes = dataframe_b1[["cohorte", "id_estudiante", "nota_b1"]].merge(
+        dataframe_ramos,
+        on  = ["cohorte", "id_estudiante"],
+        how = "left",
+    )
+    dataframe_estudiantes["total_ramos"] = dataframe_estudiantes["total_ramos"].fillna(0)
+
+    preview = {}
+    for cohorte, dataframe_cohorte in dataframe_estudiantes.groupby("cohorte"):
+        E               = len(dataframe_cohorte)
+        aprueba8        = dataframe_aprueba8.loc[dataframe_aprueba8["cohorte"] == cohorte, "aprueba_8"]
+        N_aprueban_8    = int((aprueba8 == True).sum())
+        N_no_completan  = int((dataframe_ramos.loc[dataframe_ramos["cohorte"] == cohorte, "total_ramos"] < 4).sum())
+        nota_b1         = dataframe_cohorte["nota_b1"].mean()
+
+        preview[str(int(cohorte))] = {
+            "E"                             : E,
+            "nota_b1_promedio"              : None if pd.isna(nota_b1) else round(float(nota_b1), 4),
+            "desviacion_promedio_ramos"     : round(float((dataframe_cohorte["total_ramos"] - 4).mean()), 4),
+            "N_aprueban_8"                  : N_aprueban_8,
+            "tasa_aprobacion"               : round(N_aprueban_8 / E * 100, 4),
+            "N_no_completan"                : N_no_completan,
+            "tasa_desercion"                : round(N_no_completan / E * 100, 4),
+        }
+    return preview
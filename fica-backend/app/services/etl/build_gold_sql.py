@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+
+# Las lecturas de rendimiento_ramo de una cohorte llevan r.anio >= cohorte: un estudiante no tiene
+# notas anteriores a su año de ingreso, y el filtro sobre la clave de partición (anio) deja fuera
+# las particiones de años anteriores (partition pruning). Sin cohorte se leen todas.
+# nota_final IS NOT NULL deja fuera solo las notas vacías: una nota 0 se carga como 0 (populate_database.py)
+# y cuenta en nota_b1 y en aprueba_8, igual que en los builders pandas (build_gold.py).
+
+# SQL Gold: gold_kpi_b1_student
+SQL_INSERT_GOLD_KPI_B1_STUDENT = """
+    INSERT INTO gold_kpi_b1_student (
+        cohorte,
+        id_estudiante,
+        tipo_prueba,
+        puntaje_ingreso,
+        diagnostico,
+        nota_b1
+    )
+    SELECT
+        e.anio_ingreso,
+        e.id_estudiante,
+        e.tipo_prueba,
+        CASE e.tipo_prueba
+            WHEN 'PAES' THEN paes_estudiante.prom_m1_clectora
+            WHEN 'PDT'  THEN pdt_estudiante.prom_leng_mat
+        END::double precision,
+        e.prueba_diagnostico_matematica::double precision,
+        nota_b1_estudiante.nota_b1
+    FROM estudiantes e
+    LEFT JOIN (
+        SELECT DISTINCT ON (id_estudiante) id_estudiante, prom_m1_clectora
+        FROM paes
+        ORDER BY id_estudiante, anio_examen DESC NULLS LAST
+    ) paes_estudiante
+        ON paes_estudiante.id_estudiante = e.id_estudiante
+    LEFT JOIN (
+        SELECT DISTINCT ON (id_estudiante) id_estudiante, prom_leng_mat
+        FROM pdt
+        ORDER BY id_estudiante, anio_examen DESC NULLS LAST
+    ) pdt_estudiante
+        ON pdt_estudiante.id_estudiante = e.id_estudiante
+    LEFT JOIN (
+        SELECT
+            r.id_estudiante,
+            AVG(r.nota_final)::double precision AS nota_b1
+        FROM rendimiento_ramo r
+        JOIN bimestres b ON b.id_bimestre = r.id_bimestre
+        JOIN semestres s ON s.id_semestre = b.id_semestre
+        WHERE s.numero = 1
+          AND b.numero = 1
+          AND r.nota_final IS NOT NULL
+          AND (%(cohorte)s IS NULL OR r.anio >= %(cohorte)s)
+        GROUP BY r.id_estudiante
+    ) nota_b1_estudiante
+        ON nota_b1_estudiante.id_estudiante = e.id_estudiante
+    WHERE (%(cohorte)s IS NULL OR e.anio_ingreso = %(cohorte)s)
+"""
+
+
+# SQL Gold: gold_kpi_student_ramos
+SQL_INSERT_GOLD_KPI_STUDENT_RAMOS = """
+    INSERT INTO gold_kpi_student_ramos (
+        cohorte,
+        id_estudiante,
+        total_ramos
+    )
+    SELECT
+        e.anio_ingreso,
+        e.id_estudiante,
+        COUNT(*)::int
+    FROM rendimiento_ramo r
+    JOIN estudiantes e ON e.id_estudiante = r.id_estudiante
+    WHERE (%(cohorte)s IS NULL OR e.anio_ingreso = %(cohorte)s)
+      AND (%(cohorte)s IS NULL OR r.anio >= %(cohorte)s)
+    GROUP BY e.anio_ingreso, e.id_estudiante
+"""
+
+
+# SQL Gold: gold_kpi_student_aprueba8
+SQL_INSERT_GOLD_KPI_STUDENT_APRUEBA8 = """
+    WITH notas_por_bimestre AS (
+        SELECT
+            e.anio_ingreso                  AS cohorte,
+            r.id_estudiante,
+            s.numero                        AS semestre,
+            b.numero                        AS bimestre,
+            (s.numero * 10) + b.numero      AS clave_bimestre,
+            r.nota_final
+        FROM rendimiento_ramo r
+        JOIN estudiantes e ON e.id_estudiante = r.id_estudiante
+        JOIN bimestres b   ON b.id_bimestre   = r.id_bimestre
+        JOIN semestres s   ON s.id_semestre   = b.id_semestre
+        WHERE r.nota_final IS NOT NULL
+          AND (%(cohorte)s IS NULL OR e.anio_ingreso = %(cohorte)s)
+          AND (%(cohorte)s IS NULL OR r.anio >= %(cohorte)s)
+    ),
+    targets_por_cohorte AS (
+        SELECT cohorte, clave_bimestre
+        FROM (
+            SELECT
+                cohorte,
+                clave_bimestre,
+                ROW_NUMBER() OVER (PARTITION BY cohorte ORDER BY semestre, bimestre) AS posicion
+            FROM (
+                SELECT DISTINCT cohorte, semestre, bimestre, clave_bimestre
+                FROM notas_por_bimestre
+            ) bimestres_cohorte
+        ) bimestres_ordenados
+        WHERE posicion <= 4
+    ),
+    total_targets AS (
+        SELECT cohorte, COUNT(*) AS total
+        FROM targets_por_cohorte
+        GROUP BY cohorte
+    ),
+    resumen_estudiante AS (
+        SELECT
+            n.cohorte,
+            n.id_estudiante,
+            COUNT(DISTINCT n.clave_bimestre) FILTER (WHERE t.clave_bimestre IS NOT NULL) AS bimestres_presentes,
+            MIN(n.nota_final)                FILTER (WHERE t.clave_bimestre IS NOT NULL) AS nota_minima
+        FROM notas_por_bimestre n
+        LEFT JOIN targets_por_cohorte t
+            ON t.cohorte = n.cohorte
+            AND t.clave_bimestre = n.clave_bimestre
+        GROUP BY n.cohorte, n.id_estudiante
+    )
+    INSERT INTO gold_kpi_student_aprueba8 (
+        cohorte,
+        id_estudiante,
+        aprueba_8
+    )
+    SELECT
+        re.cohorte,
+        re.id_estudiante,
+        COALESCE(
+            tt.total = 4
+            AND re.bimestres_presentes = 4
+            AND re.nota_minima >= 4.0,
+            FALSE
+        )
+    FROM resumen_estudiante re
+    LEFT JOIN total_targets tt ON tt.cohorte = re.cohorte
+"""
+
+
+# SQL Gold: seguimiento por cohorte
+SQL_UPSERT_GOLD_COHORTE = """
+    INSERT INTO gold_cohortes (cohorte, total_estudiantes, fecha_actualizacion)
+    VALUES (%s, %s, now())
+    ON CONFLICT (cohorte)
+    DO UPDATE SET
+        total_estudiantes   = EXCLUDED.total_estudiantes,
+        fecha_actualizacion = EXCLUDED.fecha_actualizacion
+"""
+
+SQL_INSERT_GOLD_COHORTES_ALL = """
+    INSERT INTO gold_cohortes (cohorte, total_estudiantes, fecha_actualizacion)
+    SELECT cohorte, COUNT(*), now()
+    FROM gold_kpi_b1_student
+    GROUP BY cohorte
+"""
+
+
+GOLD_SQL_BY_TABLE = {
+    "gold_kpi_b1_student"       : SQL_INSERT_GOLD_KPI_B1_STUDENT,
+    "gold_kpi_student_ramos"    : SQL_INSERT_GOLD_KPI_STUDENT_RAMOS,
+    "gold_kpi_student_aprueba8" : SQL_INSERT_GOLD_KPI_STUDENT_APRUEBA8,
+}
+
+
+def rebuild_gold_table_sql(cursor, table_name: str, cohorte: Optional[int] = None) -> int:
+    """
+    Reconstruye una tabla Gold dentro de PostgreSQL (DELETE + INSERT ... SELECT).
+
+    Contexto:
+    - Equivalente SQL de build_gold.py (Gold en memoria): las filas nunca pasan por Python.
+    - Si se entrega cohorte, solo se reconstruye esa partición (filas con ese cohorte);
+      si es None, se reconstruye la tabla completa.
+
+    Para qué:
+    - Recalcular Gold desde las tablas base ya cargadas (estudiantes, rendimiento_ramo,
+      bimestres, semestres, paes, pdt), por ejemplo tras una carga parcial o un cambio de esquema.
+
+    Dónde:
+    - Usado por rebuild_all_gold_sql() y refresh_gold_cohorte_sql() en este archivo.
+    """
+    parametros = {"cohorte": cohorte}
+    cursor.execute(
+        f"DELETE FROM {table_name} WHERE (%(cohorte)s IS NULL OR cohorte = %(cohorte)s)",
+        parametros,
+    )
+    cursor.execute(GOLD_SQL_BY_TABLE[table_name], parametros)
+    return cursor.rowcount
+
+
+def rebuild_all_gold_tables_sql(cursor) -> Dict[str, int]:
+    """
+    Reconstruye todas las tablas Gold y gold_cohortes sobre el cursor dado, sin hacer commit.
+
+    Dónde:
+    - Usado por rebuild_all_gold_sql() en este archivo y por la recarga completa
+      (app/services/etl/full_reload.py), que lo ejecuta dentro de su propia transacción.
+    """
+    summary = {}
+    for table_name in GOLD_SQL_BY_TABLE:
+        summary[table_name] = rebuild_gold_table_sql(cursor, table_name)
+    cursor.execute("DELETE FROM gold_cohortes")
+    cursor.execute(SQL_INSERT_GOLD_COHORTES_ALL)
+    return summary
+
+
+def rebuild_all_gold_sql(conn) -> Dict[str, Any]:
+    """
+    Reconstruye todas las tablas Gold con SQL set-based en una sola transacción.
+
+    Contexto:
+    - Misma semántica que build_all_gold(), pero calculada sobre el modelo base en DB.
+    - Los valores vienen ya limpios por populate_database.py (por ejemplo, puntajes 0 quedan NULL).
+
+    Para qué:
+    - Permitir reconstruir la capa Gold sin volver a subir el archivo.
+      Si algo falla se hace rollback y Gold queda como estaba.
+
+    Dónde se usa:
+    - Llamado por rebuild_gold_from_database() en app/services/pipeline.py
+      (endpoint POST /api/pipeline/gold/rebuild).
+    """
+    cursor = conn.cursor()
+    try:
+        summary = rebuild_all_gold_tables_sql(cursor)
+        conn.commit()
+        return summary
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def refresh_gold_cohorte_sql(conn, cohorte: int) -> Dict[str, int]:
+    """
+    Reconstruye la partición Gold de una sola cohorte, en una transacción propia.
+
+    Qué hace:
+    - Para cada tabla Gold: DELETE de las filas de la cohorte + INSERT ... SELECT desde el modelo base.
+    - Registra la actualización en gold_cohortes (fecha y total de estudiantes).
+
+    Para qué:
+    - Mantener Gold por cohorte: las filas de estudiantes que ya no están en la base
+      desaparecen y las demás cohortes no se tocan.
+
+    Dónde:
+    - Usado por refresh_gold_by_cohort() en este archivo.
+    """
+    cursor = conn.cursor()
+    try:
+        summary = {}
+        for table_name in GOLD_SQL_BY_TABLE:
+            summary[table_name] = rebuild_gold_table_sql(cursor, table_name, cohorte)
+        cursor.execute(
+            SQL_UPSERT_GOLD_COHORTE,
+            (cohorte, summary["gold_kpi_b1_student"]),
+        )
+        conn.commit()
+        return summary
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def refresh_gold_by_cohort(conn, cohortes: Iterable[int]) -> Dict[str, Any]:
+    """
+    Reconstruye solo las cohortes tocadas por una carga (una transacción por cohorte).
+
+    Contexto:
+    - Se ejecuta después de populate_all(), cuando el modelo base ya contiene la carga nueva.
+      Gold se recalcula desde la DB, así que una carga parcial (por ejemplo, un solo bimestre)
+      produce los mismos totales que haber subido todo el histórico de la cohorte.
+
+    Para qué:
+    - Evitar reescribir toda la capa Gold en cada carga.
+
+    Dónde se usa:
+    - Llamado por run_pipeline_on_dataframe() en app/services/pipeline.py.
+    """
+    cohortes_ordenadas  = sorted({int(cohorte) for cohorte in cohortes})
+    summary: Dict[str, Any] = {table_name: 0 for table_name in GOLD_SQL_BY_TABLE}
+
+    for cohorte in cohortes_ordenadas:
+        summary_cohorte = refresh_gold_cohorte_sql(conn, cohorte)
+        for table_name, filas in summary_cohorte.items():
+            summary[table_name] += filas
+
+    summary["cohortes_actualizadas"] = cohortes_ordenadas
+    return summary
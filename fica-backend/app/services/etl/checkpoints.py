@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import config
+
+
+# Etapas de una ejecución, en orden. Silver queda en el artefacto Parquet (silver_cache.py);
+# base y gold son cargas en la DB; registro es carga_csv + posición del WAL.
+PIPELINE_STAGES = ("silver", "base", "gold", "registro")
+
+RUN_STATUSES = ("running", "failed", "completed")
+
+_lock = threading.RLock()
+
+# Ejecuciones en curso en este proceso (run_id -> checkpoint): el hilo de heartbeat las mantiene vivas
+_active_runs: Dict[str, Dict[str, Any]] = {}
+
+_heartbeat_thread: Optional[threading.Thread] = None
+
+# Un lock de reanudación más antiguo que esto quedó de un proceso caído a mitad del reclamo
+CLAIM_STALE_SECONDS = 60
+
+
+class PipelineRunNotFoundError(LookupError):
+    """
+    No existe un checkpoint con ese run_id.
+    """
+
+
+class PipelineRunNotResumableError(ValueError):
+    """
+    La ejecución ya terminó o falta su artefacto Silver (hay que volver a subir el archivo).
+    """
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _run_path(run_id: str) -> Path:
+    return Path(config.PIPELINE_CHECKPOINT_DIR) / f"{run_id}.json"
+
+
+def _write_run(run: Dict[str, Any]) -> None:
+    """
+    Escribe el checkpoint a un temporal y lo renombra: nunca queda un JSON a medias.
+    """
+    path        = _run_path(run["run_id"])
+    temp_path   = path.with_suffix(".tmp")
+    with _lock:
+        run["updated_at"] = _now()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(json.dumps(run, default=str, ensure_ascii=False), encoding="utf-8")
+        os.replace(temp_path, path)
+
+
+def _owner() -> Dict[str, Any]:
+    return {"host": socket.gethostname(), "pid": os.getpid(), "heartbeat_at": _now()}
+
+
+def _heartbeat_loop() -> None:
+    while True:
+        time.sleep(config.PIPELINE_CHECKPOINT_HEARTBEAT_SECONDS)
+        with _lock:
+            for run in list(_active_runs.values()):
+                run["owner"]["heartbeat_at"] = _now()
+                _write_run(run)
+
+
+def _track_active(run: Dict[str, Any]) -> None:
+    """
+    Registra la ejecución como propia de este proceso y arranca el hilo de heartbeat (uno por proceso).
+    """
+    global _heartbeat_thread
+    with _lock:
+        _active_runs[run["run_id"]] = run
+        if _heartbeat_thread is None:
+            _heartbeat_thread = threading.Thread(target=_heartbeat_loop, name="checkpoint-heartbeat", daemon=True)
+            _heartbeat_thread.start()
+
+
+def owner_alive(run: Dict[str, Any]) -> bool:
+    """
+    True si la ejecución está en curso en algún proceso (esta API, otro worker de uvicorn,
+    la CLI o la carpeta vigilada, en este u otro host).
+
+    Contexto:
+    - El proceso dueño renueva owner.heartbeat_at cada PIPELINE_CHECKPOINT_HEARTBEAT_SECONDS mientras
+      la ejecución sigue en curso. Un checkpoint "running" sin heartbeat en
+      PIPELINE_CHECKPOINT_STALE_SECONDS quedó de un proceso caído y se puede reanudar.
+    """
+    if run["status"] != "running":
+        return False
+    if run["run_id"] in _active_runs:
+        return True
+    owner = run.get("owner")
+    if not owner:
+        return False
+    heartbeat_at = datetime.fromisoformat(owner["heartbeat_at"])
+    return (datetime.now(timezone.utc) - heartbeat_at).total_seconds() < config.PIPELINE_CHECKPOINT_STALE_SECONDS
+
+
+@contextmanager
+def _claim(run_id: str):
+    """
+    Exclusión entre procesos para revisar y tomar una ejecución: archivo <run_id>.claim creado con O_EXCL.
+    Solo dura lo que toma leer y reescribir el checkpoint.
+    """
+    claim_path = _run_path(run_id).with_suffix(".claim")
+    try:
+        fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            stale = time.time() - claim_path.stat().st_mtime > CLAIM_STALE_SECONDS
+        except FileNotFoundError:
+            stale = True
+        if not stale:
+            raise PipelineRunNotResumableError(f"La ejecución {run_id} se está reanudando en otro proceso")
+        claim_path.unlink(missing_ok=True)
+        fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    try:
+        os.close(fd)
+        yield
+    finally:
+        claim_path.unlink(missing_ok=True)
+
+
+def checkpoints_enabled() -> bool:
+    return bool(config.PIPELINE_CHECKPOINT_DIR)
+
+
+def start_run(upload: Dict[str, Any], mode: str, atomic: bool, summary_silver: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Crea el checkpoint de una ejecución con la etapa Silver ya completada.
+
+    Contexto:
+    - Se crea cuando Silver terminó y su artefacto quedó guardado: desde ahí se puede reanudar
+      sin volver a leer el archivo.
+    - Vive en disco (PIPELINE_CHECKPOINT_DIR) y no en la DB: una falla de la DB se registra igual,
+      y una carga atómica no lo mueve con el swap de esquemas.
+    - owner (host, pid, heartbeat) identifica al proceso que la ejecuta (ver owner_alive).
+    """
+    run = {
+        "run_id"            : f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}",
+        "status"            : "running",
+        "nombre_archivo"    : upload["nombre_archivo"],
+        "sha256"            : upload["sha256"],
+        "hoja"              : upload.get("hoja"),
+        "mode"              : mode,
+        "atomic"            : atomic,
+        "started_at"        : _now(),
+        "error"             : None,
+        "resumes"           : 0,
+        "stages"            : {"silver": {"completed_at": _now(), "summary": summary_silver}},
+        "tables"            : {},
+        "owner"             : _owner(),
+    }
+    _write_run(run)
+    _track_active(run)
+    prune_runs()
+    return run
+
+
+def resume_run(run: Dict[str, Any]) -> Optional[str]:
+    """
+    Toma una ejecución fallida (o de un proceso caído) para este proceso y devuelve la etapa desde la que sigue.
+
+    Contexto:
+    - El checkpoint se vuelve a leer de disco dentro de _claim(): dos procesos que reanudan a la vez
+      no pueden tomar la misma ejecución, y una en curso en otro proceso (owner_alive) no se reanuda.
+      run se actualiza en el lugar con el checkpoint leído.
+    """
+    with _claim(run["run_id"]):
+        current = load_run(run["run_id"])
+        if current["status"] == "completed":
+            raise PipelineRunNotResumableError(f"La ejecución {run['run_id']} ya se completó")
+        if owner_alive(current):
+            owner = current.get("owner") or {}
+            raise PipelineRunNotResumableError(
+                f"La ejecución {run['run_id']} está en curso (host {owner.get('host')}, pid {owner.get('pid')})"
+            )
+        run.clear()
+        run.update(current)
+        run["status"]   = "running"
+        run["resumes"]  += 1
+        run["owner"]    = _owner()
+        _write_run(run)
+    _track_active(run)
+    return next_stage(run)
+
+
+def mark_stage(run: Dict[str, Any], stage: str, summary: Any) -> None:
+    with _lock:
+        run["stages"][stage] = {"completed_at": _now(), "summary": summary}
+        _write_run(run)
+
+
+def mark_table(run: Dict[str, Any], table_name: str, inserted: Any, seconds: float) -> None:
+    """
+    Marca una tabla base como cargada (ya hizo commit en su propia conexión).
+    """
+    with _lock:
+        run["tables"][table_name] = {"completed_at": _now(), "inserted": inserted, "seconds": seconds}
+        _write_run(run)
+
+
+def mark_failed(run: Dict[str, Any], error: Exception) -> None:
+    with _lock:
+        run["status"]   = "failed"
+        run["error"]    = f"{type(error).__name__}: {error}"
+        _active_runs.pop(run["run_id"], None)
+        _write_run(run)
+
+
+def mark_completed(run: Dict[str, Any]) -> None:
+    with _lock:
+        run["status"]   = "completed"
+        run["error"]    = None
+        _active_runs.pop(run["run_id"], None)
+        _write_run(run)
+
+
+def next_stage(run: Dict[str, Any]) -> Optional[str]:
+    """
+    Primera etapa sin completar (None si están todas).
+    """
+    for stage in PIPELINE_STAGES:
+        if stage not in run["stages"]:
+            return stage
+    return None
+
+
+def load_run(run_id: str) -> Dict[str, Any]:
+    path = _run_path(run_id)
+    if not run_id or Path(run_id).name != run_id or not path.exists():
+        raise PipelineRunNotFoundError(f"No existe la ejecución {run_id}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def list_runs(status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Ejecuciones registradas (más reciente primero), sin los resúmenes de cada etapa.
+    """
+    checkpoint_dir = Path(config.PIPELINE_CHECKPOINT_DIR)
+    if not checkpoints_enabled() or not checkpoint_dir.is_dir():
+        return []
+    runs = []
+    for path in sorted(checkpoint_dir.glob("*.json"), reverse=True):
+        run = json.loads(path.read_text(encoding="utf-8"))
+        if status is not None and run["status"] != status:
+            continue
+        runs.append({
+            "run_id"            : run["run_id"],
+            "status"            : run["status"],
+            "nombre_archivo"    : run["nombre_archivo"],
+            "sha256"            : run["sha256"],
+            "mode"              : run["mode"],
+            "atomic"            : run["atomic"],
+            "next_stage"        : next_stage(run),
+            "tables"            : sorted(run["tables"]),
+            "error"             : run["error"],
+            "owner"             : run.get("owner"),
+            "started_at"        : run["started_at"],
+            "updated_at"        : run["updated_at"],
+        })
+    return runs
+
+
+def prune_runs(max_runs: Optional[int] = None) -> List[str]:
+    """
+    Borra las ejecuciones completadas más antiguas por sobre PIPELINE_CHECKPOINT_MAX_RUNS.
+    Las fallidas se conservan hasta reanudarlas.
+    """
+    max_runs    = config.PIPELINE_CHECKPOINT_MAX_RUNS if max_runs is None else max_runs
+    completed   = [
+        path for path in sorted(Path(config.PIPELINE_CHECKPOINT_DIR).glob("*.json"), reverse=True)
+        if json.loads(path.read_text(encoding="utf-8"))["status"] == "completed"
+    ]
+    removed = []
+    for path in completed[max_runs:]:
+        try:
+            path.unlink()
+            removed.append(path.stem)
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def clean_numeric_column(series: pd.Series, zero_as_missing: bool = False) -> pd.Series:
+    """
+    Limpia una columna numérica completa y la devuelve como float nullable (Float64).
+
+    Qué hace:
+    - Textos: recorta espacios y cambia coma decimal por punto ("4,5" -> 4.5).
+    - Vacíos, textos no parseables e Inf / -Inf quedan como <NA>.
+    - Con zero_as_missing=True, los ceros también quedan como <NA>
+      (en el archivo original un 0 en puntajes / NEM / ranking significa «sin dato»).
+
+    Para qué:
+    - Reemplazar las conversiones celda a celda (try/except por valor) por operaciones
+      de columna: str.replace + pd.to_numeric(errors="coerce") + máscaras.
+
+    Dónde:
+    - Consumido por populate_database.py (inserts base) y gold_utils.py (builders Gold).
+    """
+    if series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+        series_texto    = series.astype("string").str.strip().str.replace(",", ".", regex=False)
+        series_texto    = series_texto.mask(series_texto == "")
+        series_numerica = pd.to_numeric(series_texto, errors="coerce")
+    else:
+        series_numerica = pd.to_numeric(series, errors="coerce")
+
+    series_numerica = series_numerica.astype("Float64")
+    mascara_invalida = np.isinf(series_numerica.fillna(0.0))
+    if zero_as_missing:
+        mascara_invalida = mascara_invalida | (series_numerica == 0).fillna(False)
+    return series_numerica.mask(mascara_invalida)
+
+
+def clean_int_column(series: pd.Series) -> pd.Series:
+    """
+    Limpia una columna entera completa y la devuelve como entero nullable (Int64).
+
+    Qué hace:
+    - Igual que clean_numeric_column (sin tratar 0 como faltante) y trunca decimales
+      como int(float(x)): "1.0" -> 1, "2022" -> 2022.
+
+    Para qué:
+    - Normalizar claves (id_alumno, año, semestre, bimestre, año_ingreso) antes de comparar,
+      agrupar o insertar.
+
+    Dónde:
+    - Consumido por populate_database.py (inserts base) y gold_utils.py (builders Gold).
+    """
+    series_numerica = clean_numeric_column(series)
+    return np.trunc(series_numerica).astype("Int64")
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from io import StringIO
+import numpy as np
+import pandas as pd
+
+
+# Marcador NULL usado en el stream COPY (CSV). Distinto de "", así un texto vacío sigue siendo texto vacío.
+COPY_NULL_MARKER = r"\N"
+
+
+# Helpers comunes
+def _dataframe_to_copy_buffer(dataframe: pd.DataFrame, ordered_columns: list[str]) -> StringIO:
+    """
+    Serializa un DataFrame como CSV listo para COPY, en el orden exacto de columnas.
+
+    Contexto:
+    - Preparación para cursor.copy_expert() (COPY ... FROM STDIN).
+
+    Para qué:
+    - Garantizar que el orden de valores coincida con la tabla staging.
+    - NaN / NaT / <NA> se escriben como el marcador NULL de COPY, e Inf / -Inf se pasan a NaN
+      columna a columna antes de serializar: no hay conversión celda a celda en Python.
+
+    Dónde:
+    - Usado por copy_dataframe_to_table() en este archivo.
+    """
+    dataframe_ordered   = dataframe[ordered_columns]
+    numeric_cols        = dataframe_ordered.select_dtypes(include=[np.number]).columns
+
+    if len(numeric_cols) > 0:
+        dataframe_ordered = dataframe_ordered.assign(**{
+            col: dataframe_ordered[col].replace([np.inf, -np.inf], np.nan)
+            for col in numeric_cols
+        })
+
+    buffer = StringIO()
+    dataframe_ordered.to_csv(buffer, header=False, index=False, na_rep=COPY_NULL_MARKER)
+    buffer.seek(0)
+    return buffer
+
+
+def copy_dataframe_to_table(
+    cursor,
+    dataframe       : pd.DataFrame,
+    table_name      : str,
+    ordered_columns : list[str],
+) -> int:
+    """
+    Envía un DataFrame a una tabla existente con un solo COPY ... FROM STDIN.
+
+    Contexto:
+    - La tabla puede ser definitiva o temporal; las columnas que no vienen en ordered_columns
+      toman su DEFAULT.
+    - No hace commit: queda dentro de la transacción del llamador.
+
+    Dónde:
+    - Usado por la recarga completa (app/services/etl/full_reload.py) y por los staging de
+      app/services/etl/populate_database.py (bimestres y rendimiento).
+    """
+    columnas_sql = ", ".join(ordered_columns)
+    cursor.copy_expert(
+        f"""
+        COPY {table_name} ({columnas_sql})
+        FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL_MARKER}')
+        """,
+        _dataframe_to_copy_buffer(dataframe, ordered_columns),
+    )
+    return len(dataframe)
@@ -10,20 +10,13 @@ ALGEBRA_CLASSES = [
 def filter_out_algebra(df: pd.DataFrame):
     col_name            = df.columns[5]
     total_rows          = len(df)
-    calculus_classes    = []
-    removed_count       = 0
 
-    for row_index, row in df.iterrows():
-        course_name_raw     = row[col_name]
-        course_name         = str(course_name_raw).strip()
-        is_algebra_course   = course_name in ALGEBRA_CLASSES
+    # Máscara vectorizada sobre la columna de asignatura: df.loc conserva los dtypes del Bronze tipado
+    course_names        = df[col_name].astype("string").str.strip()
+    is_algebra_course   = course_names.isin(ALGEBRA_CLASSES).fillna(False).astype(bool)
+    removed_count       = int(is_algebra_course.sum())
 
-        if not is_algebra_course:
-            calculus_classes.append(row)
-        else:
-            removed_count += 1
-
-    df_filtered = pd.DataFrame(calculus_classes)
+    df_filtered = df.loc[~is_algebra_course]
     summary     = {
         "total_rows"    : total_rows,
         "removed_rows"  : removed_count,
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Tuple
+import pandas as pd
+
+from app.services.etl.populate_database import (
+    insert_asignaturas,
+    build_estudiantes_rows,
+    build_paes_rows,
+    build_pdt_rows,
+    build_periodos_rows,
+    copy_bimestres_to_staging,
+    copy_rendimiento_to_staging,
+    SQL_INSERT_BIMESTRES_FROM_STAGING,
+    SQL_INSERT_RENDIMIENTO_FROM_STAGING,
+    TABLE_LOADERS,
+)
+from app.services.etl.copy_load import copy_dataframe_to_table
+from app.services.etl.build_gold_sql import rebuild_all_gold_tables_sql, GOLD_SQL_BY_TABLE
+
+
+# Tablas que se vacían en modo replace (un solo TRUNCATE; PostgreSQL resuelve el orden de FKs).
+# asignaturas, lineas y linea_asignaturas no se tocan: las líneas se mantienen a mano
+# y dependen de los id_asignatura existentes. carga_csv es historial.
+REPLACE_TRUNCATE_TABLES = [
+    *GOLD_SQL_BY_TABLE,
+    "gold_cohortes",
+    "perfil_ingreso_academico_estudiante",
+    "rendimiento_ramo",
+    "paes",
+    "pdt",
+    "bimestres",
+    "semestres",
+    "estudiantes",
+]
+
+
+# Helpers: índices secundarios
+def _get_secondary_indexes(cursor, tables: List[str]) -> List[Tuple[str, str]]:
+    """
+    Devuelve (nombre, CREATE INDEX) de los índices que no respaldan una PK/UNIQUE.
+
+    Contexto:
+    - Se leen del esquema actual (current_schema()), así el modo replace también funciona
+      dentro del esquema shadow de la carga atómica.
+    - PK/UNIQUE se mantienen: las FKs dependen de ellas.
+    """
+    cursor.execute(
+        """
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema()
+          AND i.tablename = ANY(%s)
+          AND NOT EXISTS (
+              SELECT 1
+              FROM pg_constraint c
+              WHERE c.conname = i.indexname
+                AND c.connamespace = current_schema()::regnamespace
+          )
+        ORDER BY i.indexname
+        """,
+        (tables,),
+    )
+    return cursor.fetchall()
+
+
+def _copy_base_tables(cursor, df: pd.DataFrame) -> Tuple[Dict[str, int], Dict[str, float]]:
+    """
+    Carga el modelo base con COPY, en orden de claves foráneas.
+
+    Contexto:
+    - estudiantes / paes / pdt / semestres van directo a su tabla.
+    - bimestres y rendimiento_ramo pasan por una tabla staging con claves naturales
+      (año, semestre, código de asignatura, ...) y se resuelven a ids con un INSERT ... SELECT.
+    """
+    summary = {}
+    timings = {}
+
+    def timed(table_name, load):
+        start               = time.perf_counter()
+        summary[table_name] = load()
+        timings[table_name] = round(time.perf_counter() - start, 3)
+
+    estudiantes_df  = build_estudiantes_rows(df).dropna(subset=["id_estudiante"])
+    estudiantes_df  = estudiantes_df.drop_duplicates(subset=["id_estudiante"])
+    timed("estudiantes", lambda: copy_dataframe_to_table(
+        cursor, estudiantes_df, "estudiantes", list(estudiantes_df.columns),
+    ))
+
+    semestres_df = build_periodos_rows(df, ["año", "semestre"]).rename(
+        columns={"año": "anio", "semestre": "numero"}
+    )
+    timed("semestres", lambda: copy_dataframe_to_table(
+        cursor, semestres_df, "semestres", ["anio", "numero"],
+    ))
+
+    def load_bimestres() -> int:
+        copy_bimestres_to_staging(cursor, df)
+        cursor.execute(SQL_INSERT_BIMESTRES_FROM_STAGING)
+        return cursor.rowcount
+    timed("bimestres", load_bimestres)
+
+    for table_name, build_rows in (("paes", build_paes_rows), ("pdt", build_pdt_rows)):
+        exam_df = build_rows(df).dropna(subset=["id_estudiante"])
+        exam_df = exam_df.drop_duplicates(subset=["id_estudiante", "anio_examen"])
+        exam_df = exam_df[exam_df["id_estudiante"].isin(estudiantes_df["id_estudiante"])]
+        timed(table_name, lambda: copy_dataframe_to_table(
+            cursor, exam_df, table_name, list(exam_df.columns),
+        ))
+
+    def load_rendimiento() -> int:
+        copy_rendimiento_to_staging(cursor, df)
+        cursor.execute(SQL_INSERT_RENDIMIENTO_FROM_STAGING)
+        return cursor.rowcount
+    timed("rendimiento", load_rendimiento)
+
+    return summary, timings
+
+
+def replace_all(conn, df: pd.DataFrame) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Recarga completa (modo replace): vacía el modelo base y Gold y los vuelve a cargar con COPY.
+
+    Qué hace (una sola transacción):
+    - asignaturas: insert incremental (ON CONFLICT DO NOTHING), antes de la transacción,
+      para no romper linea_asignaturas.
+    - TRUNCATE ... RESTART IDENTITY de REPLACE_TRUNCATE_TABLES.
+    - Elimina los índices secundarios, carga con COPY, reconstruye Gold con SQL,
+      vuelve a crear los índices y ejecuta ANALYZE.
+
+    Para qué:
+    - Cargar un dataset completo sin el costo de los inserts fila a fila ni del mantenimiento
+      de índices por fila, y sin conservar notas antiguas (la carga incremental nunca
+      actualiza nota_final).
+    - Si algo falla se hace rollback y la DB queda como estaba. Mientras dura la transacción,
+      las lecturas de estas tablas esperan al commit (TRUNCATE toma un lock exclusivo).
+
+    Dónde se usa:
+    - run_pipeline_on_dataframe(..., mode="replace") en app/services/pipeline.py.
+    """
+    start_asignaturas       = time.perf_counter()
+    inserted_asignaturas    = insert_asignaturas(conn, df)
+    elapsed_asignaturas     = round(time.perf_counter() - start_asignaturas, 3)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"TRUNCATE {', '.join(REPLACE_TRUNCATE_TABLES)} RESTART IDENTITY"
+        )
+
+        secondary_indexes = _get_secondary_indexes(cursor, REPLACE_TRUNCATE_TABLES)
+        for index_name, _ in secondary_indexes:
+            cursor.execute(f"DROP INDEX {index_name}")
+
+        summary_base, timings = _copy_base_tables(cursor, df)
+
+        summary_gold = rebuild_all_gold_tables_sql(cursor)
+        cursor.execute("SELECT cohorte FROM gold_cohortes ORDER BY cohorte")
+        summary_gold["cohortes_actualizadas"] = [row[0] for row in cursor.fetchall()]
+
+        start_indexes = time.perf_counter()
+        # En tablas particionadas indexdef trae "ON ONLY": sin ONLY el índice se crea en todas las particiones
+        for _, index_definition in secondary_indexes:
+            cursor.execute(index_definition.replace(" ON ONLY ", " ON ", 1))
+        for table_name in REPLACE_TRUNCATE_TABLES:
+            cursor.execute(f"ANALYZE {table_name}")
+        timings["indices_y_analyze"] = round(time.perf_counter() - start_indexes, 3)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    summary_base["asignaturas"] = inserted_asignaturas
+    timings["asignaturas"]      = elapsed_asignaturas
+
+    # Mismo orden de claves que la carga incremental (TABLE_LOADERS)
+    summary_base = {table_name: summary_base[table_name] for table_name in TABLE_LOADERS}
+    summary_base["timings_seconds"] = {
+        table_name: timings[table_name] for table_name in [*TABLE_LOADERS, "indices_y_analyze"]
+    }
+    return summary_base, summary_gold
@@ -3,139 +3,91 @@ from __future__ import annotations
 from typing import Dict, Set
 import pandas as pd
 
-
-def convert_to_int_or_none(value):
-    """
-    Convierte un valor a int de forma tolerante.
-
-    Contexto:
-    - Se usa en el ETL (paso Silver → Gold) para normalizar columnas que vienen como texto
-      o float (por ejemplo, "1", 1.0, "2022").
-
-    Para qué:
-    - Evitar errores al comparar / agrupar (groupby) por columnas como cohorte, semestre, bimestre, id_alumno.
-
-    Dónde:
-    - Consumido por app/services/etl/build_gold.py (builders Gold)
-    """
-    if pd.isna(value):
-        return None
-    try:
-        return int(float(value))
-    except Exception:
-        return None
-
-
-def convert_to_float_or_none(value):
-    """
-    Convierte un valor a float de forma tolerante.
-
-    Contexto:
-    - Se usa en el ETL (paso Silver → Gold) para normalizar notas y puntajes.
-
-    Para qué:
-    - Evitar errores al calcular promedios, mínimos o correlaciones posteriores.
-
-    Dónde:
-    - Consumido por app/services/etl/build_gold.py (builders Gold)
-    """
-    if pd.isna(value):
-        return None
-    try:
-        return float(value)
-    except Exception:
-        return None
+from app.services.etl.cleaning import clean_numeric_column, clean_int_column
 
 
-# Helpers: columnas base estudiante
-def add_student_identity_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+# Helper: frame normalizado compartido
+def build_normalized_gold_frame(dataframe: pd.DataFrame) -> pd.DataFrame:
     """
-    Agrega y normaliza columnas base de identidad del estudiante.
+    Construye, una sola vez, el DataFrame tipado y normalizado que consumen todos los builders Gold.
 
     Qué hace:
-    - Crea:
-      - cohorte (desde año_ingreso)
-      - id_estudiante (desde id_alumno)
-      - tipo_prueba (PAES/PDT desde tipo_ingreso)
-      - diagnostico (desde diagnostico_matematica)
-
-    Para qué:
-    - Dejar un esqueleto por estudiante/cohorte que se reutiliza en varias tablas Gold.
-
-    Dónde:
-    - Se usa por build_gold_kpi_b1_student (tabla gold_kpi_b1_student)
-    - De forma indirecta soporta KPIs 1.2.x, 1.3, 1.6, 1.7, 1.8 porque todos parten
-      de cohorte + estudiante + predictores.
-
-    Contexto:
-    - ETL Silver → Gold (no toca DB aquí, solo prepara DataFrames).
-    """
-    dataframe_copy = dataframe.copy()
-
-    dataframe_copy["cohorte"]       = dataframe_copy["año_ingreso"].map(convert_to_int_or_none)
-    dataframe_copy["id_estudiante"] = dataframe_copy["id_alumno"].map(convert_to_int_or_none)
-
-    dataframe_copy["tipo_prueba"]   = None
-    series_tipo_prueba              = dataframe_copy["tipo_ingreso"].astype(str).str.upper()
-    dataframe_copy.loc[dataframe_copy["tipo_ingreso"].notna(), "tipo_prueba"] = series_tipo_prueba
-    dataframe_copy["diagnostico"]   = dataframe_copy["diagnostico_matematica"].map(convert_to_float_or_none)
-    return dataframe_copy
-
-
-def add_puntaje_ingreso_column(dataframe: pd.DataFrame) -> pd.DataFrame:
-    """
-    Agrega la columna puntaje_ingreso según el tipo de prueba (PAES o PDT).
-
-    Qué hace:
-    - Si tipo_prueba == "PAES"  : usa paes_promedio_m1_comprension_lectora
-    - Si tipo_prueba == "PDT"   :  usa pdt_promedio_matematicas_lenguaje
+    - Crea (con dtypes nullable Int64 / Float64):
+      - cohorte (desde año_ingreso), id_estudiante (desde id_alumno)
+      - tipo_prueba (PAES/PDT desde tipo_ingreso), diagnostico, puntaje_ingreso
+      - anio_academico_normalizado, semestre_normalizado, bimestre_normalizado, clave_bimestre
+      - nota_final_normalizada
+    - Conserva codigo_asignatura, modulo y nombre_asignatura para el conteo de ramos.
+    - Ceros como en populate_database.py: un 0 en diagnostico / puntajes es «sin dato» (<NA>),
+      una nota 0 se conserva. Así las filas coinciden con el SQL de build_gold_sql.py.
 
     Para qué:
-    - Unificar en una sola variable el predictor de ingreso definido en el PDF
-      para KPIs de correlación y perfiles.
+    - Evitar que cada builder copie el frame Silver completo y repita las mismas conversiones.
+      Los builders solo filtran / agrupan sobre este frame, sin copiarlo.
 
     Dónde:
-    - Se usa principalmente en build_gold_kpi_b1_student (gold_kpi_b1_student)
-    - Luego, KPIs 1.2.1 / 1.3 / 1.6 / 1.7 / 1.8 consumen esta columna desde Gold.
+    - Se construye en build_all_gold y se pasa a build_gold_kpi_b1_student,
+      build_gold_kpi_student_ramos y build_gold_kpi_student_aprueba8.
     """
-    dataframe_copy = dataframe.copy()
-    dataframe_copy["puntaje_ingreso"] = None
+    series_tipo_ingreso = dataframe["tipo_ingreso"]
+    series_tipo_prueba  = series_tipo_ingreso.astype(str).str.upper().where(series_tipo_ingreso.notna())
+
+    dataframe_normalizado = pd.DataFrame(
+        {
+            "cohorte"                       : clean_int_column(dataframe["año_ingreso"]),
+            "id_estudiante"                 : clean_int_column(dataframe["id_alumno"]),
+            "tipo_prueba"                   : series_tipo_prueba.astype(object),
+            "diagnostico"                   : clean_numeric_column(dataframe["diagnostico_matematica"], zero_as_missing=True),
+            "anio_academico_normalizado"    : clean_int_column(dataframe["año"]),
+            "semestre_normalizado"          : clean_int_column(dataframe["semestre"]),
+            "bimestre_normalizado"          : clean_int_column(dataframe["bimestre"]),
+            "nota_final_normalizada"        : clean_numeric_column(dataframe["nota_final"]),
+            "codigo_asignatura"             : dataframe["codigo_asignatura"],
+            "modulo"                        : dataframe["modulo"],
+            "nombre_asignatura"             : dataframe["nombre_asignatura"],
+        },
+        index=dataframe.index,
+    )
 
-    series_puntaje_paes = dataframe_copy["paes_promedio_m1_comprension_lectora"].map(convert_to_float_or_none)
-    series_puntaje_pdt  = dataframe_copy["pdt_promedio_matematicas_lenguaje"].map(convert_to_float_or_none)
+    # Clave simple por bimestre: semestre*10 + bimestre (ej: 1-1 => 11, 2-1 => 21).
+    dataframe_normalizado["clave_bimestre"] = (
+        (dataframe_normalizado["semestre_normalizado"] * 10) +
+        dataframe_normalizado["bimestre_normalizado"]
+    )
 
-    filtro_es_paes  = dataframe_copy["tipo_prueba"] == "PAES"
-    filtro_es_pdt   = dataframe_copy["tipo_prueba"] == "PDT"
+    # Predictor de ingreso: PAES usa promedio M1/C. Lectora; PDT usa promedio Mat/Lenguaje.
+    series_puntaje_paes = clean_numeric_column(dataframe["paes_promedio_m1_comprension_lectora"], zero_as_missing=True)
+    series_puntaje_pdt  = clean_numeric_column(dataframe["pdt_promedio_matematicas_lenguaje"], zero_as_missing=True)
+    filtro_es_paes      = (dataframe_normalizado["tipo_prueba"] == "PAES").to_numpy(dtype=bool)
+    filtro_es_pdt       = (dataframe_normalizado["tipo_prueba"] == "PDT").to_numpy(dtype=bool)
 
-    dataframe_copy.loc[filtro_es_paes, "puntaje_ingreso"]   = series_puntaje_paes[filtro_es_paes]
-    dataframe_copy.loc[filtro_es_pdt, "puntaje_ingreso"]    = series_puntaje_pdt[filtro_es_pdt]
-    return dataframe_copy
+    dataframe_normalizado["puntaje_ingreso"] = series_puntaje_paes.where(
+        filtro_es_paes,
+        series_puntaje_pdt.where(filtro_es_pdt),
+    )
+    return dataframe_normalizado
 
 
-def add_period_and_grade_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+def get_cohortes_in_dataframe(dataframe: pd.DataFrame) -> list[int]:
     """
-    Agrega columnas normalizadas de período académico y nota final.
+    Devuelve las cohortes (año_ingreso) presentes en el DataFrame Silver.
 
     Qué hace:
-    - Crea:
-      - semestre_normalizado
-      - bimestre_normalizado
-      - nota_final_normalizada
+    - Considera solo filas con id_alumno asignado (las mismas que llegan a la DB).
 
     Para qué:
-    - Facilitar filtros como primer bimestre y cálculos como promedio/mínimo de notas.
+    - Saber qué particiones Gold toca una carga, para refrescar solo esas cohortes.
 
     Dónde:
-    - Se usa en compute_promedio_nota_b1 (gold_kpi_b1_student)
+    - Consumido por run_pipeline_on_dataframe (app/services/pipeline.py)
     """
-    dataframe_copy = dataframe.copy()
-
-    dataframe_copy["semestre_normalizado"]      = dataframe_copy["semestre"].map(convert_to_int_or_none)
-    dataframe_copy["bimestre_normalizado"]      = dataframe_copy["bimestre"].map(convert_to_int_or_none)
-    dataframe_copy["nota_final_normalizada"]    = dataframe_copy["nota_final"].map(convert_to_float_or_none)
-    return dataframe_copy
+    series_id_estudiante    = clean_int_column(dataframe["id_alumno"])
+    series_cohorte          = clean_int_column(dataframe["año_ingreso"])
+    cohortes                = series_cohorte[series_id_estudiante.notna()].dropna().unique()
+    return sorted(int(cohorte) for cohorte in cohortes)
 
 
+# Helpers: nota B1 por estudiante
 def compute_promedio_nota_b1(dataframe: pd.DataFrame) -> pd.DataFrame:
     """
     Calcula la nota promedio del primer bimestre (B1) por estudiante y cohorte.
@@ -153,14 +105,12 @@ def compute_promedio_nota_b1(dataframe: pd.DataFrame) -> pd.DataFrame:
     Dónde:
     - Consumido por build_gold_kpi_b1_student (tabla gold_kpi_b1_student)
     """
-    dataframe_copy = dataframe.copy()
+    filtro_primer_bimestre = (
+        (dataframe["semestre_normalizado"] == 1) &
+        (dataframe["bimestre_normalizado"] == 1)
+    ).fillna(False)
 
-    dataframe_primer_bimestre = dataframe_copy[
-        (dataframe_copy["semestre_normalizado"] == 1) &
-        (dataframe_copy["bimestre_normalizado"] == 1)
-    ].copy()
-
-    dataframe_primer_bimestre = dataframe_primer_bimestre.dropna(
+    dataframe_primer_bimestre = dataframe.loc[filtro_primer_bimestre].dropna(
         subset=["cohorte", "id_estudiante", "nota_final_normalizada"]
     )
 
@@ -190,40 +140,12 @@ def build_base_student_table(dataframe: pd.DataFrame) -> pd.DataFrame:
     """
     columnas_base = ["cohorte", "id_estudiante", "tipo_prueba", "puntaje_ingreso", "diagnostico"]
 
-    dataframe_base = dataframe[columnas_base].copy()
-    dataframe_base = dataframe_base.dropna(subset=["cohorte", "id_estudiante"])
+    dataframe_base = dataframe[columnas_base].dropna(subset=["cohorte", "id_estudiante"])
     dataframe_base = dataframe_base.drop_duplicates(subset=["cohorte", "id_estudiante"])
     return dataframe_base
 
 
 # Helpers: ramos por estudiante
-def add_ramos_normalized_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
-    """
-    Agrega columnas normalizadas necesarias para contar ramos por estudiante.
-
-    Qué hace:
-    - Crea:
-      - cohorte, id_estudiante
-      - anio_academico_normalizado, semestre_academico_normalizado, bimestre_academico_normalizado
-
-    Para qué:
-    - Asegurar que el conteo de ramos funcione aunque los datos vengan como texto o float.
-
-    Dónde:
-    - Consumido por build_gold_kpi_student_ramos (tabla gold_kpi_student_ramos)
-    - Esa tabla soporta KPI 1.1 y KPI 1.5 (desviación vs 8 y deserción/no completan 8).
-    """
-    dataframe_copy = dataframe.copy()
-
-    dataframe_copy["cohorte"]       = dataframe_copy["año_ingreso"].map(convert_to_int_or_none)
-    dataframe_copy["id_estudiante"] = dataframe_copy["id_alumno"].map(convert_to_int_or_none)
-
-    dataframe_copy["anio_academico_normalizado"]        = dataframe_copy["año"].map(convert_to_int_or_none)
-    dataframe_copy["semestre_academico_normalizado"]    = dataframe_copy["semestre"].map(convert_to_int_or_none)
-    dataframe_copy["bimestre_academico_normalizado"]    = dataframe_copy["bimestre"].map(convert_to_int_or_none)
-    return dataframe_copy
-
-
 def filter_valid_rows_for_ramos(dataframe: pd.DataFrame) -> pd.DataFrame:
     """
     Filtra filas mínimamente válidas para el conteo de ramos.
@@ -242,13 +164,13 @@ def filter_valid_rows_for_ramos(dataframe: pd.DataFrame) -> pd.DataFrame:
         "cohorte",
         "id_estudiante",
         "anio_academico_normalizado",
-        "semestre_academico_normalizado",
-        "bimestre_academico_normalizado",
+        "semestre_normalizado",
+        "bimestre_normalizado",
         "codigo_asignatura",
         "nombre_asignatura",
     ]
 
-    dataframe_valid = dataframe.dropna(subset=columnas_requeridas).copy()
+    dataframe_valid = dataframe.dropna(subset=columnas_requeridas)
     return dataframe_valid
 
 
@@ -272,8 +194,8 @@ def count_unique_ramos_by_student(dataframe_valid: pd.DataFrame) -> pd.DataFrame
     """
     columnas_ramo_unico = [
         "anio_academico_normalizado",
-        "semestre_academico_normalizado",
-        "bimestre_academico_normalizado",
+        "semestre_normalizado",
+        "bimestre_normalizado",
         "codigo_asignatura",
         "modulo",
         "nombre_asignatura",
@@ -294,14 +216,13 @@ def count_unique_ramos_by_student(dataframe_valid: pd.DataFrame) -> pd.DataFrame
 
 
 # Helpers: aprueba 8 bimestres
-def normalize_columns_for_aprueba8(dataframe: pd.DataFrame) -> pd.DataFrame:
+def filter_valid_rows_for_aprueba8(dataframe: pd.DataFrame) -> pd.DataFrame:
     """
-    Normaliza columnas mínimas para calcular 'aprueba_8'.
+    Filtra filas mínimas válidas para calcular 'aprueba_8'.
 
     Qué hace:
-    - Crea:
+    - Exige columnas no nulas (ya normalizadas por build_normalized_gold_frame):
       cohorte, id_estudiante, semestre_normalizado, bimestre_normalizado, nota_final_normalizada
-    - Filtra filas sin esos datos.
 
     Para qué:
     - Tener un dataset consistente de «notas por bimestre» para decidir aprobación.
@@ -309,16 +230,7 @@ def normalize_columns_for_aprueba8(dataframe: pd.DataFrame) -> pd.DataFrame:
     Dónde:
     - Consumido por build_gold_kpi_student_aprueba8 (tabla gold_kpi_student_aprueba8)
     """
-    dataframe_copy = dataframe.copy()
-
-    dataframe_copy["cohorte"]       = dataframe_copy["año_ingreso"].map(convert_to_int_or_none)
-    dataframe_copy["id_estudiante"] = dataframe_copy["id_alumno"].map(convert_to_int_or_none)
-
-    dataframe_copy["semestre_normalizado"]      = dataframe_copy["semestre"].map(convert_to_int_or_none)
-    dataframe_copy["bimestre_normalizado"]      = dataframe_copy["bimestre"].map(convert_to_int_or_none)
-    dataframe_copy["nota_final_normalizada"]    = dataframe_copy["nota_final"].map(convert_to_float_or_none)
-
-    dataframe_copy = dataframe_copy.dropna(
+    dataframe_valid = dataframe.dropna(
         subset=[
             "cohorte",
             "id_estudiante",
@@ -327,27 +239,7 @@ def normalize_columns_for_aprueba8(dataframe: pd.DataFrame) -> pd.DataFrame:
             "nota_final_normalizada",
         ]
     )
-    return dataframe_copy
-
-
-def add_bimestre_key_column(dataframe: pd.DataFrame) -> pd.DataFrame:
-    """
-    Agrega una clave simple por bimestre: clave_bimestre = semestre*10 + bimestre.
-
-    Para qué:
-    - Identificar bimestres de forma simple (ej: 1-1 => 11, 2-1 => 21).
-    - Facilitar comparaciones de “tiene todos los bimestres”.
-
-    Dónde:
-    - Consumido por build_gold_kpi_student_aprueba8 (tabla gold_kpi_student_aprueba8)
-    """
-    dataframe_copy = dataframe.copy()
-
-    dataframe_copy["clave_bimestre"] = (
-        (dataframe_copy["semestre_normalizado"] * 10) +
-        dataframe_copy["bimestre_normalizado"]
-    )
-    return dataframe_copy
+    return dataframe_valid
 
 
 def compute_first_4_bimestres_targets(dataframe: pd.DataFrame) -> Dict[int, Set[int]]:
@@ -428,7 +320,7 @@ def evaluate_aprueba8_by_student(
 
         dataframe_target = dataframe_estudiante[
             dataframe_estudiante["clave_bimestre"].isin(list(targets_bimestres))
-        ].copy()
+        ]
 
         nota_minima         = dataframe_target["nota_final_normalizada"].min()
         indicador_aprueba_8 = False
@@ -100,9 +100,9 @@ def computeGroupCounts(dataWithGroup, order):
             if value in counts : counts[value] += 1
     return counts
 
-def group_by_test(df: pd.DataFrame):
+def group_by_test(df: pd.DataFrame, data_start_row: int = DATA_START_ROW):
     dataframe       = df.copy()
-    dataRows        = getDataRows(dataframe, DATA_START_ROW)
+    dataRows        = getDataRows(dataframe, data_start_row)
     dataWithGroup   = classifyRows(dataRows, PAES_RANGE, PDT_RANGE)
     dataOrdered     = orderRows(dataWithGroup, ORDER)
 
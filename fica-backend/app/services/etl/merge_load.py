@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from typing import Dict
+import pandas as pd
+
+from app.services.etl.populate_database import (
+    copy_rendimiento_to_staging,
+    SQL_SELECT_RENDIMIENTO_FROM_STAGING,
+    TABLE_LOADERS,
+)
+
+
+# Huella del contenido de una fila: misma expresión que la columna generada
+# rendimiento_ramo.hash_contenido (migración 0003_rendimiento_hash_contenido.sql).
+SQL_HASH_CONTENIDO = (
+    "md5(COALESCE(nota_final::text, '<NULL>') || '|' || COALESCE(estado_final, '<NULL>'))"
+)
+
+SQL_CREATE_MERGE_RENDIMIENTO = f"""
+    CREATE TEMP TABLE merge_rendimiento_ramo ON COMMIT DROP AS
+    SELECT
+        archivo.*,
+        {SQL_HASH_CONTENIDO} AS hash_contenido
+    FROM ({SQL_SELECT_RENDIMIENTO_FROM_STAGING}) archivo
+"""
+
+SQL_UPDATE_CHANGED_RENDIMIENTO = """
+    UPDATE rendimiento_ramo r
+    SET
+        nota_final      = m.nota_final,
+        estado_final    = m.estado_final
+    FROM merge_rendimiento_ramo m
+    WHERE r.id_estudiante = m.id_estudiante
+      AND r.id_bimestre   = m.id_bimestre
+      AND r.id_asignatura = m.id_asignatura
+      AND r.anio          = m.anio
+      AND r.hash_contenido IS DISTINCT FROM m.hash_contenido
+"""
+
+SQL_INSERT_NEW_RENDIMIENTO = """
+    INSERT INTO rendimiento_ramo (
+        id_estudiante,
+        id_bimestre,
+        id_asignatura,
+        anio,
+        nota_final,
+        estado_final
+    )
+    SELECT
+        m.id_estudiante,
+        m.id_bimestre,
+        m.id_asignatura,
+        m.anio,
+        m.nota_final,
+        m.estado_final
+    FROM merge_rendimiento_ramo m
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM rendimiento_ramo r
+        WHERE r.id_estudiante = m.id_estudiante
+          AND r.id_bimestre   = m.id_bimestre
+          AND r.id_asignatura = m.id_asignatura
+          AND r.anio          = m.anio
+    )
+"""
+
+# Solo se eliminan filas dentro del alcance del archivo: los pares (estudiante, bimestre) que trae.
+# Así una carga parcial (un bimestre, una cohorte) no borra el resto del histórico, ni las notas
+# de un estudiante en un bimestre que el archivo trae solo para otros estudiantes.
+SQL_DELETE_REMOVED_RENDIMIENTO = """
+    DELETE FROM rendimiento_ramo r
+    WHERE (r.id_estudiante, r.id_bimestre, r.anio) IN (
+          SELECT DISTINCT id_estudiante, id_bimestre, anio
+          FROM merge_rendimiento_ramo
+      )
+      AND NOT EXISTS (
+          SELECT 1
+          FROM merge_rendimiento_ramo m
+          WHERE m.id_estudiante = r.id_estudiante
+            AND m.id_bimestre   = r.id_bimestre
+            AND m.id_asignatura = r.id_asignatura
+            AND m.anio          = r.anio
+      )
+"""
+
+
+def merge_rendimiento_ramo(conn, df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Sincroniza rendimiento_ramo con el archivo comparando huellas de contenido (modo merge).
+
+    Qué hace (una sola transacción, sentencias set-based):
+    - COPY del archivo a staging, resolución a ids y cálculo de hash_contenido (nota + estado).
+    - UPDATE de las filas cuya huella cambió, INSERT de las nuevas y DELETE de las que
+      ya no vienen (dentro de los estudiantes y bimestres del archivo).
+
+    Para qué:
+    - Que volver a subir un archivo con notas corregidas actualice la DB sin vaciarla
+      ni recorrer fila a fila: las filas iguales no se escriben.
+
+    Dónde se usa:
+    - MERGE_TABLE_LOADERS en este archivo (run_pipeline_on_dataframe(..., mode="merge")).
+    """
+    cursor = conn.cursor()
+    try:
+        copy_rendimiento_to_staging(cursor, df)
+        cursor.execute(SQL_CREATE_MERGE_RENDIMIENTO)
+        cursor.execute("SELECT COUNT(*) FROM merge_rendimiento_ramo")
+        total_archivo = cursor.fetchone()[0]
+
+        cursor.execute(SQL_UPDATE_CHANGED_RENDIMIENTO)
+        updated_count = cursor.rowcount
+        cursor.execute(SQL_INSERT_NEW_RENDIMIENTO)
+        inserted_count = cursor.rowcount
+        cursor.execute(SQL_DELETE_REMOVED_RENDIMIENTO)
+        deleted_count = cursor.rowcount
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    summary = {
+        "inserted"  : inserted_count,
+        "updated"   : updated_count,
+        "deleted"   : deleted_count,
+        "unchanged" : total_archivo - inserted_count - updated_count,
+    }
+    return summary
+
+
+# Carga merge: igual que la incremental, salvo rendimiento_ramo (las dimensiones no cambian de contenido).
+MERGE_TABLE_LOADERS = {
+    **TABLE_LOADERS,
+    "rendimiento" : (merge_rendimiento_ramo, TABLE_LOADERS["rendimiento"][1]),
+}
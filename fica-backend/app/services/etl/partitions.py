@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from typing import Iterable, List
+
+
+# rendimiento_ramo está particionada por LIST (anio): una partición por año académico.
+RENDIMIENTO_PARTITION_PREFIX = "rendimiento_ramo_"
+
+# Años separados de rendimiento_ramo (archivados): rendimiento_ramo_<anio>_archivada
+RENDIMIENTO_ARCHIVED_SUFFIX = "_archivada"
+
+
+def rendimiento_partition_name(anio: int) -> str:
+    """
+    Nombre de la partición de rendimiento_ramo para un año académico (ej: rendimiento_ramo_2023).
+    """
+    return f"{RENDIMIENTO_PARTITION_PREFIX}{int(anio)}"
+
+
+def rendimiento_archived_name(anio: int) -> str:
+    """
+    Nombre de la tabla de un año archivado con detach_rendimiento_partition (ej: rendimiento_ramo_2022_archivada).
+    """
+    return f"{rendimiento_partition_name(anio)}{RENDIMIENTO_ARCHIVED_SUFFIX}"
+
+
+def ensure_rendimiento_partitions(cursor, anios: Iterable[int]) -> List[int]:
+    """
+    Crea las particiones de rendimiento_ramo que falten para los años indicados.
+
+    Contexto:
+    - Se ejecuta sobre el cursor del llamador, sin commit: la partición queda en la misma
+      transacción que la carga.
+    - Los nombres no llevan esquema, así en la carga atómica se crean en el esquema shadow.
+    - Las particiones existentes se buscan en pg_inherits (list_rendimiento_partitions), no por nombre:
+      si una tabla rendimiento_ramo_<anio> existe pero no está adjunta, el CREATE falla
+      en vez de saltarse la partición y dejar la carga sin destino para ese año.
+
+    Para qué:
+    - Que el ETL maneje las particiones: cada carga solo escribe en las particiones de los años
+      que trae el archivo.
+
+    Dónde se usa:
+    - insert_rendimiento_ramo() (populate_database.py), replace_all() (full_reload.py)
+      y merge_rendimiento_ramo() (merge_load.py).
+    """
+    anios_ordenados = sorted({int(anio) for anio in anios})
+    existentes      = set(list_rendimiento_partitions(cursor))
+    for anio in anios_ordenados:
+        if rendimiento_partition_name(anio) in existentes:
+            continue
+        cursor.execute(
+            f"""
+            CREATE TABLE {rendimiento_partition_name(anio)}
+            PARTITION OF rendimiento_ramo FOR VALUES IN ({anio})
+            """
+        )
+    return anios_ordenados
+
+
+def list_rendimiento_partitions(cursor) -> List[str]:
+    """
+    Lista las particiones actuales de rendimiento_ramo (esquema actual).
+    """
+    cursor.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'rendimiento_ramo'::regclass
+        ORDER BY c.relname
+        """
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def list_archived_rendimiento_tables(cursor) -> List[str]:
+    """
+    Lista los años archivados con detach_rendimiento_partition (esquema actual).
+    """
+    cursor.execute(
+        """
+        SELECT tablename
+        FROM pg_tables
+        WHERE schemaname = current_schema()
+          AND tablename LIKE %s
+        ORDER BY tablename
+        """,
+        (f"{RENDIMIENTO_PARTITION_PREFIX}%{RENDIMIENTO_ARCHIVED_SUFFIX}",),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def detach_rendimiento_partition(conn, anio: int) -> str:
+    """
+    Archiva un año: separa su partición de rendimiento_ramo y la deja como tabla independiente.
+
+    Qué hace (en una transacción):
+    - DETACH PARTITION y renombra la tabla a rendimiento_ramo_<anio>_archivada: el nombre de la
+      partición queda libre y una carga posterior de ese año crea una partición nueva.
+    - Borra las FKs de la tabla archivada: es una foto del año y no debe bloquear el TRUNCATE
+      de la carga replace (los ids que guarda son los del momento del archivo).
+
+    Para qué:
+    - Archivar años antiguos: dejan de leerse en Gold sin borrar los datos
+      (Gold se recalcula después con la reconstrucción completa).
+
+    Dónde se usa:
+    - python -m app.cli partitions detach <anio> (app/cli.py).
+    """
+    partition_name  = rendimiento_partition_name(anio)
+    archived_name   = rendimiento_archived_name(anio)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"ALTER TABLE rendimiento_ramo DETACH PARTITION {partition_name}")
+        cursor.execute(f"ALTER TABLE {partition_name} RENAME TO {archived_name}")
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            (archived_name,),
+        )
+        for (constraint_name,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {archived_name} DROP CONSTRAINT "{constraint_name}"')
+        conn.commit()
+        return archived_name
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def attach_rendimiento_partition(conn, anio: int) -> str:
+    """
+    Devuelve un año archivado a rendimiento_ramo (inverso de detach_rendimiento_partition).
+
+    Contexto:
+    - Falla si el año ya tiene partición (se volvió a cargar después de archivarlo).
+    - ATTACH PARTITION vuelve a crear las FKs de rendimiento_ramo y las valida: si la base se
+      recargó en modo replace, los ids archivados ya no existen y el ATTACH falla sin cambiar nada.
+
+    Dónde se usa:
+    - python -m app.cli partitions attach <anio> (app/cli.py).
+    """
+    partition_name  = rendimiento_partition_name(anio)
+    archived_name   = rendimiento_archived_name(anio)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"ALTER TABLE {archived_name} RENAME TO {partition_name}")
+        cursor.execute(
+            f"ALTER TABLE rendimiento_ramo ATTACH PARTITION {partition_name} FOR VALUES IN ({int(anio)})"
+        )
+        conn.commit()
+        return partition_name
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -1,39 +1,50 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Optional
 import pandas as pd
 from psycopg2.extras import execute_values
 
-def clean_numeric(value):
-    if pd.isna(value) or value in ("", 0, "0", "0.0") : return None
-    if isinstance(value, str) : value = value.replace(",", ".")
+from app.services.etl.cleaning import clean_numeric_column, clean_int_column
+from app.services.etl.partitions import ensure_rendimiento_partitions
+from app.services.etl.copy_load import copy_dataframe_to_table
 
-    try:
-        return float(value)
-    except Exception:
-        return None
+logger = logging.getLogger(__name__)
 
-def insert_estudiantes(conn, df: pd.DataFrame) -> int:
-    df_valid            = df.dropna(subset=["id_alumno", "año_ingreso", "tipo_ingreso"])
+def _to_records(frame: pd.DataFrame) -> list[tuple]:
+    # NaN / <NA> -> None, para que psycopg2 inserte NULL (y no 'NaN' en columnas NUMERIC)
+    frame_object = frame.astype(object)
+    return list(frame_object.where(frame.notna(), None).itertuples(index=False, name=None))
+
+def _valid_student_rows(df: pd.DataFrame, required: list[str]) -> pd.DataFrame:
+    df_valid = df.dropna(subset=required)
     # Filtrar registros con id_alumno vacío (cadena vacía)
-    df_valid            = df_valid[df_valid["id_alumno"] != ""]
-    estudiantes         = df_valid[["id_alumno", "año_ingreso", "tipo_ingreso"]].drop_duplicates()
-    estudiantes_data    = []
-    for _, row in estudiantes.iterrows():
-        id_estudiante   = int(row["id_alumno"])
-        anio_ingreso    = int(row["año_ingreso"])
-        tipo_prueba     = str(row["tipo_ingreso"]).upper()
-        student_rows    = df_valid[df_valid["id_alumno"] == row["id_alumno"]].iloc[0]
-
-        if tipo_prueba == "PAES":
-            nem     = clean_numeric(student_rows["paes_nem"])
-            ranking = clean_numeric(student_rows["paes_ranking"])
-        else:
-            nem     = clean_numeric(student_rows["pdt_nem"])
-            ranking = clean_numeric(student_rows["pdt_ranking"])
-
-        diagnostico = clean_numeric(student_rows["diagnostico_matematica"])
-
-        estudiantes_data.append(
-            (id_estudiante, anio_ingreso, tipo_prueba, nem, ranking, diagnostico)
-        )
+    return df_valid[df_valid["id_alumno"] != ""]
+
+def build_estudiantes_rows(df: pd.DataFrame) -> pd.DataFrame:
+    # Primera fila por id_alumno (una pasada), NEM/ranking según tipo_ingreso con máscaras
+    df_valid    = _valid_student_rows(df, ["id_alumno", "año_ingreso", "tipo_ingreso"])
+    first_rows  = df_valid.drop_duplicates(subset=["id_alumno"], keep="first")
+    tipo_prueba = first_rows["tipo_ingreso"].astype(str).str.upper()
+    es_paes     = (tipo_prueba == "PAES").to_numpy(dtype=bool)
+
+    # En el archivo original un 0 en NEM / ranking / puntajes significa «sin dato»
+    nem_paes    = clean_numeric_column(first_rows["paes_nem"], zero_as_missing=True)
+    nem_pdt     = clean_numeric_column(first_rows["pdt_nem"], zero_as_missing=True)
+    rank_paes   = clean_numeric_column(first_rows["paes_ranking"], zero_as_missing=True)
+    rank_pdt    = clean_numeric_column(first_rows["pdt_ranking"], zero_as_missing=True)
+
+    return pd.DataFrame({
+        "id_estudiante"                 : clean_int_column(first_rows["id_alumno"]),
+        "anio_ingreso"                  : clean_int_column(first_rows["año_ingreso"]),
+        "tipo_prueba"                   : tipo_prueba.astype(object),
+        "nem"                           : nem_paes.where(es_paes, nem_pdt),
+        "ranking"                       : rank_paes.where(es_paes, rank_pdt),
+        "prueba_diagnostico_matematica" : clean_numeric_column(first_rows["diagnostico_matematica"], zero_as_missing=True),
+    })
+
+def insert_estudiantes(conn, df: pd.DataFrame) -> int:
+    estudiantes_data = _to_records(build_estudiantes_rows(df))
 
     cur = conn.cursor()
     try:
@@ -61,10 +72,13 @@ def insert_estudiantes(conn, df: pd.DataFrame) -> int:
     finally:
         cur.close()
 
+def build_periodos_rows(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    # año / semestre / bimestre como enteros ("1.0" -> 1); filas sin período válido se descartan
+    periodos = pd.DataFrame({column: clean_int_column(df[column]) for column in columns}, index=df.index)
+    return periodos.dropna().drop_duplicates()
+
 def insert_semestres(conn, df: pd.DataFrame) -> int:
-    df_valid        = df.dropna(subset=["año", "semestre"])
-    semestres       = df_valid[["año", "semestre"]].drop_duplicates()
-    semestres_data  = [(int(row["año"]), int(row["semestre"])) for _, row in semestres.iterrows()]
+    semestres_data  = _to_records(build_periodos_rows(df, ["año", "semestre"]))
     cur             = conn.cursor()
 
     try:
@@ -85,37 +99,40 @@ def insert_semestres(conn, df: pd.DataFrame) -> int:
     finally:
         cur.close()
 
+# SQL: resolución de claves naturales desde staging (cargas incremental, merge y replace)
+SQL_CREATE_STAGING_BIMESTRES = """
+    CREATE TEMP TABLE staging_bimestres (
+        anio        int,
+        semestre    int,
+        bimestre    int
+    ) ON COMMIT DROP
+"""
+
+SQL_INSERT_BIMESTRES_FROM_STAGING = """
+    INSERT INTO bimestres (id_semestre, numero)
+    SELECT DISTINCT s.id_semestre, sb.bimestre
+    FROM staging_bimestres sb
+    JOIN semestres s ON s.anio = sb.anio AND s.numero = sb.semestre
+    ON CONFLICT (id_semestre, numero) DO NOTHING
+"""
+
+def copy_bimestres_to_staging(cursor, df: pd.DataFrame) -> int:
+    # staging_bimestres (temporal, ON COMMIT DROP) con (año, semestre, bimestre) del archivo, por COPY
+    cursor.execute(SQL_CREATE_STAGING_BIMESTRES)
+    return copy_dataframe_to_table(
+        cursor,
+        build_periodos_rows(df, ["año", "semestre", "bimestre"]).rename(columns={"año": "anio"}),
+        "staging_bimestres",
+        ["anio", "semestre", "bimestre"],
+    )
+
 def insert_bimestres(conn, df: pd.DataFrame) -> int:
-    df_valid        = df.dropna(subset=["año", "semestre", "bimestre"])
-    bimestres_df    = df_valid[["año", "semestre", "bimestre"]].drop_duplicates()
-    cur             = conn.cursor()
-    inserted        = 0
+    # Un COPY + un INSERT ... SELECT: id_semestre se resuelve con un join, no con un SELECT por fila
+    cur = conn.cursor()
     try:
-        for _, row in bimestres_df.iterrows():
-            anio      = int(row["año"])
-            semestre  = int(row["semestre"])
-            bimestre  = int(float(row["bimestre"]))
-
-            cur.execute(
-                "SELECT id_semestre FROM semestres WHERE anio = %s AND numero = %s",
-                (anio, semestre),
-            )
-            result = cur.fetchone()
-            if not result:
-                continue
-
-            id_semestre = result[0]
-            cur.execute(
-                """
-                INSERT INTO bimestres (id_semestre, numero)
-                VALUES (%s, %s)
-                ON CONFLICT (id_semestre, numero) DO NOTHING
-                """,
-                (id_semestre, bimestre),
-            )
-
-            inserted += 1
-
+        copy_bimestres_to_staging(cur, df)
+        cur.execute(SQL_INSERT_BIMESTRES_FROM_STAGING)
+        inserted = cur.rowcount
         conn.commit()
         return inserted
     except Exception as e:
@@ -155,39 +172,41 @@ def insert_asignaturas(conn, df: pd.DataFrame) -> int:
     finally:
         cur.close()
 
+def _build_exam_rows(df: pd.DataFrame, tipo: str, score_columns: dict) -> pd.DataFrame:
+    df_tipo = df[df["tipo_ingreso"].str.upper() == tipo]
+    df_tipo = _valid_student_rows(df_tipo, ["id_alumno", "año_ingreso"])
+    df_tipo = df_tipo.drop_duplicates(subset=["id_alumno"])
+
+    rows = {
+        "id_estudiante" : clean_int_column(df_tipo["id_alumno"]),
+        "anio_examen"   : clean_int_column(df_tipo["año_ingreso"]),
+    }
+    for column_db, column_silver in score_columns.items():
+        rows[column_db] = clean_numeric_column(df_tipo[column_silver], zero_as_missing=True)
+    return pd.DataFrame(rows, index=df_tipo.index)
+
+def build_paes_rows(df: pd.DataFrame) -> pd.DataFrame:
+    return _build_exam_rows(df, "PAES", {
+        "c_lectora"         : "paes_comprension_lectora",
+        "m1"                : "paes_m1",
+        "m2"                : "paes_m2",
+        "historia"          : "paes_historia",
+        "ciencias"          : "paes_ciencias",
+        "prom_m1_clectora"  : "paes_promedio_m1_comprension_lectora",
+    })
+
+def build_pdt_rows(df: pd.DataFrame) -> pd.DataFrame:
+    return _build_exam_rows(df, "PDT", {
+        "lenguaje"      : "pdt_lenguaje",
+        "matematicas"   : "pdt_matematicas",
+        "historia"      : "pdt_historia",
+        "ciencias"      : "pdt_ciencias",
+        "prom_leng_mat" : "pdt_promedio_matematicas_lenguaje",
+    })
+
 def insert_paes(conn, df: pd.DataFrame) -> int:
-    df_paes = df[df["tipo_ingreso"].str.upper() == "PAES"].copy()
-    df_paes = df_paes.dropna(subset=["id_alumno", "año_ingreso"])
-    # Filtrar registros con id_alumno vacío
-    df_paes = df_paes[df_paes["id_alumno"] != ""]
-
-    if len(df_paes) == 0 : return 0
-
-    paes_cols = [
-        "id_alumno",
-        "año_ingreso",
-        "paes_comprension_lectora",
-        "paes_m1",
-        "paes_m2",
-        "paes_historia",
-        "paes_ciencias",
-        "paes_promedio_m1_comprension_lectora",
-    ]
-    df_paes_unique  = df_paes[paes_cols].drop_duplicates(subset=["id_alumno"])
-    paes_data       = []
-    for _, row in df_paes_unique.iterrows():
-        id_estudiante      = int(row["id_alumno"])
-        anio_examen        = int(row["año_ingreso"])
-        c_lectora          = clean_numeric(row["paes_comprension_lectora"])
-        m1                 = clean_numeric(row["paes_m1"])
-        m2                 = clean_numeric(row["paes_m2"])
-        historia           = clean_numeric(row["paes_historia"])
-        ciencias           = clean_numeric(row["paes_ciencias"])
-        prom_m1_clectora   = clean_numeric(row["paes_promedio_m1_comprension_lectora"])
-
-        paes_data.append(
-            (id_estudiante, anio_examen, c_lectora, m1, m2, historia, ciencias, prom_m1_clectora)
-        )
+    paes_data = _to_records(build_paes_rows(df))
+    if len(paes_data) == 0 : return 0
 
     cur = conn.cursor()
     try:
@@ -218,36 +237,8 @@ def insert_paes(conn, df: pd.DataFrame) -> int:
         cur.close()
 
 def insert_pdt(conn, df: pd.DataFrame) -> int:
-    df_pdt = df[df["tipo_ingreso"].str.upper() == "PDT"].copy()
-    df_pdt = df_pdt.dropna(subset=["id_alumno", "año_ingreso"])
-    # Filtrar registros con id_alumno vacío
-    df_pdt = df_pdt[df_pdt["id_alumno"] != ""]
-
-    if len(df_pdt) == 0 : return 0
-
-    pdt_cols = [
-        "id_alumno",
-        "año_ingreso",
-        "pdt_lenguaje",
-        "pdt_matematicas",
-        "pdt_historia",
-        "pdt_ciencias",
-        "pdt_promedio_matematicas_lenguaje",
-    ]
-    df_pdt_unique   = df_pdt[pdt_cols].drop_duplicates(subset=["id_alumno"])
-    pdt_data        = []
-    for _, row in df_pdt_unique.iterrows():
-        id_estudiante  = int(row["id_alumno"])
-        anio_examen    = int(row["año_ingreso"])
-        lenguaje       = clean_numeric(row["pdt_lenguaje"])
-        matematicas    = clean_numeric(row["pdt_matematicas"])
-        historia       = clean_numeric(row["pdt_historia"])
-        ciencias       = clean_numeric(row["pdt_ciencias"])
-        prom_leng_mat  = clean_numeric(row["pdt_promedio_matematicas_lenguaje"])
-
-        pdt_data.append(
-            (id_estudiante, anio_examen, lenguaje, matematicas, historia, ciencias, prom_leng_mat)
-        )
+    pdt_data = _to_records(build_pdt_rows(df))
+    if len(pdt_data) == 0 : return 0
 
     cur = conn.cursor()
     try:
@@ -276,10 +267,8 @@ def insert_pdt(conn, df: pd.DataFrame) -> int:
     finally:
         cur.close()
 
-def insert_rendimiento_ramo(conn, df: pd.DataFrame) -> int:
-    cur             = conn.cursor()
-    inserted_count  = 0
-    df_valid        = df.dropna(
+def build_rendimiento_rows(df: pd.DataFrame) -> pd.DataFrame:
+    df_valid = df.dropna(
         subset=[
             "id_alumno",
             "año",
@@ -292,88 +281,194 @@ def insert_rendimiento_ramo(conn, df: pd.DataFrame) -> int:
     # Filtrar registros con id_alumno vacío
     df_valid = df_valid[df_valid["id_alumno"] != ""]
 
-    try:
-        for _, row in df_valid.iterrows():
-            id_estudiante     = int(row["id_alumno"])
-            anio              = int(row["año"])
-            semestre          = int(row["semestre"])
-            bimestre          = int(float(row["bimestre"]))
-            codigo_asignatura = row["codigo_asignatura"]
-            modulo            = str(row["modulo"]) if pd.notna(row["modulo"]) else None
-            nombre_asignatura = row["nombre_asignatura"]
-            nota_final        = clean_numeric(row["nota_final"])
-            estado_final      = row["estado_final"] if pd.notna(row["estado_final"]) else None
-
-            # id_semestre
-            cur.execute(
-                "SELECT id_semestre FROM semestres WHERE anio = %s AND numero = %s",
-                (anio, semestre),
-            )
-            result = cur.fetchone()
-            if not result : continue
-            id_semestre = result[0]
-
-            # id_bimestre
-            cur.execute(
-                "SELECT id_bimestre FROM bimestres WHERE id_semestre = %s AND numero = %s",
-                (id_semestre, bimestre),
-            )
-            result = cur.fetchone()
-            if not result : continue
-            id_bimestre = result[0]
-
-            # id_asignatura
-            cur.execute(
-                """
-                SELECT id_asignatura
-                FROM asignaturas
-                WHERE codigo = %s
-                  AND (modulo = %s OR (modulo IS NULL AND %s IS NULL))
-                  AND nombre = %s
-                """,
-                (codigo_asignatura, modulo, modulo, nombre_asignatura),
-            )
-            result = cur.fetchone()
-            if not result : continue
-            id_asignatura = result[0]
-
-            # Insert rendimiento
-            cur.execute(
-                """
-                INSERT INTO rendimiento_ramo (
-                    id_estudiante,
-                    id_bimestre,
-                    id_asignatura,
-                    nota_final,
-                    estado_final
-                )
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (id_estudiante, id_bimestre, id_asignatura) DO NOTHING
-                """,
-                (id_estudiante, id_bimestre, id_asignatura, nota_final, estado_final),
-            )
-
-            inserted_count += 1
-
-            if inserted_count % 100 == 0:
-                conn.commit()
+    # Limpieza por columna (una vez); las claves naturales se resuelven a ids al insertar.
+    # Una nota 0 es una nota (cuenta en nota_b1 y reprueba en aprueba_8): no se trata como faltante
+    rendimiento_df = pd.DataFrame({
+        "id_estudiante"     : clean_int_column(df_valid["id_alumno"]),
+        "anio"              : clean_int_column(df_valid["año"]),
+        "semestre"          : clean_int_column(df_valid["semestre"]),
+        "bimestre"          : clean_int_column(df_valid["bimestre"]),
+        "codigo_asignatura" : df_valid["codigo_asignatura"],
+        "modulo"            : df_valid["modulo"].astype(str).where(df_valid["modulo"].notna()),
+        "nombre_asignatura" : df_valid["nombre_asignatura"],
+        "nota_final"        : clean_numeric_column(df_valid["nota_final"]),
+        "estado_final"      : df_valid["estado_final"],
+    }, index=df_valid.index)
+    return rendimiento_df.dropna(subset=["id_estudiante", "anio", "semestre", "bimestre"])
+
+SQL_CREATE_STAGING_RENDIMIENTO = """
+    CREATE TEMP TABLE staging_rendimiento_ramo (
+        orden               bigint,
+        id_estudiante       bigint,
+        anio                int,
+        semestre            int,
+        bimestre            int,
+        codigo_asignatura   text,
+        modulo              text,
+        nombre_asignatura   text,
+        nota_final          numeric(4,2),
+        estado_final        text
+    ) ON COMMIT DROP
+"""
+
+# Filas de staging resueltas a ids (una por clave única de rendimiento_ramo).
+# DISTINCT ON + orden: ante filas repetidas se conserva la primera del archivo.
+SQL_SELECT_RENDIMIENTO_FROM_STAGING = """
+    SELECT DISTINCT ON (sr.id_estudiante, b.id_bimestre, a.id_asignatura)
+        sr.id_estudiante,
+        b.id_bimestre,
+        a.id_asignatura,
+        sr.anio,
+        sr.nota_final,
+        sr.estado_final
+    FROM staging_rendimiento_ramo sr
+    JOIN semestres s    ON s.anio = sr.anio AND s.numero = sr.semestre
+    JOIN bimestres b    ON b.id_semestre = s.id_semestre AND b.numero = sr.bimestre
+    JOIN asignaturas a  ON a.codigo = sr.codigo_asignatura
+                       AND a.modulo IS NOT DISTINCT FROM sr.modulo
+                       AND a.nombre = sr.nombre_asignatura
+    ORDER BY sr.id_estudiante, b.id_bimestre, a.id_asignatura, sr.orden
+"""
+
+# Las filas que ya están en la base se conservan (carga incremental); en replace la tabla está vacía
+SQL_INSERT_RENDIMIENTO_FROM_STAGING = """
+    INSERT INTO rendimiento_ramo (
+        id_estudiante,
+        id_bimestre,
+        id_asignatura,
+        anio,
+        nota_final,
+        estado_final
+    )
+""" + SQL_SELECT_RENDIMIENTO_FROM_STAGING + """
+    ON CONFLICT (id_estudiante, id_bimestre, id_asignatura, anio) DO NOTHING
+"""
+
+def copy_rendimiento_to_staging(cursor, df: pd.DataFrame) -> int:
+    """
+    Crea staging_rendimiento_ramo (temporal, ON COMMIT DROP) y la llena con COPY.
+
+    Contexto:
+    - Las filas quedan con claves naturales y con su posición en el archivo (orden).
+    - Crea antes las particiones de rendimiento_ramo de los años del archivo.
+
+    Dónde:
+    - Usado por insert_rendimiento_ramo() en este archivo, la recarga completa
+      (app/services/etl/full_reload.py) y la carga merge (app/services/etl/merge_load.py).
+    """
+    rendimiento_df = build_rendimiento_rows(df)
+    rendimiento_df = rendimiento_df.assign(orden=range(len(rendimiento_df)))
+    ensure_rendimiento_partitions(cursor, rendimiento_df["anio"].unique())
+    cursor.execute(SQL_CREATE_STAGING_RENDIMIENTO)
+    return copy_dataframe_to_table(
+        cursor, rendimiento_df, "staging_rendimiento_ramo", list(rendimiento_df.columns),
+    )
 
+def insert_rendimiento_ramo(conn, df: pd.DataFrame) -> int:
+    # Un COPY + un INSERT ... SELECT en una transacción: semestre, bimestre y asignatura se resuelven
+    # con joins sobre staging (como full_reload / merge_load), no con tres SELECT por fila
+    cur = conn.cursor()
+    try:
+        copy_rendimiento_to_staging(cur, df)
+        cur.execute(SQL_INSERT_RENDIMIENTO_FROM_STAGING)
+        inserted = cur.rowcount
         conn.commit()
-        return inserted_count
+        return inserted
     except Exception as e:
         conn.rollback()
         raise
     finally:
         cur.close()
 
+# Carga por tabla: clave del summary -> (función insert, tablas de las que depende por FK)
+TABLE_LOADERS = {
+    "estudiantes" : (insert_estudiantes,        []),
+    "semestres"   : (insert_semestres,          []),
+    "asignaturas" : (insert_asignaturas,        []),
+    "bimestres"   : (insert_bimestres,          ["semestres"]),
+    "paes"        : (insert_paes,               ["estudiantes"]),
+    "pdt"         : (insert_pdt,                ["estudiantes"]),
+    "rendimiento" : (insert_rendimiento_ramo,   ["estudiantes", "bimestres", "asignaturas"]),
+}
+
 def populate_all(conn, df: pd.DataFrame) -> dict:
     summary = {}
+    timings = {}
+
+    for table_name, (insert_function, _) in TABLE_LOADERS.items():
+        start                   = time.perf_counter()
+        summary[table_name]     = insert_function(conn, df)
+        timings[table_name]     = round(time.perf_counter() - start, 3)
+
+    summary["timings_seconds"] = timings
+    return summary
 
-    summary["estudiantes"] = insert_estudiantes(conn, df)
-    summary["semestres"]   = insert_semestres(conn, df)
-    summary["bimestres"]   = insert_bimestres(conn, df)
-    summary["asignaturas"] = insert_asignaturas(conn, df)
-    summary["paes"]        = insert_paes(conn, df)
-    summary["pdt"]         = insert_pdt(conn, df)
-    summary["rendimiento"] = insert_rendimiento_ramo(conn, df)
+def _load_table_on_own_connection(connection_factory, table_name: str, insert_function, df: pd.DataFrame) -> tuple[int, float]:
+    start = time.perf_counter()
+    with connection_factory() as conn:
+        inserted = insert_function(conn, df)
+    elapsed = round(time.perf_counter() - start, 3)
+    logger.info("Tabla %s cargada: %s filas en %.3fs", table_name, inserted, elapsed)
+    return inserted, elapsed
+
+def populate_all_parallel(
+    connection_factory,
+    df: pd.DataFrame,
+    max_workers: int = 4,
+    table_loaders: Optional[dict] = None,
+    completed_tables: Optional[dict] = None,
+    on_table_loaded: Optional[Callable[[str, int, float], None]] = None,
+) -> dict:
+    """
+    Carga las tablas base en paralelo, cada una en su propia conexión del pool.
+
+    Contexto:
+    - connection_factory es un context manager que entrega una conexión (ej: get_etl_raw_connection).
+    - Una tabla se lanza apenas terminan las tablas de las que depende por FK (TABLE_LOADERS):
+      estudiantes, semestres y asignaturas parten juntas; paes/pdt esperan solo a estudiantes.
+
+    Para qué:
+    - Reducir el tiempo total de carga sin romper el orden de claves foráneas.
+    - Reportar el tiempo de cada tabla en summary["timings_seconds"].
+    - table_loaders permite reemplazar la función de alguna tabla (ej: MERGE_TABLE_LOADERS en merge_load.py).
+
+    Reanudación (app/services/etl/checkpoints.py):
+    - completed_tables {tabla: filas} son tablas ya cargadas en una ejecución anterior: no se vuelven
+      a cargar (tiempo 0.0) y cuentan como dependencia cumplida.
+    - on_table_loaded(tabla, filas, segundos) se llama apenas una tabla hace commit.
+    """
+    table_loaders       = table_loaders or TABLE_LOADERS
+    completed_tables    = completed_tables or {}
+    summary             = {name: completed_tables[name] for name in table_loaders if name in completed_tables}
+    timings             = {name: 0.0 for name in summary}
+    pending             = {name: loader for name, loader in table_loaders.items() if name not in summary}
+    running             = {}
+    completed           = set(summary)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while pending or running:
+            ready = [
+                table_name for table_name, (_, dependencies) in pending.items()
+                if all(dependency in completed for dependency in dependencies)
+            ]
+            for table_name in ready:
+                insert_function, _ = pending.pop(table_name)
+                future = executor.submit(_load_table_on_own_connection, connection_factory, table_name, insert_function, df)
+                running[future] = table_name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                table_name = running.pop(future)
+                try:
+                    summary[table_name], timings[table_name] = future.result()
+                except Exception:
+                    for other_future in running:
+                        other_future.cancel()
+                    raise
+                completed.add(table_name)
+                if on_table_loaded is not None:
+                    on_table_loaded(table_name, summary[table_name], timings[table_name])
+
+    summary = {table_name: summary[table_name] for table_name in table_loaders}
+    summary["timings_seconds"] = {table_name: timings[table_name] for table_name in table_loaders}
     return summary
@@ -0,0 +1,462 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional, Tuple
+
+from app.services.etl.full_reload import REPLACE_TRUNCATE_TABLES
+
+
+SHADOW_SCHEMA   = "fica_shadow"
+RETIRED_SCHEMA  = "fica_retired"
+
+
+# Tablas que se cargan en el esquema shadow y se reemplazan en el swap: las que escribe el ETL
+# (las mismas que vacía la carga replace). asignaturas (catálogo que solo crece, referenciado por las
+# líneas mantenidas a mano), lineas, linea_asignaturas, carga_csv y schema_migrations quedan en public:
+# el ETL las lee / escribe ahí directamente (search_path = shadow, public) y nada de lo que otros
+# escriban en ellas durante la carga se pierde en el swap.
+SHADOW_TABLES = REPLACE_TRUNCATE_TABLES
+
+# Clave de pg_advisory_lock de las escrituras en SHADOW_TABLES: compartido para las cargas no atómicas
+# y el refresco Gold (pueden correr juntas), exclusivo para una carga atómica de prepare a swap
+SHADOW_LOCK_KEY = 7_310_002
+
+
+@contextmanager
+def etl_write_lock(conn, exclusive: bool = False):
+    """
+    Mantiene pg_advisory_lock(SHADOW_LOCK_KEY) en conn mientras dura el bloque.
+
+    Contexto:
+    - Una carga atómica copia public al esquema shadow y en el swap retira las tablas de public:
+      lo que otro proceso escriba en ellas entre la copia y el swap se perdería (y carga_csv,
+      fuera del swap, registraría igual esa carga).
+    - Por eso toda escritura en SHADOW_TABLES toma el lock: compartido (exclusive=False) las cargas
+      append / merge / replace no atómicas, el refresco Gold y detach / attach de particiones;
+      exclusivo la carga atómica. Una espera a la otra.
+    - conn solo sostiene el lock (lock de sesión): la carga puede usar otras conexiones.
+
+    Dónde se usa:
+    - load_in_shadow_schema() en este archivo, _load_into_database() y rebuild_gold_from_database()
+      en app/services/pipeline.py, manage_partitions() en app/cli.py.
+    """
+    lock_function   = "pg_advisory_lock" if exclusive else "pg_advisory_lock_shared"
+    unlock_function = "pg_advisory_unlock" if exclusive else "pg_advisory_unlock_shared"
+    cursor          = conn.cursor()
+    try:
+        cursor.execute(f"SELECT {lock_function}(%s)", (SHADOW_LOCK_KEY,))
+        conn.commit()
+        yield
+    finally:
+        conn.rollback()
+        cursor.execute(f"SELECT {unlock_function}(%s)", (SHADOW_LOCK_KEY,))
+        conn.commit()
+        cursor.close()
+
+
+# Helpers: catálogo
+def _check_shadow_tables(cursor, tables: List[str]) -> None:
+    """
+    Verifica que ninguna tabla fuera de SHADOW_TABLES tenga FKs hacia una tabla del swap.
+
+    Contexto:
+    - Una FK sigue a la tabla (no a su nombre): tras el swap apuntaría a la tabla retirada
+      y se perdería al eliminarla. Si el esquema agrega una tabla así, debe sumarse a SHADOW_TABLES.
+    """
+    cursor.execute(
+        """
+        SELECT DISTINCT t.relname, r.relname
+        FROM pg_constraint c
+        JOIN pg_class t ON t.oid = c.conrelid
+        JOIN pg_class r ON r.oid = c.confrelid
+        WHERE c.contype = 'f'
+          AND c.connamespace = 'public'::regnamespace
+          AND NOT t.relispartition
+          AND r.relname = ANY(%s)
+          AND NOT (t.relname = ANY(%s))
+        """,
+        (tables, tables),
+    )
+    referencing = cursor.fetchall()
+    if referencing:
+        raise RuntimeError(
+            "Carga atómica: tablas fuera del swap con FKs hacia tablas del swap: "
+            + ", ".join(f"{table} -> {referenced}" for table, referenced in referencing)
+        )
+
+
+def _get_partition_key(cursor, table_name: str) -> Optional[str]:
+    """
+    Devuelve la clave de particionado de public.<tabla> (ej: "LIST (anio)") o None si no está particionada.
+    """
+    cursor.execute(
+        """
+        SELECT pg_get_partkeydef(c.oid)
+        FROM pg_class c
+        WHERE c.relnamespace = 'public'::regnamespace
+          AND c.relname = %s
+        """,
+        (table_name,),
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _get_partitions(cursor, schema_name: str, table_name: str) -> List[Tuple[str, str]]:
+    """
+    Devuelve (partición, límites) de <esquema>.<tabla>, por ejemplo
+    ("rendimiento_ramo_2023", "FOR VALUES IN (2023)").
+    """
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c         ON c.oid = i.inhrelid
+        JOIN pg_class p         ON p.oid = i.inhparent
+        JOIN pg_namespace n     ON n.oid = p.relnamespace
+        WHERE n.nspname = %s
+          AND p.relname = %s
+        ORDER BY c.relname
+        """,
+        (schema_name, table_name),
+    )
+    return cursor.fetchall()
+
+
+def _get_constraint_definitions(cursor, table_name: str, constraint_types: str) -> List[Tuple[str, str]]:
+    """
+    Devuelve (nombre, definición) de las constraints de public.<tabla> de los tipos pedidos.
+
+    Contexto:
+    - constraint_types usa los códigos de pg_constraint.contype: 'p' (PK), 'u' (UNIQUE), 'f' (FK).
+    - La definición se lee con search_path por defecto, así las tablas referenciadas quedan
+      sin esquema y se resuelven contra el esquema shadow al recrearlas.
+    """
+    cursor.execute(
+        """
+        SELECT c.conname, pg_get_constraintdef(c.oid)
+        FROM pg_constraint c
+        JOIN pg_class t     ON t.oid = c.conrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = 'public'
+          AND t.relname = %s
+          AND c.contype = ANY(%s)
+        ORDER BY c.conname
+        """,
+        (table_name, list(constraint_types)),
+    )
+    return cursor.fetchall()
+
+
+def _get_insertable_columns(cursor, table_name: str) -> List[str]:
+    """
+    Devuelve las columnas de public.<tabla> que aceptan INSERT (excluye columnas GENERATED).
+    """
+    cursor.execute(
+        """
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_schema = 'public'
+          AND table_name = %s
+          AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+        """,
+        (table_name,),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _get_secondary_index_definitions(cursor, table_name: str) -> List[str]:
+    """
+    Devuelve los CREATE INDEX de public.<tabla> que no respaldan una PK/UNIQUE.
+    """
+    cursor.execute(
+        """
+        SELECT i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = 'public'
+          AND i.tablename = %s
+          AND NOT EXISTS (
+              SELECT 1
+              FROM pg_constraint c
+              WHERE c.conname = i.indexname
+                AND c.connamespace = 'public'::regnamespace
+          )
+        ORDER BY i.indexname
+        """,
+        (table_name,),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _get_owned_sequences(cursor, schema_name: str, table_name: str) -> List[Tuple[str, str]]:
+    """
+    Devuelve (secuencia, columna) de las secuencias BIGSERIAL que pertenecen a <esquema>.<tabla>.
+    """
+    cursor.execute(
+        """
+        SELECT s.relname, a.attname
+        FROM pg_class s
+        JOIN pg_namespace sn ON sn.oid = s.relnamespace
+        JOIN pg_depend d     ON d.objid = s.oid AND d.deptype = 'a'
+        JOIN pg_class t      ON t.oid = d.refobjid
+        JOIN pg_namespace tn ON tn.oid = t.relnamespace
+        JOIN pg_attribute a  ON a.attrelid = t.oid AND a.attnum = d.refobjsubid
+        WHERE s.relkind = 'S'
+          AND tn.nspname = %s
+          AND t.relname = %s
+        """,
+        (schema_name, table_name),
+    )
+    return cursor.fetchall()
+
+
+# Etapas del load atómico
+def prepare_shadow_schema(conn, copy_data: bool = True) -> List[str]:
+    """
+    Crea el esquema shadow como copia UNLOGGED de las tablas del ETL (SHADOW_TABLES), lista para la carga.
+
+    Qué hace:
+    - Crea cada tabla con LIKE (defaults, checks, NOT NULL, columnas GENERATED), sin índices ni FKs.
+      Las tablas particionadas conservan su clave y sus particiones (las particiones son UNLOGGED;
+      PostgreSQL no permite una tabla padre UNLOGGED).
+    - Copia los datos actuales (las cargas append / merge son incrementales; con copy_data=False,
+      carga replace, las tablas quedan vacías) y luego agrega PK/UNIQUE,
+      necesarias para los ON CONFLICT de populate_database.py.
+
+    Dónde:
+    - Usado por load_in_shadow_schema() en este archivo.
+    """
+    cursor = conn.cursor()
+    try:
+        tables = list(SHADOW_TABLES)
+        _check_shadow_tables(cursor, tables)
+
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SHADOW_SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SHADOW_SCHEMA}")
+
+        for table_name in tables:
+            partition_key = _get_partition_key(cursor, table_name)
+            cursor.execute(
+                f"""
+                CREATE {"" if partition_key else "UNLOGGED"} TABLE {SHADOW_SCHEMA}.{table_name}
+                (LIKE public.{table_name}
+                 INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY INCLUDING GENERATED)
+                {f"PARTITION BY {partition_key}" if partition_key else ""}
+                """
+            )
+            for partition_name, partition_bound in _get_partitions(cursor, "public", table_name):
+                cursor.execute(
+                    f"CREATE UNLOGGED TABLE {SHADOW_SCHEMA}.{partition_name} "
+                    f"PARTITION OF {SHADOW_SCHEMA}.{table_name} {partition_bound}"
+                )
+            if copy_data:
+                columnas_sql = ", ".join(_get_insertable_columns(cursor, table_name))
+                cursor.execute(
+                    f"INSERT INTO {SHADOW_SCHEMA}.{table_name} ({columnas_sql}) "
+                    f"SELECT {columnas_sql} FROM public.{table_name}"
+                )
+            for constraint_name, constraint_definition in _get_constraint_definitions(cursor, table_name, "pu"):
+                cursor.execute(
+                    f"ALTER TABLE {SHADOW_SCHEMA}.{table_name} "
+                    f"ADD CONSTRAINT {constraint_name} {constraint_definition}"
+                )
+
+        conn.commit()
+        return tables
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def finalize_shadow_schema(conn, tables: List[str]) -> None:
+    """
+    Deja el esquema shadow con la misma forma que public, después de la carga.
+
+    Qué hace:
+    - Pasa las tablas (y las particiones) a LOGGED, antes de las FKs: una tabla LOGGED
+      no puede referenciar una UNLOGGED.
+    - Recrea FKs e índices secundarios y ejecuta ANALYZE.
+
+    Dónde:
+    - Usado por load_in_shadow_schema() en este archivo.
+    """
+    cursor = conn.cursor()
+    try:
+        for table_name in tables:
+            partitions = _get_partitions(cursor, SHADOW_SCHEMA, table_name)
+            if not _get_partition_key(cursor, table_name):
+                cursor.execute(f"ALTER TABLE {SHADOW_SCHEMA}.{table_name} SET LOGGED")
+            for partition_name, _ in partitions:
+                cursor.execute(f"ALTER TABLE {SHADOW_SCHEMA}.{partition_name} SET LOGGED")
+
+        # Las definiciones de FK se leen desde public y se aplican con search_path = shadow, public
+        # (las FKs hacia asignaturas quedan apuntando a public.asignaturas).
+        foreign_keys = {
+            table_name: _get_constraint_definitions(cursor, table_name, "f")
+            for table_name in tables
+        }
+        index_definitions = {
+            table_name: _get_secondary_index_definitions(cursor, table_name)
+            for table_name in tables
+        }
+
+        cursor.execute(f"SET LOCAL search_path TO {SHADOW_SCHEMA}, public")
+        for table_name in tables:
+            for constraint_name, constraint_definition in foreign_keys[table_name]:
+                cursor.execute(
+                    f"ALTER TABLE {SHADOW_SCHEMA}.{table_name} "
+                    f"ADD CONSTRAINT {constraint_name} {constraint_definition}"
+                )
+            for index_definition in index_definitions[table_name]:
+                # En tablas particionadas indexdef trae "ON ONLY": se crea sin ONLY para cubrir las particiones
+                cursor.execute(
+                    index_definition
+                    .replace(f" ON ONLY public.{table_name} ", f" ON {SHADOW_SCHEMA}.{table_name} ")
+                    .replace(f" ON public.{table_name} ", f" ON {SHADOW_SCHEMA}.{table_name} ")
+                )
+            cursor.execute(f"ANALYZE {SHADOW_SCHEMA}.{table_name}")
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def swap_shadow_schema(conn, tables: List[str]) -> None:
+    """
+    Reemplaza las tablas de public por las del esquema shadow en una sola transacción.
+
+    Qué hace:
+    - Suelta las secuencias BIGSERIAL de las tablas viejas (se quedan en public),
+      mueve las tablas viejas (con sus particiones) a un esquema de retiro y las nuevas a public,
+      y vuelve a asignar las secuencias a las tablas nuevas.
+    - Después del commit elimina las tablas viejas.
+
+    Para qué:
+    - Los lectores (KPIs, explorador de tablas) ven el snapshot anterior completo hasta el commit
+      y el nuevo completo después; nunca datos a medio cargar.
+
+    Dónde:
+    - Usado por load_in_shadow_schema() en este archivo.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {RETIRED_SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {RETIRED_SCHEMA}")
+
+        owned_sequences = {
+            table_name: _get_owned_sequences(cursor, "public", table_name)
+            for table_name in tables
+        }
+
+        for table_name in tables:
+            # SET SCHEMA no mueve las particiones: se mueven una a una junto a su tabla padre
+            public_partitions = [name for name, _ in _get_partitions(cursor, "public", table_name)]
+            shadow_partitions = [name for name, _ in _get_partitions(cursor, SHADOW_SCHEMA, table_name)]
+
+            for sequence_name, _ in owned_sequences[table_name]:
+                cursor.execute(f"ALTER SEQUENCE public.{sequence_name} OWNED BY NONE")
+            for relation_name in [table_name, *public_partitions]:
+                cursor.execute(f"ALTER TABLE public.{relation_name} SET SCHEMA {RETIRED_SCHEMA}")
+            for relation_name in [table_name, *shadow_partitions]:
+                cursor.execute(f"ALTER TABLE {SHADOW_SCHEMA}.{relation_name} SET SCHEMA public")
+            for sequence_name, column_name in owned_sequences[table_name]:
+                cursor.execute(
+                    f"ALTER SEQUENCE public.{sequence_name} OWNED BY public.{table_name}.{column_name}"
+                )
+
+        conn.commit()
+
+        cursor.execute(f"DROP SCHEMA {RETIRED_SCHEMA} CASCADE")
+        cursor.execute(f"DROP SCHEMA {SHADOW_SCHEMA} CASCADE")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def drop_shadow_schema(conn) -> None:
+    """
+    Elimina el esquema shadow (limpieza tras una carga atómica fallida). public no se toca.
+    """
+    conn.rollback()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SHADOW_SCHEMA} CASCADE")
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def shadow_connection_factory(connection_factory: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Envuelve una fábrica de conexiones para que cada conexión trabaje sobre el esquema shadow.
+
+    Contexto:
+    - connection_factory es un context manager como get_etl_raw_connection().
+    - Se fija search_path = shadow, public al abrir y se restablece al cerrar, antes de que la conexión
+      vuelva al pool. Las tablas fuera de SHADOW_TABLES (asignaturas, carga_csv) se resuelven en public.
+
+    Para qué:
+    - Que populate_database.py y el refresco Gold escriban en las tablas shadow sin cambios en su SQL,
+      también cuando la carga usa varias conexiones en paralelo.
+    """
+    @contextmanager
+    def shadow_connection():
+        with connection_factory() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SET search_path TO {SHADOW_SCHEMA}, public")
+            conn.commit()
+            try:
+                yield conn
+            finally:
+                conn.rollback()
+                cursor.execute("RESET search_path")
+                conn.commit()
+                cursor.close()
+
+    return shadow_connection
+
+
+def load_in_shadow_schema(
+    conn,
+    connection_factory  : Callable[[], Any],
+    load_function       : Callable[[Callable[[], Any]], Any],
+    copy_data           : bool = True,
+) -> Any:
+    """
+    Ejecuta una carga completa (base + Gold) sobre el esquema shadow y luego hace el swap.
+
+    Contexto:
+    - conn se usa para preparar, finalizar y publicar el esquema shadow, y mantiene el lock exclusivo
+      de etl_write_lock() de principio a fin: otra carga (atómica o no, de otro worker, la CLI o la
+      carpeta vigilada) o un refresco Gold espera en vez de escribir en public entre la copia y el swap.
+    - load_function recibe una fábrica de conexiones con search_path = shadow, public
+      (ver shadow_connection_factory).
+    - copy_data=False (carga replace) no copia los datos actuales al esquema shadow.
+    - Si la carga falla, se elimina el esquema shadow y public queda exactamente como estaba.
+
+    Para qué:
+    - Modo de carga atómico: los lectores mantienen su velocidad durante la carga
+      y siempre ven un snapshot consistente.
+
+    Dónde se usa:
+    - run_pipeline_on_dataframe(..., atomic=True) en app/services/pipeline.py.
+    """
+    with etl_write_lock(conn, exclusive=True):
+        tables = prepare_shadow_schema(conn, copy_data)
+        try:
+            result = load_function(shadow_connection_factory(connection_factory))
+            finalize_shadow_schema(conn, tables)
+            swap_shadow_schema(conn, tables)
+            return result
+        except Exception:
+            drop_shadow_schema(conn)
+            raise
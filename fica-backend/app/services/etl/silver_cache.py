@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.core.config import config
+from app.services import upload_batch, upload_reader
+from app.services.etl import delete_algebra_classes, group_by_student, group_by_test
+
+logger = logging.getLogger(__name__)
+
+
+# Código que determina el resultado Silver a partir de los bytes del archivo: lector Bronze + etapas Silver
+# (+ unión de los archivos de una carga múltiple).
+# Si cambia cualquiera de estos módulos, la versión cambia y los artefactos anteriores dejan de usarse.
+SILVER_CODE_MODULES = [upload_reader, upload_batch, delete_algebra_classes, group_by_test, group_by_student]
+
+# Clave de los metadatos propios (resúmenes Silver, archivo de origen) en el esquema Parquet
+SILVER_METADATA_KEY = b"fica_silver"
+
+# Huella válida (compute_upload_sha256 / compute_batch_sha256): 64 caracteres hex en minúscula.
+# Es parte del nombre del artefacto: cualquier otro valor (ej: "../") no llega a armar una ruta
+SHA256_HEX_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def _compute_silver_code_version() -> str:
+    digest = hashlib.sha256()
+    for module in SILVER_CODE_MODULES:
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+SILVER_CODE_VERSION = _compute_silver_code_version()
+
+
+class SilverArtifactNotFoundError(LookupError):
+    """
+    No hay artefacto Silver para esa huella (+ hoja) con la versión actual del código.
+    """
+
+
+class InvalidSilverKeyError(ValueError):
+    """
+    La huella pedida no es un SHA-256 en hex (64 caracteres [0-9a-f]).
+    """
+
+
+def silver_cache_enabled() -> bool:
+    return bool(config.SILVER_CACHE_DIR)
+
+
+def silver_artifact_path(sha256: str, hoja: Optional[str] = None) -> Path:
+    """
+    Ruta del artefacto Silver: <SILVER_CACHE_DIR>/<sha256 del archivo>[-<hoja>]-<versión del código>.parquet
+    (la hoja va como hash corto: el nombre de una hoja Excel puede traer cualquier carácter).
+    La huella llega desde la API (/run/cached, /gold/rebuild): si no es un SHA-256 en hex se rechaza.
+    """
+    if not isinstance(sha256, str) or not SHA256_HEX_PATTERN.fullmatch(sha256):
+        raise InvalidSilverKeyError(f"Huella SHA-256 inválida: {sha256!r}")
+    partes = [sha256]
+    if hoja:
+        partes.append(hashlib.sha256(hoja.encode("utf-8")).hexdigest()[:12])
+    partes.append(SILVER_CODE_VERSION)
+    return Path(config.SILVER_CACHE_DIR) / f"{'-'.join(partes)}.parquet"
+
+
+def save_silver_artifact(
+    dataframe_silver_student_rows: pd.DataFrame,
+    summary_silver: Dict[str, Any],
+    sha256: str,
+    nombre_archivo: str,
+    hoja: Optional[str] = None,
+) -> Optional[Path]:
+    """
+    Guarda el DataFrame Silver como Parquet comprimido (zstd), con los resúmenes de las etapas Silver.
+
+    Contexto:
+    - La clave es la huella del archivo subido (+ hoja) y SILVER_CODE_VERSION.
+    - Se escribe a un archivo temporal y se renombra: un lector nunca ve un artefacto a medias.
+    - Un error al escribir se registra y no corta la carga (el artefacto es solo un atajo).
+
+    Dónde se usa:
+    - run_pipeline_on_dataframe() en app/services/pipeline.py, antes de cargar la DB:
+      si la carga falla, el reintento ya encuentra el artefacto.
+    """
+    if not silver_cache_enabled():
+        return None
+
+    path = silver_artifact_path(sha256, hoja)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table       = pa.Table.from_pandas(dataframe_silver_student_rows, preserve_index=True)
+        metadata    = {
+            **(table.schema.metadata or {}),
+            SILVER_METADATA_KEY: json.dumps({
+                "sha256"            : sha256,
+                "hoja"              : hoja,
+                "nombre_archivo"    : nombre_archivo,
+                "code_version"      : SILVER_CODE_VERSION,
+                "summary"           : summary_silver,
+            }, default=str).encode("utf-8"),
+        }
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table.replace_schema_metadata(metadata), temp_path, compression="zstd")
+        os.replace(temp_path, path)
+    except Exception as e:
+        logger.warning("No se pudo guardar el artefacto Silver %s: %s", path, e)
+        return None
+
+    prune_silver_cache()
+    return path
+
+
+def read_silver_metadata(path: Path) -> Dict[str, Any]:
+    return json.loads(pq.read_schema(path, memory_map=True).metadata[SILVER_METADATA_KEY])
+
+
+def load_silver_artifact(sha256: str, hoja: Optional[str] = None) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """
+    Lee (memory-map) el artefacto Silver de este archivo, si existe para la versión actual del código.
+    Devuelve (DataFrame Silver, metadatos con "summary" y "nombre_archivo") o None.
+    """
+    if not silver_cache_enabled():
+        return None
+    path = silver_artifact_path(sha256, hoja)
+    if not path.exists():
+        return None
+    try:
+        table = pq.read_table(path, memory_map=True)
+        return table.to_pandas(), json.loads(table.schema.metadata[SILVER_METADATA_KEY])
+    except Exception as e:
+        logger.warning("Artefacto Silver ilegible %s, se ignora: %s", path, e)
+        return None
+
+
+def load_silver_columns(sha256: str, columns: List[str], hoja: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Lee solo algunas columnas del artefacto (ej: id_alumno y año_ingreso para saber las cohortes).
+    """
+    if not silver_cache_enabled():
+        return None
+    path = silver_artifact_path(sha256, hoja)
+    if not path.exists():
+        return None
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def list_silver_artifacts() -> List[Dict[str, Any]]:
+    """
+    Artefactos de la versión actual del código, del más reciente al más antiguo.
+    """
+    if not silver_cache_enabled() or not Path(config.SILVER_CACHE_DIR).is_dir():
+        return []
+    artifacts = []
+    for path in sorted(
+        Path(config.SILVER_CACHE_DIR).glob(f"*-{SILVER_CODE_VERSION}.parquet"),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    ):
+        metadata = read_silver_metadata(path)
+        artifacts.append({
+            "sha256"            : metadata["sha256"],
+            "hoja"              : metadata["hoja"],
+            "nombre_archivo"    : metadata["nombre_archivo"],
+            "bytes"             : path.stat().st_size,
+        })
+    return artifacts
+
+
+def prune_silver_cache(max_artifacts: Optional[int] = None) -> List[str]:
+    """
+    Borra artefactos de otras versiones del código y, de los actuales, los más antiguos
+    por sobre SILVER_CACHE_MAX_ARTIFACTS.
+    """
+    max_artifacts   = config.SILVER_CACHE_MAX_ARTIFACTS if max_artifacts is None else max_artifacts
+    cache_dir       = Path(config.SILVER_CACHE_DIR)
+    current         = sorted(
+        cache_dir.glob(f"*-{SILVER_CODE_VERSION}.parquet"),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    stale = [p for p in cache_dir.glob("*.parquet") if p not in current] + current[max_artifacts:]
+    removed = []
+    for path in stale:
+        try:
+            path.unlink()
+            removed.append(path.name)
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+import numpy as np
+from psycopg2.extras import Json
+
+
+# Modos de una carga anterior con el mismo archivo cuyo resultado equivale a repetir la carga pedida:
+# - append  : el archivo ya está completo en la DB tras cualquier carga suya (append no modifica filas)
+# - merge   : solo una carga merge o replace dejó las notas del archivo tal cual
+# - replace : solo otra carga replace
+REUSABLE_PREVIOUS_MODES = {
+    "append"    : ["append", "replace", "merge"],
+    "merge"     : ["merge", "replace"],
+    "replace"   : ["replace"],
+}
+
+# Cargas posteriores que invalidan el resultado guardado:
+# - append  : replace / merge pueden haber quitado filas del archivo
+# - merge / replace : cualquier carga posterior agrega filas que repetirla quitaría
+INVALIDATING_LATER_MODES = {
+    "append"    : ["replace", "merge"],
+    "merge"     : ["append", "replace", "merge"],
+    "replace"   : ["append", "replace", "merge"],
+}
+
+SQL_FIND_REUSABLE_UPLOAD = """
+    SELECT c.id_carga, c.nombre_archivo, c.fecha_carga, c.modo, c.resumen
+    FROM carga_csv c
+    WHERE c.sha256 = %(sha256)s
+      AND c.hoja IS NOT DISTINCT FROM %(hoja)s
+      AND c.modo = ANY(%(previous_modes)s)
+      AND c.resumen IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1
+          FROM carga_csv posterior
+          WHERE posterior.id_carga > c.id_carga
+            AND posterior.modo = ANY(%(later_modes)s)
+      )
+    ORDER BY c.id_carga DESC
+    LIMIT 1
+"""
+
+SQL_INSERT_UPLOAD = """
+    INSERT INTO carga_csv (nombre_archivo, sha256, modo, hoja, resumen)
+    VALUES (%s, %s, %s, %s, %s)
+    RETURNING id_carga, fecha_carga
+"""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def find_reusable_upload(conn, sha256: str, mode: str, hoja: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Busca en carga_csv una carga del mismo archivo (sha256 + hoja) que haga innecesario repetirla.
+
+    Contexto:
+    - La huella es del contenido: el mismo archivo con otro nombre también se reconoce.
+    - Solo se reutiliza si ninguna carga posterior pudo cambiar lo que dejó en la DB
+      (ver REUSABLE_PREVIOUS_MODES e INVALIDATING_LATER_MODES).
+
+    Dónde se usa:
+    - find_duplicate_upload() en app/services/pipeline.py.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            SQL_FIND_REUSABLE_UPLOAD,
+            {
+                "sha256"            : sha256,
+                "hoja"              : hoja,
+                "previous_modes"    : REUSABLE_PREVIOUS_MODES[mode],
+                "later_modes"       : INVALIDATING_LATER_MODES[mode],
+            },
+        )
+        row = cursor.fetchone()
+        conn.commit()
+    finally:
+        cursor.close()
+
+    if row is None:
+        return None
+    id_carga, nombre_archivo, fecha_carga, modo, resumen = row
+    return {
+        "id_carga"          : id_carga,
+        "nombre_archivo"    : nombre_archivo,
+        "fecha_carga"       : fecha_carga.isoformat(),
+        "modo"              : modo,
+        "resumen"           : resumen,
+    }
+
+
+def record_upload(
+    conn,
+    nombre_archivo: str,
+    sha256: str,
+    mode: str,
+    summary: Dict[str, Any],
+    hoja: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Registra en carga_csv una carga completada, con su huella y el resumen del pipeline.
+
+    Contexto:
+    - Se ejecuta después de la carga (y del swap en modo atómico): si la carga falla, no queda registro.
+    - carga_csv no se vacía en modo replace: es el historial de cargas.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            SQL_INSERT_UPLOAD,
+            (nombre_archivo, sha256, mode, hoja, Json(summary, dumps=lambda obj: json.dumps(obj, default=_json_default))),
+        )
+        id_carga, fecha_carga = cursor.fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return {"id_carga": id_carga, "fecha_carga": fecha_carga.isoformat()}
@@ -1,19 +1,19 @@
 from typing import Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import pandas as pd
 import numpy as np
 
 
-def calculate_kpi_1_3(
-    db      : Session,
+async def calculate_kpi_1_3(
+    db      : AsyncSession,
     cohorte : int = 2022
 ) -> Dict[str, Any]:
     """
     KPI 1.3 - Correlación múltiple (R) de predictores de ingreso vs Nota 1er bimestre
 
     Args:
-        db: Sesión de base de datos SQLAlchemy
+        db: Sesión async de base de datos SQLAlchemy
         cohorte: Año de ingreso de la cohorte (por defecto 2022)
 
     Returns:
@@ -36,7 +36,7 @@ def calculate_kpi_1_3(
     """)
 
     # ------ Ejecutar query y cargar a DataFrame ------
-    result  = db.execute(query, {"cohorte": cohorte})
+    result  = await db.execute(query, {"cohorte": cohorte})
     df      = pd.DataFrame(result.fetchall(), columns=[
         'id_estudiante', 'tipo_prueba', 'puntaje_ingreso', 'diagnostico', 'nota_b1'
     ])
@@ -1,17 +1,17 @@
 from typing import Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 
-def calculate_kpi_1_4(
-    db      : Session,
+async def calculate_kpi_1_4(
+    db      : AsyncSession,
     cohorte : int = 2022
 ) -> Dict[str, Any]:
     """
     KPI 1.4 - Estudiantes que aprueban los 4 bimestres sin reprobar ramos
 
     Args:
-        db      : Sesión de base de datos SQLAlchemy
+        db      : Sesión async de base de datos SQLAlchemy
         cohorte : Año de ingreso de la cohorte (por defecto 2022). Este KPI solo
                   está definido operacionalmente para la cohorte 2022, ya que el
                   dataset actual (2022–2024) solo garantiza 4 bimestres completos
@@ -40,7 +40,7 @@ def calculate_kpi_1_4(
     """)
 
     # ------ Ejecutar query total y validar cohorte ------
-    result_total_estudiantes = db.execute(query_total_estudiantes, {"cohorte": cohorte})
+    result_total_estudiantes = await db.execute(query_total_estudiantes, {"cohorte": cohorte})
     row_total_estudiantes    = result_total_estudiantes.fetchone()
 
     E = int(row_total_estudiantes[0]) if row_total_estudiantes else 0
@@ -64,7 +64,7 @@ def calculate_kpi_1_4(
     """)
 
     # ------ Ejecutar query de aprobación y extraer métricas ------
-    result_aprueba8 = db.execute(query_aprueba8, {"cohorte": cohorte})
+    result_aprueba8 = await db.execute(query_aprueba8, {"cohorte": cohorte})
     row_aprueba8    = result_aprueba8.fetchone()
 
     Naprueban_8 = 0
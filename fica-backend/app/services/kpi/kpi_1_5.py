@@ -1,17 +1,17 @@
 from typing import Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 
-def calculate_kpi_1_5(
-    db      : Session,
+async def calculate_kpi_1_5(
+    db      : AsyncSession,
     cohorte : int = 2022
 ) -> Dict[str, Any]:
     """
     KPI 1.5 - Tasa de deserción / congelamiento (no completan 4 ramos)
 
     Args:
-        db: Sesión de base de datos SQLAlchemy
+        db: Sesión async de base de datos SQLAlchemy
         cohorte: Año de ingreso de la cohorte (por defecto 2022). Este KPI solo
                  está definido operacionalmente para las cohortes 2022 y 2023,
                  ya que cada una puede alcanzar 4 ramos en un año.
@@ -39,7 +39,7 @@ def calculate_kpi_1_5(
     """)
 
     # ------ Ejecutar query total y validar cohorte ------
-    result_total_estudiantes = db.execute(query_total_estudiantes, {"cohorte": cohorte})
+    result_total_estudiantes = await db.execute(query_total_estudiantes, {"cohorte": cohorte})
     row_total_estudiantes    = result_total_estudiantes.fetchone()
 
     E = int(row_total_estudiantes[0]) if row_total_estudiantes else 0
@@ -63,7 +63,7 @@ def calculate_kpi_1_5(
     """)
 
     # ------ Ejecutar query de no completan y extraer métricas ------
-    result_no_completan  = db.execute(query_no_completan, {"cohorte": cohorte})
+    result_no_completan  = await db.execute(query_no_completan, {"cohorte": cohorte})
     row_no_completan     = result_no_completan.fetchone()
 
     N_no_completan  = 0
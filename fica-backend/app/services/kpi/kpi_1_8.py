@@ -1,18 +1,18 @@
 from typing import Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import pandas as pd
 
 
-def calculate_kpi_1_8(
-    db      : Session,
+async def calculate_kpi_1_8(
+    db      : AsyncSession,
     cohorte : int = 2022
 ) -> Dict[str, Any]:
     """
     KPI 1.8 - Tasa de reprobación Nota 1er bimestre por quintil
 
     Args:
-        db      : Sesión de base de datos SQLAlchemy
+        db      : Sesión async de base de datos SQLAlchemy
         cohorte : Año de ingreso de la cohorte (por defecto 2022)
 
     Returns:
@@ -31,7 +31,7 @@ def calculate_kpi_1_8(
     """)
 
     # ------ Ejecutar query y armar DataFrame ------
-    result  = db.execute(query, {"cohorte": cohorte})
+    result  = await db.execute(query, {"cohorte": cohorte})
     df      = pd.DataFrame(result.fetchall(), columns=[
         "id_estudiante", "puntaje_ingreso", "diagnostico", "nota_b1"
     ])
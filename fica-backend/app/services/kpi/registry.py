@@ -1,5 +1,5 @@
-from typing import Callable, Dict, Any
-from sqlalchemy.orm import Session
+from typing import Awaitable, Callable, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.kpi.kpi_1_1 import calculate_kpi_1_1
 from app.services.kpi.kpi_1_2_1 import calculate_kpi_1_2_1
@@ -12,7 +12,7 @@ from app.services.kpi.kpi_1_7 import calculate_kpi_1_7
 from app.services.kpi.kpi_1_8 import calculate_kpi_1_8
 
 
-KpiFn = Callable[[Session, int], Dict[str, Any]]
+KpiFn = Callable[[AsyncSession, int], Awaitable[Dict[str, Any]]]
 
 KPI_REGISTRY: Dict[str, KpiFn] = {
     "1.1"   : calculate_kpi_1_1,
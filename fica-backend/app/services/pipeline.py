@@ -1,66 +1,648 @@
 import pandas as pd
+from contextlib import contextmanager
+from functools import partial
 from sqlalchemy.engine import Engine
-from typing import Any, Dict, Tuple, Optional
+from typing import Any, Callable, Dict, List, Tuple, Optional
 
 from app.services.etl.delete_algebra_classes import filter_out_algebra
-from app.services.etl.group_by_test import group_by_test
+from app.services.etl.group_by_test import group_by_test, DATA_START_ROW
 from app.services.etl.group_by_student import group_by_student
-from app.services.etl.populate_database import populate_all
-from app.services.etl.build_gold import build_all_gold
-from app.services.etl.populate_gold import populate_gold_all
-from app.core.database.db import get_raw_connection
+from app.services.etl.populate_database import populate_all_parallel
+from app.services.etl.gold_utils import get_cohortes_in_dataframe
+from app.services.etl.build_gold_sql import rebuild_all_gold_sql, refresh_gold_by_cohort
+from app.services.etl.build_gold import build_all_gold, build_gold_kpi_preview
+from app.services.etl.shadow_load import etl_write_lock, load_in_shadow_schema
+from app.services.etl.full_reload import replace_all
+from app.services.etl.merge_load import MERGE_TABLE_LOADERS
+from app.services.etl.upload_history import find_reusable_upload, record_upload
+from app.services.etl.silver_cache import (
+    save_silver_artifact,
+    load_silver_artifact,
+    load_silver_columns,
+    silver_artifact_path,
+    SilverArtifactNotFoundError,
+)
+from app.services.upload_batch import prepare_silver_parts, combine_silver_parts
+from app.services.etl.checkpoints import (
+    checkpoints_enabled,
+    start_run,
+    resume_run,
+    load_run,
+    mark_stage,
+    mark_table,
+    mark_failed,
+    mark_completed,
+    PipelineRunNotResumableError,
+)
+from app.core.database.db import get_etl_raw_connection
+from app.core.database.replica import record_pipeline_lsn
+from app.core.config import config
+
+
+# Modos de carga del modelo base:
+# - append  : inserts incrementales (ON CONFLICT DO NOTHING) + refresco Gold de las cohortes tocadas
+# - replace : recarga completa con TRUNCATE + COPY (ver app/services/etl/full_reload.py)
+# - merge   : como append, pero rendimiento_ramo se sincroniza por huella de contenido
+#             (inserta, actualiza y elimina; ver app/services/etl/merge_load.py)
+LOAD_MODES = ("append", "replace", "merge")
+
+
+def _connection_factory_for(db_engine: Optional[Engine]) -> Callable[[], Any]:
+    """
+    Devuelve un context manager que entrega conexiones raw del engine indicado (o del pool del ETL).
+    """
+    if db_engine is None:
+        return get_etl_raw_connection
+
+    @contextmanager
+    def engine_connection():
+        connection = db_engine.raw_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    return engine_connection
+
+
+def _load_into_database(
+    connection_factory: Callable[[], Any],
+    dataframe_silver_student_rows: pd.DataFrame,
+    cohortes_afectadas: list[int],
+    atomic: bool,
+    mode: str = "append",
+    checkpoint_run: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Carga el modelo base (tablas independientes en paralelo) y luego refresca Gold.
+
+    Contexto:
+    - Gold se recalcula desde las tablas base, por eso corre después de que terminan todas.
+    - Con mode="replace" base y Gold se vacían y se recargan completos en una sola transacción.
+    - Con mode="merge" rendimiento_ramo se sincroniza con el archivo (notas corregidas incluidas).
+    - Con atomic=True la carga se hace en el esquema shadow y se publica con un swap
+      (ver app/services/etl/shadow_load.py); si falla, public queda intacto.
+    - Sin atomic la carga sostiene etl_write_lock() compartido en una conexión aparte: no escribe
+      en public mientras una carga atómica copia y publica el esquema shadow.
+
+    Checkpoints (checkpoint_run, ver app/services/etl/checkpoints.py):
+    - append / merge sin atomic: cada tabla base hace commit en su conexión, así que se marca al terminar
+      y una reanudación carga solo las que faltan (o solo Gold, si la base ya estaba completa).
+    - atomic o replace: base y Gold se publican juntos (swap / una transacción); se marcan al final
+      y una reanudación repite la carga completa desde el artefacto Silver.
+    """
+    stages          = checkpoint_run["stages"] if checkpoint_run is not None else {}
+    track_tables    = checkpoint_run is not None and not atomic and mode != "replace"
+
+    def load(factory) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        if mode == "replace":
+            with factory() as connection:
+                return replace_all(connection, dataframe_silver_student_rows)
+
+        if track_tables and "base" in stages:
+            summary_database_base = stages["base"]["summary"]
+        else:
+            summary_database_base = populate_all_parallel(
+                factory,
+                dataframe_silver_student_rows,
+                max_workers=config.ETL_LOAD_WORKERS,
+                table_loaders=MERGE_TABLE_LOADERS if mode == "merge" else None,
+                completed_tables=(
+                    {table_name: marker["inserted"] for table_name, marker in checkpoint_run["tables"].items()}
+                    if track_tables else None
+                ),
+                on_table_loaded=partial(mark_table, checkpoint_run) if track_tables else None,
+            )
+            if track_tables:
+                mark_stage(checkpoint_run, "base", summary_database_base)
+        with factory() as connection:
+            summary_database_gold = refresh_gold_by_cohort(connection, cohortes_afectadas)
+        return summary_database_base, summary_database_gold
+
+    if atomic:
+        with connection_factory() as connection:
+            summary_database_base, summary_database_gold = load_in_shadow_schema(
+                connection, connection_factory, load, copy_data=mode != "replace",
+            )
+    else:
+        with connection_factory() as lock_connection, etl_write_lock(lock_connection):
+            summary_database_base, summary_database_gold = load(connection_factory)
+
+    if checkpoint_run is not None:
+        if "base" not in stages:
+            mark_stage(checkpoint_run, "base", summary_database_base)
+        mark_stage(checkpoint_run, "gold", summary_database_gold)
+    return summary_database_base, summary_database_gold
+
+
+def run_silver_stages(
+    df: pd.DataFrame,
+    header_rows: int,
+    upload: Optional[Dict[str, Any]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Etapas Silver en memoria + artefacto Parquet (si hay upload). No usa la DB.
+    Devuelve (DataFrame Silver, resúmenes Silver, estado del artefacto para summary["silver_cache"]).
+
+    Dónde se usa:
+    - run_pipeline_on_dataframe() y dry_run_pipeline_on_dataframe() en este archivo.
+    - Los procesos de python -m app.cli run: Silver en paralelo, la carga en DB la hace el proceso principal.
+    """
+    # ------ Copia de entrada ------
+    dataframe_input = df.copy()
+
+    # ------ Silver: filtrado/ordenamiento ------
+    dataframe_filtered, summary_filter          = filter_out_algebra(dataframe_input)
+    dataframe_grouped_test, summary_group_test  = group_by_test(dataframe_filtered, header_rows + 1)
+
+    return _finish_silver_stages(
+        dataframe_grouped_test,
+        {"filter_out_algebra": summary_filter, "group_by_test": summary_group_test},
+        upload,
+    )
+
+
+def _run_batch_silver_stages(
+    files: List[Dict[str, Any]],
+    sheet: Optional[str] = None,
+    upload: Optional[Dict[str, Any]] = None,
+    max_workers: int = config.UPLOAD_PARSE_WORKERS,
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Igual que run_silver_stages() para una carga de varios archivos (ver app/services/upload_batch.py):
+    lectura + filtrado + grupos por archivo en el pool de procesos, id_alumno una vez sobre el total.
+    """
+    parts                                   = prepare_silver_parts(files, sheet, max_workers)
+    dataframe_grouped_test, summary_parts   = combine_silver_parts(files, parts)
+    return _finish_silver_stages(dataframe_grouped_test, summary_parts, upload)
+
+
+def _finish_silver_stages(
+    dataframe_grouped_test: pd.DataFrame,
+    summary_parts: Dict[str, Dict[str, Any]],
+    upload: Optional[Dict[str, Any]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]], Optional[Dict[str, Any]]]:
+    # ------ Silver: normalización por estudiante (id_alumno) ------
+    dataframe_silver_student_rows, summary_group_student = group_by_student(dataframe_grouped_test)
+
+    summary_silver: Dict[str, Dict[str, Any]] = {
+        "filter_out_algebra"    : summary_parts["filter_out_algebra"],
+        "group_by_test"         : summary_parts["group_by_test"],
+        "group_by_student"      : summary_group_student,
+    }
+    if "batch" in summary_parts:
+        summary_silver["batch"] = summary_parts["batch"]
+
+    # ------ Artefacto Silver (Parquet): reintentos y refrescos Gold sin volver a procesar el archivo ------
+    silver_cache = None
+    if upload is not None:
+        artifact_path   = save_silver_artifact(
+            dataframe_silver_student_rows,
+            summary_silver,
+            upload["sha256"],
+            upload["nombre_archivo"],
+            upload.get("hoja"),
+        )
+        silver_cache    = {"status": "stored" if artifact_path else "disabled"}
+
+    return dataframe_silver_student_rows, summary_silver, silver_cache
 
 
 def run_pipeline_on_dataframe(
     df: pd.DataFrame,
     db_engine: Optional[Engine] = None,
+    atomic: bool = False,
+    mode: str = "append",
+    header_rows: int = DATA_START_ROW - 1,
+    upload: Optional[Dict[str, Any]] = None,
 ) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
     """
     Ejecuta el pipeline ETL completo sobre un DataFrame (Bronze/Silver en memoria) y persiste en DB.
 
     Contexto:
     - Este pipeline toma el DataFrame original (entrada), aplica transformaciones Silver,
-      carga el modelo base en PostgreSQL (populate_all) y luego construye + persiste tablas Gold
-      para simplificar los KPIs.
+      carga el modelo base en PostgreSQL (populate_all_parallel) y luego reconstruye, dentro de la DB,
+      solo las cohortes de Gold que tocó la carga (refresh_gold_by_cohort).
 
     Para qué:
     - Dejar lista la BD con:
       1) Tablas base (estudiantes, rendimiento, paes/pdt, etc.)
       2) Tablas Gold (gold_kpi_*) para evitar joins/cálculos repetidos en cada KPI
 
+    Modo atómico (atomic=True):
+    - Base + Gold se escriben en un esquema shadow (tablas UNLOGGED, índices al final) y se
+      publican con un swap en una sola transacción. Los KPIs nunca leen datos a medio cargar.
+
+    Modo de carga (mode, ver LOAD_MODES):
+    - "append" (por defecto): agrega lo nuevo y refresca Gold solo en las cohortes del archivo.
+    - "replace": el archivo pasa a ser el dataset completo (TRUNCATE + COPY + índices al final).
+    - "merge": como append, pero las notas y estados que cambiaron se actualizan y las filas
+      que ya no vienen se eliminan; summary["database"]["rendimiento"] trae
+      inserted / updated / deleted / unchanged.
+
+    Filas de encabezado (header_rows):
+    - Por defecto df es el archivo crudo, con sus 2 filas de encabezado.
+    - El DataFrame tipado de app/services/upload_reader.py ya viene sin ellas: header_rows=0.
+
+    Registro de la carga (upload):
+    - Con upload = {"nombre_archivo", "sha256", "hoja"} la carga completada se registra en carga_csv
+      junto con su resumen; summary["upload"] trae id_carga y duplicate=False.
+      Ver find_duplicate_upload() para no repetir un archivo ya cargado.
+    - Además el resultado Silver se guarda como artefacto Parquet (app/services/etl/silver_cache.py)
+      antes de cargar la DB: run_pipeline_from_silver_cache() lo reutiliza sin repetir Silver.
+
     Dónde se usa:
     - Servicio principal de procesamiento al cargar un CSV (o data equivalente) en el sistema.
     """
-    # ------ Copia de entrada ------
-    dataframe_input = df.copy()
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Modo de carga no soportado: {mode}. Use uno de {LOAD_MODES}")
 
-    # ------ Silver: filtrado/ordenamiento/normalización ------
-    dataframe_filtered, summary_filter                      = filter_out_algebra(dataframe_input)
-    dataframe_grouped_test, summary_group_test              = group_by_test(dataframe_filtered)
-    dataframe_silver_student_rows, summary_group_student    = group_by_student(dataframe_grouped_test)
+    dataframe_silver_student_rows, summary_silver, silver_cache = run_silver_stages(df, header_rows, upload)
 
-    # ------ Gold: construir tablas en memoria (desde df Silver final) ------
-    gold_tables_by_name = build_all_gold(dataframe_silver_student_rows)
+    summary = run_pipeline_on_silver(
+        dataframe_silver_student_rows,
+        summary_silver,
+        db_engine       = db_engine,
+        atomic          = atomic,
+        mode            = mode,
+        upload          = upload,
+        silver_cache    = silver_cache,
+    )
+    return dataframe_silver_student_rows, summary
 
-    # ------ Persistencia: Base + Gold en DB ------
-    if db_engine is None:
-        with get_raw_connection() as connection:
-            summary_database_base = populate_all(connection, dataframe_silver_student_rows)
-            summary_database_gold = populate_gold_all(connection, gold_tables_by_name)
-    else:
-        connection = db_engine.raw_connection()
-        try:
-            summary_database_base = populate_all(connection, dataframe_silver_student_rows)
-            summary_database_gold = populate_gold_all(connection, gold_tables_by_name)
-        finally:
-            connection.close()
 
-    # ------ Resumen final ------
-    summary: Dict[str, Dict[str, Any]] = {
-        "filter_out_algebra"    : summary_filter,
-        "group_by_test"         : summary_group_test,
-        "group_by_student"      : summary_group_student,
-        "database"              : summary_database_base,
-        "gold"                  : summary_database_gold,
-    }
+def run_pipeline_on_batch(
+    files: List[Dict[str, Any]],
+    db_engine: Optional[Engine] = None,
+    atomic: bool = False,
+    mode: str = "append",
+    sheet: Optional[str] = None,
+    upload: Optional[Dict[str, Any]] = None,
+    max_workers: int = config.UPLOAD_PARSE_WORKERS,
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    Ejecuta el pipeline sobre varios archivos (un export por bimestre / sede) como una sola carga.
+
+    Contexto:
+    - files viene de extract_upload_batch() (app/services/upload_batch.py): archivos en disco, en orden.
+    - Cada archivo se lee y limpia (filter_out_algebra + group_by_test) en un pool de procesos;
+      los resultados se concatenan y group_by_student asigna los id_alumno una sola vez sobre
+      la carga combinada (los mismos que si se hubiera subido un único archivo con todas las filas).
+    - La carga en DB, el refresco Gold y el registro en carga_csv ocurren una vez para todo el lote;
+      summary["batch"]["files"] trae los resúmenes por archivo.
+
+    Dónde se usa:
+    - POST /api/pipeline/run con varios archivos o un .zip, y python -m app.cli run --batch.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Modo de carga no soportado: {mode}. Use uno de {LOAD_MODES}")
+
+    dataframe_silver_student_rows, summary_silver, silver_cache = _run_batch_silver_stages(files, sheet, upload, max_workers)
+
+    summary = run_pipeline_on_silver(
+        dataframe_silver_student_rows,
+        summary_silver,
+        db_engine       = db_engine,
+        atomic          = atomic,
+        mode            = mode,
+        upload          = upload,
+        silver_cache    = silver_cache,
+    )
     return dataframe_silver_student_rows, summary
+
+
+def run_pipeline_on_silver(
+    dataframe_silver_student_rows: pd.DataFrame,
+    summary_silver: Dict[str, Dict[str, Any]],
+    db_engine: Optional[Engine] = None,
+    atomic: bool = False,
+    mode: str = "append",
+    upload: Optional[Dict[str, Any]] = None,
+    silver_cache: Optional[Dict[str, Any]] = None,
+    checkpoint_run: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Carga en DB un DataFrame Silver ya calculado: modelo base, refresco Gold, registro en carga_csv.
+
+    Contexto:
+    - Es la segunda mitad de run_pipeline_on_dataframe(); summary_silver son los resúmenes
+      de las etapas Silver (de esta ejecución o guardados en el artefacto).
+    - Con upload (y PIPELINE_CHECKPOINT_DIR) la ejecución deja un checkpoint por etapa;
+      si falla, resume_pipeline_run() la continúa desde la primera etapa incompleta.
+      checkpoint_run es el checkpoint a continuar (lo pasa resume_pipeline_run).
+
+    Dónde se usa:
+    - run_pipeline_on_dataframe(), run_pipeline_from_silver_cache() y resume_pipeline_run() en este archivo.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Modo de carga no soportado: {mode}. Use uno de {LOAD_MODES}")
+
+    resumed_from = None
+    if checkpoint_run is None and upload is not None and checkpoints_enabled():
+        checkpoint_run = start_run(upload, mode, atomic, summary_silver)
+    elif checkpoint_run is not None:
+        resumed_from = resume_run(checkpoint_run)
+    stages = checkpoint_run["stages"] if checkpoint_run is not None else {}
+
+    try:
+        if "gold" in stages:
+            # Reanudación con base y Gold ya cargados: solo falta el registro
+            summary_database_base   = stages["base"]["summary"]
+            summary_database_gold   = stages["gold"]["summary"]
+        else:
+            # ------ Gold: cohortes tocadas por esta carga ------
+            cohortes_afectadas = get_cohortes_in_dataframe(dataframe_silver_student_rows)
+
+            # ------ Persistencia: Base + refresco Gold por cohorte en DB ------
+            summary_database_base, summary_database_gold = _load_into_database(
+                _connection_factory_for(db_engine),
+                dataframe_silver_student_rows,
+                cohortes_afectadas,
+                atomic,
+                mode,
+                checkpoint_run,
+            )
+
+        # ------ Resumen final ------
+        summary: Dict[str, Dict[str, Any]] = {
+            **summary_silver,
+            "database"              : summary_database_base,
+            "gold"                  : summary_database_gold,
+            "load"                  : {"atomic": atomic, "mode": mode},
+        }
+        if silver_cache is not None:
+            summary["silver_cache"] = silver_cache
+        if checkpoint_run is not None:
+            summary["checkpoint"] = {"run_id": checkpoint_run["run_id"], "resumed_from": resumed_from}
+
+        with _connection_factory_for(db_engine)() as connection:
+            # ------ Historial de cargas (carga_csv): huella + resumen ------
+            if upload is not None:
+                if "registro" in stages:
+                    registro = stages["registro"]["summary"]
+                else:
+                    registro = record_upload(
+                        connection,
+                        upload["nombre_archivo"],
+                        upload["sha256"],
+                        mode,
+                        summary,
+                        upload.get("hoja"),
+                    )
+                    if checkpoint_run is not None:
+                        mark_stage(checkpoint_run, "registro", registro)
+                summary["upload"] = {
+                    "nombre_archivo"    : upload["nombre_archivo"],
+                    "sha256"            : upload["sha256"],
+                    "duplicate"         : False,
+                    **registro,
+                }
+
+            # ------ Posición del WAL de esta carga: las lecturas en la réplica la exigen ------
+            record_pipeline_lsn(connection)
+    except Exception as e:
+        if checkpoint_run is not None:
+            mark_failed(checkpoint_run, e)
+        raise
+
+    if checkpoint_run is not None:
+        mark_completed(checkpoint_run)
+    return summary
+
+
+def run_pipeline_from_silver_cache(
+    sha256: str,
+    hoja: Optional[str] = None,
+    db_engine: Optional[Engine] = None,
+    atomic: bool = False,
+    mode: str = "append",
+    nombre_archivo: Optional[str] = None,
+) -> Optional[Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]]:
+    """
+    Carga en DB el artefacto Silver de un archivo ya procesado, sin leerlo ni repetir Silver.
+
+    Contexto:
+    - El artefacto se lee con memory-map (pyarrow) y pasa directo a run_pipeline_on_silver().
+    - Devuelve None si no hay artefacto para esa huella (+ hoja) con la versión actual del código.
+
+    Para qué:
+    - Reintentar una carga que falló en la DB, o volver a cargar el mismo archivo (force=true),
+      sin subirlo ni re-parsearlo.
+
+    Dónde se usa:
+    - POST /api/pipeline/run (antes de leer el archivo) y POST /api/pipeline/run/cached.
+    """
+    artifact = load_silver_artifact(sha256, hoja)
+    if artifact is None:
+        return None
+    dataframe_silver_student_rows, metadata = artifact
+
+    summary = run_pipeline_on_silver(
+        dataframe_silver_student_rows,
+        metadata["summary"],
+        db_engine       = db_engine,
+        atomic          = atomic,
+        mode            = mode,
+        upload          = {
+            "nombre_archivo"    : nombre_archivo or metadata["nombre_archivo"],
+            "sha256"            : sha256,
+            "hoja"              : hoja,
+        },
+        silver_cache    = {"status": "hit", "artifact": silver_artifact_path(sha256, hoja).name},
+    )
+    return dataframe_silver_student_rows, summary
+
+
+def dry_run_on_silver(
+    dataframe_silver_student_rows: pd.DataFrame,
+    summary_silver: Dict[str, Dict[str, Any]],
+    silver_cache: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Construye Gold en memoria (build_all_gold) sobre un DataFrame Silver y resume lo que cargaría.
+
+    Qué devuelve:
+    - Los resúmenes Silver (filas filtradas de álgebra, grupos PAES/PDT, estudiantes).
+    - gold: filas por tabla Gold y kpi_preview: KPIs por cohorte (ver build_gold_kpi_preview).
+    - load: {"dry_run": True}; no hay summary database ni upload: nada se escribe.
+    """
+    gold_tables = build_all_gold(dataframe_silver_student_rows)
+
+    summary: Dict[str, Any] = {
+        **summary_silver,
+        "gold"          : {table_name: len(dataframe) for table_name, dataframe in gold_tables.items()},
+        "kpi_preview"   : build_gold_kpi_preview(gold_tables),
+        "load"          : {"dry_run": True},
+    }
+    if silver_cache is not None:
+        summary["silver_cache"] = silver_cache
+    return summary
+
+
+def dry_run_pipeline_on_dataframe(
+    df: pd.DataFrame,
+    header_rows: int = DATA_START_ROW - 1,
+    upload: Optional[Dict[str, Any]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Ejecuta Silver y Gold en memoria sin abrir ninguna conexión a la DB (vista previa de una carga).
+
+    Contexto:
+    - Mismas etapas Silver que run_pipeline_on_dataframe(); Gold se arma con los builders pandas
+      (build_gold.py), que producen las mismas filas que el SQL de build_gold_sql.py para el archivo.
+    - Con upload el artefacto Silver se guarda igual: la carga real posterior del mismo archivo
+      no repite Silver (silver_cache.status = hit).
+
+    Dónde se usa:
+    - POST /api/pipeline/run?dry_run=true.
+    """
+    dataframe_silver_student_rows, summary_silver, silver_cache = run_silver_stages(df, header_rows, upload)
+    return dataframe_silver_student_rows, dry_run_on_silver(dataframe_silver_student_rows, summary_silver, silver_cache)
+
+
+def dry_run_pipeline_on_batch(
+    files: List[Dict[str, Any]],
+    sheet: Optional[str] = None,
+    upload: Optional[Dict[str, Any]] = None,
+    max_workers: int = config.UPLOAD_PARSE_WORKERS,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Vista previa (sin DB) de una carga de varios archivos; ver run_pipeline_on_batch().
+    """
+    dataframe_silver_student_rows, summary_silver, silver_cache = _run_batch_silver_stages(files, sheet, upload, max_workers)
+    return dataframe_silver_student_rows, dry_run_on_silver(dataframe_silver_student_rows, summary_silver, silver_cache)
+
+
+def dry_run_from_silver_cache(sha256: str, hoja: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Vista previa desde el artefacto Silver de un archivo ya procesado (None si no hay artefacto).
+    """
+    artifact = load_silver_artifact(sha256, hoja)
+    if artifact is None:
+        return None
+    dataframe_silver_student_rows, metadata = artifact
+    return dry_run_on_silver(
+        dataframe_silver_student_rows,
+        metadata["summary"],
+        {"status": "hit", "artifact": silver_artifact_path(sha256, hoja).name},
+    )
+
+
+def resume_pipeline_run(run_id: str, db_engine: Optional[Engine] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Continúa una ejecución fallida desde su primera etapa incompleta (ver app/services/etl/checkpoints.py).
+
+    Qué hace:
+    - Silver sale del artefacto Parquet de la ejecución: el archivo no se vuelve a leer ni transformar.
+    - En append / merge sin atomic solo se cargan las tablas base que no alcanzaron a hacer commit;
+      si la base estaba completa, solo se refresca Gold; si Gold también, solo se registra la carga.
+    - Se usan el modo, atomic, el archivo y la hoja de la ejecución original.
+
+    Dónde se usa:
+    - POST /api/pipeline/runs/{run_id}/resume.
+    """
+    checkpoint_run = load_run(run_id)
+    if checkpoint_run["status"] == "completed":
+        raise PipelineRunNotResumableError(f"La ejecución {run_id} ya se completó")
+
+    artifact = load_silver_artifact(checkpoint_run["sha256"], checkpoint_run["hoja"])
+    if artifact is None:
+        raise PipelineRunNotResumableError(
+            f"No hay artefacto Silver para la ejecución {run_id} (se eliminó o cambió el código): vuelva a subir el archivo"
+        )
+    dataframe_silver_student_rows, _ = artifact
+
+    return run_pipeline_on_silver(
+        dataframe_silver_student_rows,
+        checkpoint_run["stages"]["silver"]["summary"],
+        db_engine       = db_engine,
+        atomic          = checkpoint_run["atomic"],
+        mode            = checkpoint_run["mode"],
+        upload          = {
+            "nombre_archivo"    : checkpoint_run["nombre_archivo"],
+            "sha256"            : checkpoint_run["sha256"],
+            "hoja"              : checkpoint_run["hoja"],
+        },
+        silver_cache    = {
+            "status"    : "hit",
+            "artifact"  : silver_artifact_path(checkpoint_run["sha256"], checkpoint_run["hoja"]).name,
+        },
+        checkpoint_run  = checkpoint_run,
+    )
+
+
+def find_duplicate_upload(
+    sha256: str,
+    mode: str = "append",
+    hoja: Optional[str] = None,
+    db_engine: Optional[Engine] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Devuelve el resumen guardado si este archivo (misma huella y hoja) ya se cargó y repetirlo no cambiaría la DB.
+
+    Contexto:
+    - La huella SHA-256 se calcula sobre el archivo subido (compute_upload_sha256 en upload_reader.py),
+      antes de leerlo: un duplicado no pasa por el lector, Silver ni la carga.
+    - Las reglas por modo están en app/services/etl/upload_history.py.
+
+    Para qué:
+    - Que subir dos veces el mismo archivo no vuelva a ejecutar todo el ETL y los upserts.
+
+    Dónde se usa:
+    - POST /api/pipeline/run, salvo con force=true.
+    """
+    with _connection_factory_for(db_engine)() as connection:
+        previous = find_reusable_upload(connection, sha256, mode, hoja)
+    if previous is None:
+        return None
+
+    summary = dict(previous["resumen"])
+    summary["upload"] = {
+        "nombre_archivo"        : previous["nombre_archivo"],
+        "sha256"                : sha256,
+        "duplicate"             : True,
+        "id_carga"              : previous["id_carga"],
+        "fecha_carga"           : previous["fecha_carga"],
+        "modo_carga_original"   : previous["modo"],
+    }
+    return summary
+
+
+def rebuild_gold_from_database(
+    db_engine: Optional[Engine] = None,
+    sha256: Optional[str] = None,
+    hoja: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Reconstruye la capa Gold dentro de PostgreSQL a partir de las tablas base ya cargadas.
+
+    Contexto:
+    - A diferencia de run_pipeline_on_dataframe, no necesita el archivo original:
+      las tablas gold_kpi_* se recalculan con INSERT ... SELECT sobre el modelo base.
+    - Con sha256 solo se refrescan las cohortes del artefacto Silver de ese archivo: del Parquet
+      se leen únicamente las columnas id_alumno y año_ingreso.
+
+    Para qué:
+    - Recuperar Gold tras una carga parcial o un cambio de esquema sin volver a subir el archivo.
+
+    Dónde se usa:
+    - Endpoint POST /api/pipeline/gold/rebuild.
+    """
+    cohortes = None
+    if sha256 is not None:
+        dataframe_cohortes = load_silver_columns(sha256, ["id_alumno", "año_ingreso"], hoja)
+        if dataframe_cohortes is None:
+            raise SilverArtifactNotFoundError(f"No hay artefacto Silver para el archivo {sha256}")
+        cohortes = get_cohortes_in_dataframe(dataframe_cohortes)
+
+    with _connection_factory_for(db_engine)() as connection, etl_write_lock(connection):
+        if cohortes is None:
+            summary_database_gold = rebuild_all_gold_sql(connection)
+        else:
+            summary_database_gold = refresh_gold_by_cohort(connection, cohortes)
+        record_pipeline_lsn(connection)
+
+    summary: Dict[str, Any] = {
+        "gold": summary_database_gold,
+    }
+    return summary
@@ -0,0 +1,255 @@
+"""
+Cargas de varios archivos (o un .zip): lectura y limpieza por archivo en un pool de procesos.
+"""
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from app.core.config import config
+from app.services.etl.delete_algebra_classes import filter_out_algebra
+from app.services.etl.group_by_test import group_by_test, ORDER
+from app.services.upload_reader import (
+    CSV_EXTENSIONS,
+    EXCEL_EXTENSIONS,
+    HASH_CHUNK_BYTES,
+    open_upload_path,
+    read_upload_dataframe,
+    UploadTooLargeError,
+    UnsupportedUploadError,
+    InvalidUploadError,
+)
+
+
+# Archivo comprimido con varios CSV / Excel (un export por bimestre y sede)
+ZIP_EXTENSIONS = (".zip",)
+
+# Archivos que se leen dentro de un .zip; el resto (README, carpetas, __MACOSX/) se ignora
+BATCH_DATA_EXTENSIONS = CSV_EXTENSIONS + EXCEL_EXTENSIONS
+
+
+def is_zip_upload(filename: Optional[str]) -> bool:
+    return (filename or "").lower().endswith(ZIP_EXTENSIONS)
+
+
+def _is_batch_data_member(info: zipfile.ZipInfo) -> bool:
+    path = PurePosixPath(info.filename)
+    if info.is_dir() or path.parts[0] == "__MACOSX" or path.name.startswith("."):
+        return False
+    return path.name.lower().endswith(BATCH_DATA_EXTENSIONS)
+
+
+def _copy_with_sha256(source: BinaryIO, target: Path, max_bytes: int = config.UPLOAD_MAX_BYTES) -> Tuple[str, int]:
+    """
+    Copia source a target por bloques calculando su SHA-256; corta si supera max_bytes.
+    """
+    digest      = hashlib.sha256()
+    copied      = 0
+    with open(target, "wb") as output:
+        for chunk in iter(lambda: source.read(HASH_CHUNK_BYTES), b""):
+            copied += len(chunk)
+            if copied > max_bytes:
+                raise UploadTooLargeError(
+                    f"El archivo {target.name} supera el máximo permitido de {max_bytes} bytes"
+                )
+            digest.update(chunk)
+            output.write(chunk)
+    return digest.hexdigest(), copied
+
+
+@contextmanager
+def upload_batch_workdir() -> Iterator[Path]:
+    """
+    Directorio temporal con los archivos de una carga múltiple; se borra al salir.
+    """
+    with tempfile.TemporaryDirectory(prefix="fica-batch-") as workdir:
+        yield Path(workdir)
+
+
+def extract_upload_batch(uploads: List[Tuple[str, BinaryIO]], workdir: Path) -> List[Dict[str, Any]]:
+    """
+    Copia los archivos subidos (y los CSV / Excel de cada .zip) a workdir, en orden, con su huella.
+
+    Qué devuelve:
+    - Una lista de {"nombre_archivo", "path", "sha256", "bytes"} por archivo de datos.
+      Dentro de un .zip los archivos van en orden alfabético y nombre_archivo es "<zip>/<archivo>".
+
+    Contexto:
+    - Los procesos del pool leen los archivos desde disco: el spool de FastAPI no se puede
+      pasar a otro proceso.
+    - UPLOAD_MAX_BYTES aplica a cada archivo (descomprimido); UPLOAD_BATCH_MAX_FILES al total.
+
+    Dónde se usa:
+    - POST /api/pipeline/run con varios archivos o un .zip (app/api/pipeline.py), en el threadpool.
+    """
+    files: List[Dict[str, Any]] = []
+
+    def add_file(nombre_archivo: str, source: BinaryIO) -> None:
+        if len(files) >= config.UPLOAD_BATCH_MAX_FILES:
+            raise InvalidUploadError(
+                f"La carga trae más de {config.UPLOAD_BATCH_MAX_FILES} archivos (UPLOAD_BATCH_MAX_FILES)"
+            )
+        target          = workdir / f"{len(files):04d}{PurePosixPath(nombre_archivo).suffix.lower()}"
+        sha256, size    = _copy_with_sha256(source, target)
+        files.append({"nombre_archivo": nombre_archivo, "path": str(target), "sha256": sha256, "bytes": size})
+
+    for filename, stream in uploads:
+        filename = filename or ""
+        stream.seek(0)
+        if is_zip_upload(filename):
+            try:
+                archive = zipfile.ZipFile(stream)
+            except zipfile.BadZipFile:
+                raise InvalidUploadError(f"{filename} no es un archivo .zip válido")
+            with archive:
+                members = sorted((info for info in archive.infolist() if _is_batch_data_member(info)), key=lambda info: info.filename)
+                if not members:
+                    raise InvalidUploadError(f"{filename} no contiene archivos .csv, .xlsx ni .xls")
+                for info in members:
+                    with archive.open(info) as member:
+                        add_file(f"{filename}/{info.filename}", member)
+        elif filename.lower().endswith(BATCH_DATA_EXTENSIONS):
+            add_file(filename, stream)
+        else:
+            raise UnsupportedUploadError(f"Formato de archivo no soportado ({filename}). Use .csv, .xlsx, .xls o .zip")
+        stream.seek(0)
+    return files
+
+
+def compute_batch_sha256(files: List[Dict[str, Any]]) -> str:
+    """
+    Huella de la carga: SHA-256 de las huellas de sus archivos, en orden (el orden cambia los id_alumno).
+    Con un solo archivo es la huella de ese archivo: un .zip con un CSV equivale a subir el CSV.
+    """
+    if len(files) == 1:
+        return files[0]["sha256"]
+    digest = hashlib.sha256()
+    for upload_file in files:
+        digest.update(upload_file["sha256"].encode("ascii"))
+    return digest.hexdigest()
+
+
+def _prepare_silver_part(path: str, nombre_archivo: str, sheet: Optional[str]) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    Worker del pool: lee un archivo (Bronze tipado) y aplica filter_out_algebra + group_by_test.
+    group_by_student no corre aquí: los id_alumno se asignan una sola vez sobre la carga combinada.
+    """
+    try:
+        with open_upload_path(path) as stream:
+            dataframe_raw = read_upload_dataframe(stream, nombre_archivo, sheet)
+    except (InvalidUploadError, UnsupportedUploadError) as e:
+        raise type(e)(f"{nombre_archivo}: {e}") from None
+
+    dataframe_filtered, summary_filter          = filter_out_algebra(dataframe_raw)
+    dataframe_grouped_test, summary_group_test  = group_by_test(dataframe_filtered, 1)
+    return dataframe_grouped_test, {"filter_out_algebra": summary_filter, "group_by_test": summary_group_test}
+
+
+def prepare_silver_parts(
+    files: List[Dict[str, Any]],
+    sheet: Optional[str] = None,
+    max_workers: int = config.UPLOAD_PARSE_WORKERS,
+) -> List[Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]]:
+    """
+    Corre _prepare_silver_part() por archivo en un pool de procesos (en orden de files).
+
+    Contexto:
+    - Lectura y etapas Silver por fila son CPU (pandas / iterrows): con hilos se serializan en el GIL.
+    - Los procesos se crean con spawn: el proceso de la API tiene hilos (threadpool, pools de conexiones)
+      y un fork los copiaría a medio usar. Los procesos no superan los CPUs disponibles;
+      con un archivo, un CPU o UPLOAD_PARSE_WORKERS <= 1 no hay pool (arrancar un proceso cuesta más).
+    """
+    paths   = [upload_file["path"] for upload_file in files]
+    names   = [upload_file["nombre_archivo"] for upload_file in files]
+    workers = min(max_workers, len(files), os.cpu_count() or 1)
+    if workers <= 1:
+        return [_prepare_silver_part(path, name, sheet) for path, name in zip(paths, names)]
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return list(executor.map(_prepare_silver_part, paths, names, repeat(sheet)))
+
+
+# Enteros de los resúmenes Silver que no son conteos: se copian del primer archivo en vez de sumarse
+# (filter_out_algebra.course_column es el índice de la columna de asignatura)
+SUMMARY_NON_COUNT_KEYS = ("course_column",)
+
+
+def _sum_summaries(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    total: Dict[str, Any] = {}
+    for summary in summaries:
+        for key, value in summary.items():
+            if isinstance(value, dict):
+                total[key] = _sum_summaries([total.get(key, {}), value])
+            elif key in SUMMARY_NON_COUNT_KEYS:
+                total.setdefault(key, value)
+            elif isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+                total[key] = total.get(key, 0) + value
+            else:
+                total.setdefault(key, value)
+    return total
+
+
+def combine_silver_parts(
+    files: List[Dict[str, Any]],
+    parts: List[Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]],
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    Une los resultados de group_by_test de cada archivo como si fueran un solo archivo concatenado.
+
+    Contexto:
+    - Cada parte ya viene ordenada por grupo (none, pdt, paes) y por fila: un orden estable por grupo
+      sobre la concatenación deja exactamente el orden de group_by_test sobre el archivo unido.
+    - El índice de cada parte se desplaza por las filas de los archivos anteriores (mismo índice
+      que tendría el archivo unido).
+
+    Qué devuelve:
+    - (DataFrame para group_by_student, resúmenes filter_out_algebra / group_by_test sumados
+      + batch: {"files": [...]} con los resúmenes de cada archivo).
+    """
+    frames      = []
+    offset      = 0
+    per_file    = []
+    for upload_file, (dataframe_part, summary_part) in zip(files, parts):
+        if len(dataframe_part):
+            frames.append(dataframe_part.set_axis(dataframe_part.index + offset))
+        offset += summary_part["filter_out_algebra"]["total_rows"]
+        per_file.append({
+            "nombre_archivo"    : upload_file["nombre_archivo"],
+            "sha256"            : upload_file["sha256"],
+            "bytes"             : upload_file["bytes"],
+            **summary_part,
+        })
+
+    if not frames:
+        raise InvalidUploadError("Los archivos de la carga no tienen filas para procesar")
+
+    dataframe_combined  = pd.concat(frames)
+    # pd.concat deja como texto las columnas category cuyas categorías difieren entre archivos
+    for column in frames[0].columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype) and not isinstance(dataframe_combined[column].dtype, pd.CategoricalDtype):
+            dataframe_combined[column] = pd.Categorical(
+                dataframe_combined[column],
+                categories=union_categoricals([frame[column] for frame in frames]).categories,
+            )
+    group_rank          = dataframe_combined["group"].map({name: position for position, name in enumerate(ORDER)})
+    dataframe_combined  = dataframe_combined.iloc[np.argsort(group_rank.fillna(len(ORDER)).to_numpy(), kind="stable")]
+    dataframe_combined["originalIndex"] = np.arange(len(dataframe_combined))
+
+    summary: Dict[str, Dict[str, Any]] = {
+        "filter_out_algebra"    : _sum_summaries([summary_part["filter_out_algebra"] for _, summary_part in parts]),
+        "group_by_test"         : _sum_summaries([summary_part["group_by_test"] for _, summary_part in parts]),
+        "batch"                 : {"files": per_file},
+    }
+    return dataframe_combined, summary
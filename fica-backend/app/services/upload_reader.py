@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from app.core.config import config
+from app.services.etl.group_by_test import DATA_START_ROW
+from app.services.etl.group_by_student import HEADERS
+
+
+# Extensiones aceptadas por POST /api/pipeline/run
+CSV_EXTENSIONS      = (".csv",)
+EXCEL_EXTENSIONS    = (".xlsx", ".xls")
+# .xls (formato binario antiguo) no lo lee openpyxl: pasa por pd.read_excel
+LEGACY_EXCEL_EXTENSIONS = (".xls",)
+
+# Valor del parámetro sheet que selecciona todas las hojas del libro
+ALL_SHEETS = "*"
+
+# Bytes leídos por vez al calcular la huella SHA-256 del archivo
+HASH_CHUNK_BYTES = 1024 * 1024
+
+# Esquema Bronze: columnas del archivo según HEADERS de group_by_student.py
+# (sin id_alumno ni tipo_ingreso, que las agrega Silver). Las 2 primeras filas son encabezados.
+BRONZE_HEADER_ROWS      = DATA_START_ROW - 1
+BRONZE_COLUMNS          = HEADERS[1:-1]
+BRONZE_INT_COLUMNS      = ["año", "semestre", "bimestre", "año_ingreso"]
+BRONZE_CATEGORY_COLUMNS = ["codigo_asignatura", "modulo", "nombre_asignatura", "estado_final"]
+# El resto (nota, diagnóstico, puntajes PAES / PDT) son numéricas con coma o punto decimal
+
+
+class UploadTooLargeError(ValueError):
+    """
+    El archivo subido supera UPLOAD_MAX_BYTES.
+    """
+
+
+class UnsupportedUploadError(ValueError):
+    """
+    La extensión del archivo no es .csv, .xlsx ni .xls.
+    """
+
+
+class InvalidUploadError(ValueError):
+    """
+    El archivo no respeta el esquema Bronze (cantidad de columnas, codificación, hoja inexistente).
+    """
+
+
+def check_upload_size(size_bytes: Optional[int], max_bytes: int = config.UPLOAD_MAX_BYTES) -> None:
+    if size_bytes is not None and size_bytes > max_bytes:
+        raise UploadTooLargeError(
+            f"El archivo pesa {size_bytes} bytes; el máximo permitido es {max_bytes} bytes"
+        )
+
+
+def compute_upload_sha256(stream: BinaryIO, chunk_bytes: int = HASH_CHUNK_BYTES) -> str:
+    """
+    Huella SHA-256 (hex) del archivo subido, leída por bloques; deja el archivo al inicio.
+
+    Dónde se usa:
+    - POST /api/pipeline/run: detectar que el mismo archivo ya se cargó (carga_csv.sha256).
+    """
+    stream.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_bytes), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+# Número con punto o coma decimal (mismo criterio que clean_numeric_column; inf / nan no son válidos)
+NUMERIC_TEXT_PATTERN = r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$"
+
+
+def _text_to_float(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    texto = pc.replace_substring(pc.utf8_trim_whitespace(column), ",", ".")
+    try:
+        # Camino rápido: columna limpia; solo hay que descartar inf / nan
+        numeros = pc.cast(texto, pa.float64())
+        return pc.if_else(pc.is_finite(numeros), numeros, None)
+    except pa.ArrowInvalid:
+        valido = pc.match_substring_regex(texto, NUMERIC_TEXT_PATTERN)
+        return pc.cast(pc.if_else(valido, texto, None), pa.float64())
+
+
+def apply_bronze_schema(table: pa.Table) -> pd.DataFrame:
+    """
+    Tipa las columnas Bronze (texto) con pyarrow.compute y las pasa a pandas.
+
+    Qué hace:
+    - Enteras (año, semestre, bimestre, año_ingreso): Int64, truncando como int(float(x)).
+    - Numéricas (nota, diagnóstico, puntajes): Float64. Los puntajes vienen con coma decimal
+      ("810,1") y las notas con punto; un texto no numérico queda como <NA>.
+    - Categóricas (código, módulo, asignatura, estado): category.
+    - Las columnas se devuelven con etiquetas posicionales (0..24): Silver las recorre por posición.
+
+    Para qué:
+    - Convertir columna a columna en C++ en vez de str / strip / float por celda en Python.
+    """
+    types_mapper        = {pa.int64(): pd.Int64Dtype(), pa.float64(): pd.Float64Dtype()}.get
+    columnas_tipadas    = {}
+    for position, column in enumerate(BRONZE_COLUMNS):
+        array = table.column(column)
+        # Se suelta el texto de la columna apenas se tipa: el pico de memoria es ~una columna extra
+        table = table.drop_columns([column])
+        if column in BRONZE_CATEGORY_COLUMNS:
+            if not pa.types.is_dictionary(array.type):
+                array = pc.dictionary_encode(array)
+        elif column in BRONZE_INT_COLUMNS:
+            array = pc.cast(pc.trunc(_text_to_float(array)), pa.int64())
+        else:
+            array = _text_to_float(array)
+        columnas_tipadas[position] = array.to_pandas(types_mapper=types_mapper)
+
+    return pd.DataFrame(columnas_tipadas, copy=False)
+
+
+def read_csv_stream(
+    stream: BinaryIO,
+    block_bytes: int = config.UPLOAD_CSV_BLOCK_BYTES,
+) -> pd.DataFrame:
+    """
+    Lee un CSV Bronze desde un archivo binario con el lector CSV de pyarrow y lo tipa.
+
+    Qué hace:
+    - pyarrow lee directo del archivo (spool en disco del UploadFile) en bloques de block_bytes,
+      parseando los bloques en paralelo; no se arma una copia en bytes ni en str del contenido.
+    - Salta las filas de encabezado y nombra las columnas según BRONZE_COLUMNS.
+    - Las columnas de texto repetido (código, módulo, asignatura, estado) se leen como
+      diccionario (categorías) y el resto como texto, que tipa apply_bronze_schema().
+
+    Para qué:
+    - Que Silver y la carga reciban columnas ya tipadas en lugar de objetos str por celda,
+      y que un archivo grande se lea más rápido y ocupe menos memoria.
+    """
+    stream.seek(0)
+    column_types = {
+        column: pa.dictionary(pa.int32(), pa.string()) if column in BRONZE_CATEGORY_COLUMNS else pa.string()
+        for column in BRONZE_COLUMNS
+    }
+    try:
+        table = pacsv.read_csv(
+            stream,
+            read_options    = pacsv.ReadOptions(
+                skip_rows       = BRONZE_HEADER_ROWS,
+                column_names    = BRONZE_COLUMNS,
+                block_size      = block_bytes,
+            ),
+            convert_options = pacsv.ConvertOptions(
+                column_types        = column_types,
+                strings_can_be_null = True,
+            ),
+        )
+    except pa.ArrowInvalid as e:
+        raise InvalidUploadError(f"El archivo no tiene el formato esperado ({len(BRONZE_COLUMNS)} columnas, UTF-8): {e}")
+
+    return apply_bronze_schema(table)
+
+
+def _cells_to_text(values: list) -> pa.Array:
+    """
+    Columna de celdas Excel -> texto Arrow (lo que espera apply_bronze_schema).
+    Una columna homogénea (solo números, solo texto) se convierte en C++; si mezcla tipos, celda a celda.
+    """
+    try:
+        return pc.cast(pa.array(values), pa.string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def _read_sheet_columns(workbook, sheet_name: str) -> pa.Table:
+    """
+    Recorre una hoja en modo read_only (values_only) y arma directamente una lista por columna.
+    Se saltan las filas de encabezado y las filas completamente vacías.
+    """
+    worksheet   = workbook[sheet_name]
+    width       = len(BRONZE_COLUMNS)
+    columns : List[list] = [[] for _ in range(width)]
+    for row in worksheet.iter_rows(min_row=BRONZE_HEADER_ROWS + 1, values_only=True):
+        if len(row) > width:
+            if any(value is not None for value in row[width:]):
+                raise InvalidUploadError(
+                    f"La hoja '{worksheet.title}' tiene más de {width} columnas"
+                )
+            row = row[:width]
+        if all(value is None for value in row):
+            continue
+        if len(row) < width:
+            row = row + (None,) * (width - len(row))
+        for position, value in enumerate(row):
+            columns[position].append(value)
+
+    return pa.table([_cells_to_text(values) for values in columns], names=BRONZE_COLUMNS)
+
+
+def _resolve_sheet_names(available: List[str], sheet: Optional[str]) -> List[str]:
+    if not sheet:
+        return available[:1]
+    if sheet.strip() == ALL_SHEETS:
+        return available
+    requested   = [name.strip() for name in sheet.split(",") if name.strip()]
+    missing     = [name for name in requested if name not in available]
+    if missing:
+        raise InvalidUploadError(
+            f"Hoja(s) no encontrada(s): {', '.join(missing)}. Hojas del archivo: {', '.join(available)}"
+        )
+    return requested
+
+
+def read_excel_stream(
+    stream      : BinaryIO,
+    sheet       : Optional[str] = None,
+    max_workers : int           = config.UPLOAD_EXCEL_WORKERS,
+) -> pd.DataFrame:
+    """
+    Lee un .xlsx Bronze en streaming con openpyxl (read_only + values_only) y lo tipa.
+
+    Qué hace:
+    - No arma el modelo de objetos del libro: recorre las filas de cada hoja y llena
+      una lista por columna, que pasa a Arrow y a apply_bronze_schema() (igual que el CSV).
+    - sheet: nombre de hoja, varios separados por coma, o "*" para todas. Por defecto la primera.
+    - Con varias hojas, cada una se recorre en un hilo (hasta max_workers) y se concatenan
+      en el orden pedido. Cada hoja debe traer sus propias filas de encabezado.
+
+    Para qué:
+    - Que un export grande no cargue el libro completo en memoria antes del ETL.
+    """
+    stream.seek(0)
+    try:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise InvalidUploadError(f"No se pudo abrir el archivo Excel: {e}")
+
+    try:
+        sheet_names = _resolve_sheet_names(workbook.sheetnames, sheet)
+        if len(sheet_names) == 1:
+            tables = [_read_sheet_columns(workbook, sheet_names[0])]
+        else:
+            # Las hojas son miembros distintos del zip: zipfile serializa las lecturas del archivo
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sheet_names)))) as executor:
+                tables = list(executor.map(lambda name: _read_sheet_columns(workbook, name), sheet_names))
+    finally:
+        workbook.close()
+
+    return apply_bronze_schema(pa.concat_tables(tables))
+
+
+def read_legacy_excel_stream(stream: BinaryIO, sheet: Optional[str] = None) -> pd.DataFrame:
+    """
+    .xls con pd.read_excel (carga la hoja completa); mismas reglas de sheet que read_excel_stream().
+    """
+    stream.seek(0)
+    available       = list(pd.ExcelFile(stream).sheet_names)
+    sheet_names     = _resolve_sheet_names(available, sheet)
+    stream.seek(0)
+    frames          = pd.read_excel(stream, sheet_name=sheet_names, header=None, skiprows=BRONZE_HEADER_ROWS)
+    dataframe       = pd.concat([frames[name] for name in sheet_names], ignore_index=True)
+    if dataframe.shape[1] != len(BRONZE_COLUMNS):
+        raise InvalidUploadError(
+            f"El archivo tiene {dataframe.shape[1]} columnas; se esperan {len(BRONZE_COLUMNS)}"
+        )
+    dataframe.columns = BRONZE_COLUMNS
+    return apply_bronze_schema(pa.Table.from_pandas(dataframe.astype("string"), preserve_index=False))
+
+
+def open_upload_path(path: str) -> pa.MemoryMappedFile:
+    """
+    Abre un archivo en disco para read_upload_dataframe() como memory-map (pyarrow):
+    el lector CSV lo parsea sin copiarlo a memoria y openpyxl lo lee como cualquier archivo binario.
+
+    Dónde se usa:
+    - Archivos de una carga múltiple (app/services/upload_batch.py) y la línea de comandos (app/cli.py).
+    """
+    return pa.memory_map(str(path), "r")
+
+
+def read_upload_dataframe(stream: BinaryIO, filename: str, sheet: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lee el archivo subido (CSV o Excel) a un DataFrame Bronze tipado, sin filas de encabezado.
+    sheet solo aplica a Excel (ver read_excel_stream).
+
+    Dónde se usa:
+    - POST /api/pipeline/run (app/api/pipeline.py), en el threadpool: la lectura es bloqueante.
+      El DataFrame se pasa a run_pipeline_on_dataframe(..., header_rows=0).
+    """
+    filename = filename.lower()
+    if filename.endswith(CSV_EXTENSIONS):
+        return read_csv_stream(stream)
+    if filename.endswith(LEGACY_EXCEL_EXTENSIONS):
+        return read_legacy_excel_stream(stream, sheet)
+    if filename.endswith(EXCEL_EXTENSIONS):
+        return read_excel_stream(stream, sheet)
+    raise UnsupportedUploadError("Formato de archivo no soportado. Use .csv, .xlsx o .xls")
@@ -0,0 +1,150 @@
+"""
+Carpeta vigilada: detecta exports nuevos por sondeo y decide cuándo están listos para cargarse.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Archivos que dejan los programas mientras escriben (copias a medio terminar, bloqueos de Excel)
+PARTIAL_FILE_SUFFIXES   = (".part", ".partial", ".tmp", ".crdownload")
+PARTIAL_FILE_PREFIXES   = (".", "~$")
+
+# Subcarpeta con un marcador por archivo ya procesado (huella SHA-256 + hoja); el "." la deja fuera del sondeo
+WATCH_PROCESSED_DIRNAME = ".fica_procesados"
+
+
+def file_signature(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _is_candidate(path: Path, extensions: Tuple[str, ...]) -> bool:
+    name = path.name.lower()
+    if name.startswith(PARTIAL_FILE_PREFIXES) or name.endswith(PARTIAL_FILE_SUFFIXES):
+        return False
+    return path.is_file() and name.endswith(extensions)
+
+
+def scan_watch_dir(
+    directory: Path,
+    tracked: Dict[str, Dict[str, Any]],
+    extensions: Tuple[str, ...],
+    settle_seconds: float,
+    now: Optional[float] = None,
+) -> List[Path]:
+    """
+    Revisa directory y devuelve los archivos que quedaron listos desde la revisión anterior.
+
+    Qué hace:
+    - tracked guarda, por ruta, la firma (tamaño, mtime) y desde cuándo no cambia.
+    - Un archivo está listo cuando su firma no cambió durante settle_seconds (debounce: una copia
+      o un export a medio escribir sigue cambiando de tamaño / mtime).
+    - Cada archivo se entrega una sola vez por firma: si después cambia (se reemplaza el export),
+      vuelve a esperar settle_seconds y se entrega de nuevo. Los archivos borrados se olvidan.
+
+    Dónde se usa:
+    - python -m app.cli watch (app/cli.py), en cada vuelta del sondeo.
+    """
+    now     = time.monotonic() if now is None else now
+    present = set()
+    ready   = []
+    for path in sorted(directory.iterdir()):
+        if not _is_candidate(path, extensions):
+            continue
+        key = str(path)
+        present.add(key)
+        try:
+            signature = file_signature(path)
+        except FileNotFoundError:
+            continue
+        entry = tracked.get(key)
+        if entry is None or entry["signature"] != signature:
+            tracked[key] = {"signature": signature, "stable_since": now, "queued": False}
+            continue
+        if not entry["queued"] and now - entry["stable_since"] >= settle_seconds:
+            entry["queued"] = True
+            ready.append(path)
+
+    for key in list(tracked):
+        if key not in present:
+            del tracked[key]
+    return ready
+
+
+def watch_marker_path(directory: Path, sha256: str, hoja: Optional[str] = None) -> Path:
+    """
+    Ruta del marcador: <directory>/.fica_procesados/<sha256 del archivo>[-<hoja>].json
+    (la hoja va como hash corto, igual que en silver_artifact_path()).
+    """
+    partes = [sha256]
+    if hoja:
+        partes.append(hashlib.sha256(hoja.encode("utf-8")).hexdigest()[:12])
+    return directory / WATCH_PROCESSED_DIRNAME / f"{'-'.join(partes)}.json"
+
+
+def is_watch_processed(directory: Path, sha256: str, hoja: Optional[str] = None) -> bool:
+    return watch_marker_path(directory, sha256, hoja).exists()
+
+
+def mark_watch_processed(directory: Path, sha256: str, hoja: Optional[str], result: Dict[str, Any]) -> None:
+    """
+    Deja el marcador de un archivo cargado (o ya cargado antes) por la carpeta vigilada.
+
+    Contexto:
+    - El marcador depende solo del contenido (+ hoja): sobrevive a reinicios y a cada ejecución --once,
+      y el archivo no se vuelve a cargar aunque después corran cargas en otro modo
+      (con --mode merge, volver a cargar un export antiguo revertiría notas corregidas en uno más nuevo).
+    - Se escribe a un archivo temporal y se renombra: un marcador nunca queda a medias.
+
+    Dónde se usa:
+    - python -m app.cli watch (app/cli.py), tras cada archivo con status loaded / duplicate.
+    """
+    marker_path     = watch_marker_path(directory, sha256, hoja)
+    temporary_path  = marker_path.with_suffix(".tmp")
+    marker          = {
+        "archivo"   : result["archivo"],
+        "status"    : result["status"],
+        "fecha"     : datetime.now().isoformat(timespec="seconds"),
+    }
+    marker_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path.write_text(json.dumps(marker, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporary_path, marker_path)
+
+
+def parse_load_window(window: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    "HH:MM-HH:MM" -> (minuto de inicio, minuto de término) del día; vacío = sin ventana (siempre).
+    La ventana puede cruzar la medianoche ("22:00-06:00").
+    """
+    if not window:
+        return None
+    try:
+        start_text, end_text = window.split("-")
+        minutes = []
+        for text in (start_text, end_text):
+            hours, mins = text.strip().split(":")
+            if not (0 <= int(hours) < 24 and 0 <= int(mins) < 60):
+                raise ValueError
+            minutes.append(int(hours) * 60 + int(mins))
+    except ValueError:
+        raise ValueError(f"Ventana de carga inválida: {window!r}; use HH:MM-HH:MM (ej: 22:00-06:00)")
+    return minutes[0], minutes[1]
+
+
+def in_load_window(window: Optional[Tuple[int, int]], now: Optional[datetime] = None) -> bool:
+    if window is None:
+        return True
+    now         = now or datetime.now()
+    minute      = now.hour * 60 + now.minute
+    start, end  = window
+    if start == end:
+        return True
+    if start < end:
+        return start <= minute < end
+    return minute >= start or minute < end
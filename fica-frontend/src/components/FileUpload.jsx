@@ -72,12 +72,12 @@ function FileUpload({ onETLStart, isBlocked, blockReason }) {
   const validateAndSetFile = (file) => {
     if (!file) return;
 
-    // Validate file type - accept CSV and Excel files
-    const validExtensions = ['.xlsx', '.xls', '.csv'];
+    // Validate file type - accept CSV and Excel files (or a .zip with several of them)
+    const validExtensions = ['.xlsx', '.xls', '.csv', '.zip'];
     const fileExtension = file.name.substring(file.name.lastIndexOf('.')).toLowerCase();
 
     if (!validExtensions.includes(fileExtension)) {
-      setErrorMessage('Por favor, sube un archivo .xlsx, .xls o .csv');
+      setErrorMessage('Por favor, sube un archivo .xlsx, .xls, .csv o .zip');
       setFile(null);
       return;
     }
@@ -196,7 +196,7 @@ function FileUpload({ onETLStart, isBlocked, blockReason }) {
         <input
           ref={fileInputRef}
           type="file"
-          accept=".xlsx,.xls,.csv"
+          accept=".xlsx,.xls,.csv,.zip"
           onChange={handleFileInput}
           className="hidden"
         />
@@ -217,7 +217,7 @@ function FileUpload({ onETLStart, isBlocked, blockReason }) {
               o haz clic para seleccionar
             </p>
             <p className="text-xs text-gray-400">
-              Formatos soportados: .xlsx, .xls, .csv (máx. 50MB)
+              Formatos soportados: .xlsx, .xls, .csv, .zip (máx. 50MB)
             </p>
           </>
         ) : (